@@ -0,0 +1,25 @@
+"""Room codes are reused: make games.room_code a plain index
+
+Revision ID: 3f1c2a9d7b40
+Revises: e697c9b6a3e1
+Create Date: 2026-10-19 09:12:41.208113
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b40'
+down_revision: str | None = 'e697c9b6a3e1'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('games_room_code_key', 'games', type_='unique')
+    op.create_index(op.f('ix_games_room_code'), 'games', ['room_code'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_games_room_code'), table_name='games')
+    op.create_unique_constraint('games_room_code_key', 'games', ['room_code'])
@@ -0,0 +1,39 @@
+"""Indexes for match history
+
+Revision ID: 5d9a3b1e6c82
+Revises: c41a7e9f0d25
+Create Date: 2026-10-19 14:21:50.137265
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a3b1e6c82'
+down_revision: str | None = 'c41a7e9f0d25'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_games_created_at_id', 'games', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_game_participants_user_id_game_id', 'game_participants', ['user_id', 'game_id'],
+        unique=False, postgresql_include=['seat_index', 'final_score', 'final_rank'],
+    )
+    op.create_index(
+        'ix_game_rounds_game_id_round_number', 'game_rounds', ['game_id', 'round_number'],
+        unique=False,
+    )
+    op.create_index('ix_round_scores_round_id', 'round_scores', ['round_id'], unique=False)
+    op.create_index(
+        'ix_round_scores_participant_id', 'round_scores', ['participant_id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_round_scores_participant_id', table_name='round_scores')
+    op.drop_index('ix_round_scores_round_id', table_name='round_scores')
+    op.drop_index('ix_game_rounds_game_id_round_number', table_name='game_rounds')
+    op.drop_index('ix_game_participants_user_id_game_id', table_name='game_participants')
+    op.drop_index('ix_games_created_at_id', table_name='games')
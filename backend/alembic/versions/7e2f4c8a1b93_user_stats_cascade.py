@@ -0,0 +1,30 @@
+"""Cascade user_stats deletes from users
+
+Revision ID: 7e2f4c8a1b93
+Revises: 5d9a3b1e6c82
+Create Date: 2026-10-19 16:48:12.390571
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2f4c8a1b93'
+down_revision: str | None = '5d9a3b1e6c82'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('user_stats_user_id_fkey', 'user_stats', type_='foreignkey')
+    op.create_foreign_key(
+        'user_stats_user_id_fkey', 'user_stats', 'users', ['user_id'], ['id'],
+        ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('user_stats_user_id_fkey', 'user_stats', type_='foreignkey')
+    op.create_foreign_key(
+        'user_stats_user_id_fkey', 'user_stats', 'users', ['user_id'], ['id'],
+    )
@@ -0,0 +1,25 @@
+"""Index user_stats.games_won for the leaderboard
+
+Revision ID: 8b5e0d4c2f17
+Revises: 3f1c2a9d7b40
+Create Date: 2026-10-19 11:40:03.512964
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5e0d4c2f17'
+down_revision: str | None = '3f1c2a9d7b40'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f('ix_user_stats_games_won'), 'user_stats', ['games_won'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_stats_games_won'), table_name='user_stats')
@@ -0,0 +1,33 @@
+"""Room checkpoints for restoring live games
+
+Revision ID: a6d2f9c3b814
+Revises: 7e2f4c8a1b93
+Create Date: 2026-10-19 19:02:41.518307
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f9c3b814'
+down_revision: str | None = '7e2f4c8a1b93'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('room_checkpoints',
+    sa.Column('room_code', sa.String(length=10), nullable=False),
+    sa.Column('revision', sa.Integer(), nullable=False),
+    sa.Column('state', sa.LargeBinary(), nullable=False),
+    sa.Column('rng_state', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('room_code')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('room_checkpoints')
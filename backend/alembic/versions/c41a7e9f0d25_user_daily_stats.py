@@ -0,0 +1,37 @@
+"""Daily per-user stats rollups
+
+Revision ID: c41a7e9f0d25
+Revises: 8b5e0d4c2f17
+Create Date: 2026-10-19 13:05:27.884310
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e9f0d25'
+down_revision: str | None = '8b5e0d4c2f17'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('user_daily_stats',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('games_played', sa.Integer(), nullable=False),
+    sa.Column('games_won', sa.Integer(), nullable=False),
+    sa.Column('total_rounds', sa.Integer(), nullable=False),
+    sa.Column('exact_bids', sa.Integer(), nullable=False),
+    sa.Column('best_score', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_index(op.f('ix_user_daily_stats_day'), 'user_daily_stats', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_daily_stats_day'), table_name='user_daily_stats')
+    op.drop_table('user_daily_stats')
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import hmac
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.services.export import encode_rows, export_rows
+
+router = APIRouter(tags=["admin"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def require_admin(x_admin_token: str = Header("")):
+    # No token configured means the admin API is off
+    # Bytes, since compare_digest raises on non-ASCII str
+    if not settings.admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), settings.admin_token.encode(),
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+async def export_games(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: date | None = None,
+    end: date | None = None,
+    variant: str | None = None,
+):
+    # The generator opens its own session: it must outlive this handler
+    body = encode_rows(export_rows(start, end, variant), format)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="games.{format}"'},
+    )
@@ -9,10 +9,14 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, read_routing
 from app.models.stats import UserStats
 from app.models.user import User
 from app.services.auth_service import create_token, decode_token
+from app.services.leaderboard import leaderboard
+from app.services.profiles import invalidate_users
+from app.services.stats_service import merge_user_stats
+from app.sockets.sharding import shard
 
 router = APIRouter(tags=["auth"])
 
@@ -117,6 +121,11 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         db.add(UserStats(user_id=user.id))
 
     await db.commit()
+    changed = {user.id, *([anon_user.id] if anon_user else [])}
+    await leaderboard.refresh_users(db, changed)
+    invalidate_users(changed)
+    read_routing.note_write(changed)
+    await shard.users_changed(changed)
 
     jwt_token = create_token(str(user.id), "user", user.display_name)
     return RedirectResponse(f"{settings.frontend_url}/login?token={jwt_token}")
@@ -124,20 +133,4 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
 
 async def _merge_anonymous_stats(db: AsyncSession, anon_user: User, target_user: User):
     """Merge anonymous user's stats into target Google user."""
-    anon_stats_result = await db.execute(
-        select(UserStats).where(UserStats.user_id == anon_user.id)
-    )
-    anon_stats = anon_stats_result.scalar_one_or_none()
-
-    target_stats_result = await db.execute(
-        select(UserStats).where(UserStats.user_id == target_user.id)
-    )
-    target_stats = target_stats_result.scalar_one_or_none()
-
-    if anon_stats and target_stats:
-        target_stats.games_played += anon_stats.games_played
-        target_stats.games_won += anon_stats.games_won
-        target_stats.total_rounds += anon_stats.total_rounds
-        target_stats.exact_bids += anon_stats.exact_bids
-        target_stats.total_bids += anon_stats.total_bids
-        target_stats.best_score = max(target_stats.best_score, anon_stats.best_score)
+    await merge_user_stats(db, anon_user.id, target_user.id)
@@ -1,8 +1,54 @@
 from fastapi import APIRouter
 
+from app.database import read_routing
+from app.loop_monitor import loop_monitor
+from app.services.checkpoints import checkpoints
+from app.services.handoff import handoff
+from app.services.leaderboard import leaderboard
+from app.services.persistence_queue import persistence
+from app.services.profiles import profile_loader, profile_responses
+from app.services.purge import anonymous_purger
+from app.sockets.admission import admission
+from app.sockets.ratelimit import rate_limiter
+from app.sockets.reaper import reaper
+from app.sockets.sharding import shard
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/health/caches")
+async def cache_stats():
+    return {
+        "profile_responses": profile_responses.stats(),
+        "profiles": {
+            **profile_loader.cache.stats(),
+            "batches": profile_loader.batches,
+            "keys_loaded": profile_loader.keys_loaded,
+        },
+        "leaderboard": {
+            "loaded": leaderboard.loaded,
+            "players": len(leaderboard),
+            "version": leaderboard.version,
+        },
+        "read_routing": read_routing.stats(),
+    }
+
+
+@router.get("/health/jobs")
+async def job_stats():
+    return {
+        "persistence_queue": {"depth": persistence.depth, **persistence.stats.to_dict()},
+        "anonymous_purge": anonymous_purger.stats.to_dict(),
+        "shard": shard.stats(),
+        "checkpoints": {"rooms": len(checkpoints), **checkpoints.stats.to_dict()},
+        "handoff": handoff.stats(),
+        "rooms": reaper.stats.to_dict(),
+        "event_loop": loop_monitor.stats(),
+        "admission": admission.stats(),
+        "rate_limit": rate_limiter.stats(),
+    }
@@ -1,10 +1,10 @@
 from fastapi import APIRouter
 
-from app.sockets.manager import manager
+from app.sockets.sharding import shard
 
 router = APIRouter(tags=["lobby"])
 
 
 @router.get("/rooms")
 async def list_rooms():
-    return manager.get_lobby_rooms()
+    return shard.lobby_rooms()
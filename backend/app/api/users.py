@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import uuid
+from typing import Literal
 
-from fastapi import APIRouter, Depends, Header
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from fastapi.responses import JSONResponse
 
-from app.database import get_db
-from app.models.stats import UserStats
-from app.models.user import User
+from app.config import settings
+from app.database import ReadSession, get_read_db, open_read_session
 from app.services.auth_service import decode_token
+from app.services.history_service import InvalidCursorError, get_game_detail, list_user_games
+from app.services.leaderboard import leaderboard
+from app.services.profiles import get_profile_response
+from app.services.rollups import windowed_leaderboard
 
 router = APIRouter(tags=["users"])
 
+LeaderboardSort = Literal["wins", "win_rate", "bid_accuracy", "best_score"]
+
 
 async def get_current_user_id(authorization: str = Header(None)) -> str | None:
     if not authorization:
@@ -25,74 +32,96 @@ async def get_current_user_id(authorization: str = Header(None)) -> str | None:
         return None
 
 
+async def get_user_read_db(user_id: str | None = Depends(get_current_user_id)):
+    """Read session for the caller; the primary if their latest game may not have replicated."""
+    session = open_read_session(user_id)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
 @router.get("/me")
 async def get_profile(
     user_id: str | None = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    db: ReadSession = Depends(get_user_read_db),  # noqa: B008
 ):
     if not user_id:
         return {"error": "Not authenticated"}
 
-    result = await db.execute(select(User).where(User.id == uuid.UUID(user_id)))
-    user = result.scalar_one_or_none()
-    if not user:
+    # Cache hits never touch the session, so no pool connection is checked out
+    profile = await get_profile_response(db, uuid.UUID(user_id))
+    if profile is None:
         return {"error": "User not found"}
+    return profile
 
-    stats_result = await db.execute(select(UserStats).where(UserStats.user_id == user.id))
-    stats = stats_result.scalar_one_or_none()
 
+@router.get("/leaderboard")
+async def get_leaderboard(
+    request: Request,
+    sort: LeaderboardSort = "wins",
+    window: Literal["all", "week", "month"] = "all",
+    limit: int = Query(50, ge=1, le=100),
+    db: ReadSession = Depends(get_read_db),  # noqa: B008
+):
+    if window == "all":
+        await leaderboard.ensure_loaded()
+        etag = leaderboard.etag(sort, limit)
+        body = None
+    else:
+        body = await windowed_leaderboard(
+            db, window, sort, limit, settings.leaderboard_min_rate_games,
+        )
+        digest = hashlib.blake2b(json.dumps(body).encode(), digest_size=8).hexdigest()
+        etag = f'W/"lb-{window}-{digest}"'
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    if body is None:
+        body = leaderboard.top(sort, limit)
+    return JSONResponse(body, headers={"ETag": etag})
+
+
+@router.get("/me/rank")
+async def get_my_rank(
+    sort: LeaderboardSort = "wins",
+    user_id: str | None = Depends(get_current_user_id),
+):
+    if not user_id:
+        return {"error": "Not authenticated"}
+
+    await leaderboard.ensure_loaded()
     return {
-        "id": str(user.id),
-        "display_name": user.display_name,
-        "email": user.email,
-        "avatar_url": user.avatar_url,
-        "is_anonymous": user.is_anonymous,
-        "stats": {
-            "games_played": stats.games_played if stats else 0,
-            "games_won": stats.games_won if stats else 0,
-            "total_rounds": stats.total_rounds if stats else 0,
-            "exact_bids": stats.exact_bids if stats else 0,
-            "total_bids": stats.total_bids if stats else 0,
-            "bid_accuracy": (
-                round(stats.exact_bids / stats.total_bids * 100, 1)
-                if stats and stats.total_bids > 0
-                else 0
-            ),
-            "best_score": stats.best_score if stats else 0,
-            "current_streak": stats.current_streak if stats else 0,
-            "best_streak": stats.best_streak if stats else 0,
-        } if stats else None,
+        "sort": sort,
+        "rank": leaderboard.rank(uuid.UUID(user_id), sort),
+        "total": leaderboard.ranked_count(sort),
     }
 
 
-@router.get("/leaderboard")
-async def get_leaderboard(db: AsyncSession = Depends(get_db)):  # noqa: B008
-    result = await db.execute(
-        select(User, UserStats)
-        .join(UserStats, User.id == UserStats.user_id)
-        .where(User.is_anonymous == False)  # noqa: E712
-        .where(UserStats.games_played >= 1)
-        .order_by(UserStats.games_won.desc())
-        .limit(50)
-    )
-    rows = result.all()
-
-    return [
-        {
-            "display_name": user.display_name,
-            "avatar_url": user.avatar_url,
-            "games_played": stats.games_played,
-            "games_won": stats.games_won,
-            "win_rate": (
-                round(stats.games_won / stats.games_played * 100, 1)
-                if stats.games_played > 0 else 0
-            ),
-            "bid_accuracy": (
-                round(stats.exact_bids / stats.total_bids * 100, 1)
-                if stats.total_bids > 0 else 0
-            ),
-            "best_score": stats.best_score,
-            "best_streak": stats.best_streak,
-        }
-        for user, stats in rows
-    ]
+@router.get("/me/games")
+async def get_my_games(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    user_id: str | None = Depends(get_current_user_id),
+    db: ReadSession = Depends(get_user_read_db),  # noqa: B008
+):
+    if not user_id:
+        return {"error": "Not authenticated"}
+    try:
+        return await list_user_games(db, uuid.UUID(user_id), limit, cursor)
+    except InvalidCursorError:
+        return {"error": "Invalid cursor"}
+
+
+@router.get("/me/games/{game_id}")
+async def get_my_game(
+    game_id: uuid.UUID,
+    user_id: str | None = Depends(get_current_user_id),
+    db: ReadSession = Depends(get_user_read_db),  # noqa: B008
+):
+    if not user_id:
+        return {"error": "Not authenticated"}
+    detail = await get_game_detail(db, game_id, uuid.UUID(user_id))
+    if detail is None:
+        return {"error": "Game not found"}
+    return detail
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from app.bot.params import BotParams, default_params
 from app.bot.strategy import BotStrategy
 from app.game.types import Card, GameState, PlayerState, Rank
 
@@ -7,6 +8,9 @@ from app.game.types import Card, GameState, PlayerState, Rank
 class BasicBot(BotStrategy):
     """Basic heuristic bot: count high cards for bids, play simple strategy."""
 
+    def __init__(self, params: BotParams | None = None):
+        self.params = params or default_params()
+
     def choose_bid(self, player: PlayerState, state: GameState, valid_bids: list[int]) -> int:
         if not valid_bids:
             return 0
@@ -14,15 +18,16 @@ class BasicBot(BotStrategy):
         trump_suit = state.round_state.trump_suit if state.round_state else None
 
         # Count likely winners: high trump cards and aces
+        p = self.params
         expected_wins = 0
         for card in player.hand:
             if trump_suit and card.suit == trump_suit:
-                if card.rank.value_order >= Rank.JACK.value_order:
-                    expected_wins += 1
-                elif card.rank.value_order >= Rank.NINE.value_order:
-                    expected_wins += 0.5
+                if card.rank.value_order >= p.basic_trump_high_rank:
+                    expected_wins += p.basic_trump_high_weight
+                elif card.rank.value_order >= p.basic_trump_mid_rank:
+                    expected_wins += p.basic_trump_mid_weight
             elif card.rank == Rank.ACE:
-                expected_wins += 0.7
+                expected_wins += p.basic_ace_weight
 
         bid = round(expected_wins)
         bid = max(0, min(bid, state.round_state.hand_size if state.round_state else 0))
@@ -47,9 +52,9 @@ class BasicBot(BotStrategy):
             # Try to lose: play lowest card
             return min(valid_cards, key=lambda c: self._card_strength(c, state))
 
-    def _card_strength(self, card: Card, state: GameState) -> int:
+    def _card_strength(self, card: Card, state: GameState) -> float:
         trump_suit = state.round_state.trump_suit if state.round_state else None
         base = card.rank.value_order
         if trump_suit and card.suit == trump_suit:
-            base += 20  # Trump cards are stronger
+            base += self.params.basic_trump_bonus  # Trump cards are stronger
         return base
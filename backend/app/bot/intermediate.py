@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+from app.bot.params import BotParams, default_params
 from app.bot.strategy import BotStrategy
+from app.bot.transposition import TranspositionTable, position_key, shared_table
+from app.game.deck import card_index
 from app.game.types import Card, GameState, PlayerState, Rank, Suit
 
 
 class IntermediateBot(BotStrategy):
     """Intermediate bot with card counting, void detection, and positional play."""
 
-    def __init__(self):
+    def __init__(
+        self, params: BotParams | None = None,
+        table: TranspositionTable | None = shared_table,
+    ):
+        self.params = params or default_params()
+        self.table = table
+        self._salt = hash((type(self).__name__, self.params))
         self._played_cards: set[tuple[str, str]] = set()
 
     def _track_played_cards(self, state: GameState):
@@ -48,20 +57,21 @@ class IntermediateBot(BotStrategy):
         self._track_played_cards(state)
         trump_suit = state.round_state.trump_suit if state.round_state else None
 
+        p = self.params
         expected_wins = 0.0
         hand = player.hand
 
         for card in hand:
             if trump_suit and card.suit == trump_suit:
                 # High trump is very likely to win
-                if card.rank.value_order >= Rank.QUEEN.value_order:
-                    expected_wins += 0.9
-                elif card.rank.value_order >= Rank.TEN.value_order:
-                    expected_wins += 0.7
-                elif card.rank.value_order >= Rank.SEVEN.value_order:
-                    expected_wins += 0.4
+                if card.rank.value_order >= p.inter_trump_top_rank:
+                    expected_wins += p.inter_trump_top_weight
+                elif card.rank.value_order >= p.inter_trump_high_rank:
+                    expected_wins += p.inter_trump_high_weight
+                elif card.rank.value_order >= p.inter_trump_mid_rank:
+                    expected_wins += p.inter_trump_mid_weight
                 else:
-                    expected_wins += 0.2
+                    expected_wins += p.inter_trump_low_weight
             else:
                 # Non-trump high cards
                 if card.rank == Rank.ACE:
@@ -71,14 +81,14 @@ class IntermediateBot(BotStrategy):
                         if trump_suit else 0
                     )
                     void_chance = 1.0 - (trump_remaining / 13.0) if trump_remaining > 0 else 1.0
-                    expected_wins += 0.6 * void_chance + 0.3
+                    expected_wins += p.inter_ace_void_weight * void_chance + p.inter_ace_base_weight
                 elif card.rank == Rank.KING:
-                    expected_wins += 0.35
+                    expected_wins += p.inter_king_weight
                 elif card.rank == Rank.QUEEN:
-                    expected_wins += 0.15
+                    expected_wins += p.inter_queen_weight
 
         # Adjust for position (later positions have slight advantage)
-        position_bonus = player.seat_index * 0.05
+        position_bonus = player.seat_index * p.inter_position_bonus
 
         bid = round(expected_wins + position_bonus)
         hand_size = state.round_state.hand_size if state.round_state else 1
@@ -94,17 +104,32 @@ class IntermediateBot(BotStrategy):
         if len(valid_cards) == 1:
             return valid_cards[0]
 
+        tricks_needed = (player.bid or 0) - player.tricks_won
+
+        # Same hand in the same public position decides the same way; reuse it
+        key = None
+        if self.table is not None:
+            key = position_key(state, player.hand, tricks_needed, self._salt)
+            cached = self.table.probe(key)
+            if cached is not None:
+                for card in valid_cards:
+                    if card_index(card) == cached:
+                        return card
+
         self._track_played_cards(state)
 
         rs = state.round_state
         trump_suit = rs.trump_suit if rs else None
-        tricks_needed = (player.bid or 0) - player.tricks_won
         is_leading = not rs.current_trick if rs else True
 
         if is_leading:
-            return self._choose_lead(player, state, valid_cards, tricks_needed, trump_suit)
+            card = self._choose_lead(player, state, valid_cards, tricks_needed, trump_suit)
         else:
-            return self._choose_follow(player, state, valid_cards, tricks_needed, trump_suit)
+            card = self._choose_follow(player, state, valid_cards, tricks_needed, trump_suit)
+
+        if key is not None:
+            self.table.store(key, card_index(card), depth=len(player.hand))
+        return card
 
     def _choose_lead(
         self, player: PlayerState, state: GameState, valid_cards: list[Card],
@@ -160,8 +185,8 @@ class IntermediateBot(BotStrategy):
             # All cards would win — play lowest
             return min(valid_cards, key=lambda c: self._card_strength(c, trump_suit))
 
-    def _card_strength(self, card: Card, trump_suit: Suit | None) -> int:
+    def _card_strength(self, card: Card, trump_suit: Suit | None) -> float:
         base = card.rank.value_order
         if trump_suit and card.suit == trump_suit:
-            base += 20
+            base += self.params.inter_trump_bonus
         return base
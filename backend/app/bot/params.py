@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass, fields
+from functools import cache
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BotParams:
+    """Tunable weights and thresholds shared by the heuristic bots.
+
+    Rank thresholds are indices into Rank (TWO=0 … ACE=12). Defaults reproduce the
+    original hand-picked constants.
+    """
+
+    # BasicBot: card ordering when choosing what to play, then bidding
+    basic_trump_bonus: float = 20.0
+    basic_trump_high_rank: int = 9  # JACK
+    basic_trump_high_weight: float = 1.0
+    basic_trump_mid_rank: int = 7  # NINE
+    basic_trump_mid_weight: float = 0.5
+    basic_ace_weight: float = 0.7
+
+    # IntermediateBot: card ordering, then bidding
+    inter_trump_bonus: float = 20.0
+    inter_trump_top_rank: int = 10  # QUEEN
+    inter_trump_top_weight: float = 0.9
+    inter_trump_high_rank: int = 8  # TEN
+    inter_trump_high_weight: float = 0.7
+    inter_trump_mid_rank: int = 5  # SEVEN
+    inter_trump_mid_weight: float = 0.4
+    inter_trump_low_weight: float = 0.2
+    inter_ace_void_weight: float = 0.6
+    inter_ace_base_weight: float = 0.3
+    inter_king_weight: float = 0.35
+    inter_queen_weight: float = 0.15
+    inter_position_bonus: float = 0.05
+
+    def to_vector(self) -> list[float]:
+        return [float(getattr(self, f.name)) for f in fields(self)]
+
+    @classmethod
+    def from_vector(cls, vector: list[float]) -> BotParams:
+        """Build params from a vector, clamping to PARAM_BOUNDS and rounding rank fields."""
+        values = {}
+        for f, v in zip(fields(cls), vector, strict=True):
+            lo, hi = PARAM_BOUNDS[f.name]
+            v = min(max(v, lo), hi)
+            values[f.name] = round(v) if f.type == "int" else v
+        return cls(**values)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> BotParams:
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+PARAM_BOUNDS: dict[str, tuple[float, float]] = {
+    "basic_trump_bonus": (0.0, 20.0),
+    "basic_trump_high_rank": (0, 12),
+    "basic_trump_high_weight": (0.0, 1.0),
+    "basic_trump_mid_rank": (0, 12),
+    "basic_trump_mid_weight": (0.0, 1.0),
+    "basic_ace_weight": (0.0, 1.0),
+    "inter_trump_bonus": (0.0, 20.0),
+    "inter_trump_top_rank": (0, 12),
+    "inter_trump_top_weight": (0.0, 1.0),
+    "inter_trump_high_rank": (0, 12),
+    "inter_trump_high_weight": (0.0, 1.0),
+    "inter_trump_mid_rank": (0, 12),
+    "inter_trump_mid_weight": (0.0, 1.0),
+    "inter_trump_low_weight": (0.0, 1.0),
+    "inter_ace_void_weight": (0.0, 1.0),
+    "inter_ace_base_weight": (0.0, 1.0),
+    "inter_king_weight": (0.0, 1.0),
+    "inter_queen_weight": (0.0, 1.0),
+    "inter_position_bonus": (0.0, 0.3),
+}
+
+
+def load_params(path: Path | None = None) -> BotParams:
+    """Load a tuned parameter file, falling back to defaults if it is missing or bad."""
+    path = Path(settings.bot_params_path) if path is None else path
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return BotParams()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read bot params from {path}: {e}")
+        return BotParams()
+    params = BotParams.from_dict(data.get("params", {}))
+    logger.info(f"Loaded bot params version {data.get('version')} from {path}")
+    return params
+
+
+def save_params(params: BotParams, path: Path | None = None, **metadata) -> int:
+    """Write params with the next version number. Returns the version written."""
+    path = Path(settings.bot_params_path) if path is None else path
+    try:
+        version = int(json.loads(path.read_text()).get("version", 0)) + 1
+    except (OSError, ValueError):
+        version = 1
+    payload = {"version": version, **metadata, "params": params.to_dict()}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, indent=2) + "\n")
+    tmp.replace(path)
+    return version
+
+
+@cache
+def default_params() -> BotParams:
+    """Params bots use when none are passed in; read once per process."""
+    return load_params()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from app.bot.strategy import BotStrategy
+from app.game.engine import GameEngine
+from app.game.types import GamePhase
+
+
+def play_turn(engine: GameEngine, bot: BotStrategy) -> None:
+    """Make one bid or play for the current player using the given strategy."""
+    current_id = engine.get_current_player_id()
+    player = engine.state.get_player(current_id) if current_id else None
+    if not player:
+        raise ValueError("No current player")
+
+    if engine.phase == GamePhase.BIDDING:
+        valid_bids = engine.get_valid_bids_for_player(player.player_id)
+        engine.place_bid(player.player_id, bot.choose_bid(player, engine.state, valid_bids))
+    elif engine.phase == GamePhase.PLAYING:
+        valid_cards = engine.get_valid_cards_for_player(player.player_id)
+        engine.play_card(player.player_id, bot.choose_card(player, engine.state, valid_cards))
+    else:
+        raise ValueError(f"Cannot take a turn in phase {engine.phase}")
+
+
+def play_to_completion(engine: GameEngine, bots: dict[str, BotStrategy]) -> None:
+    """Drive a started game to GAME_OVER with no delays, one strategy per seat."""
+    while engine.phase not in (GamePhase.GAME_OVER, GamePhase.FINISHED):
+        if engine.phase == GamePhase.SCORING:
+            engine.advance_to_next_round()
+            continue
+        current_id = engine.get_current_player_id()
+        if not current_id:
+            break
+        play_turn(engine, bots[current_id])
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import random
+from array import array
+from dataclasses import dataclass
+
+from app.game.deck import card_index
+from app.game.types import Card, GameState, Suit
+
+MASK64 = (1 << 64) - 1
+MAX_TRICK_POSITIONS = 7
+MAX_TRICKS_NEEDED = 13
+
+
+class ZobristKeys:
+    """Random 64-bit keys for each (card, location) and context feature.
+
+    A position hash is the XOR of the keys of everything in it, so it can be built
+    incrementally and two positions that differ in any card location hash apart
+    with overwhelming probability. Keys come from a fixed seed so every process
+    (and every test run) agrees on them.
+    """
+
+    def __init__(self, seed: int = 0x0DDBA11):
+        rng = random.Random(seed)
+
+        def draw(n: int) -> list[int]:
+            return [rng.getrandbits(64) for _ in range(n)]
+
+        self.in_hand = draw(52)
+        self.played = draw(52)
+        self.in_trick = [draw(52) for _ in range(MAX_TRICK_POSITIONS)]
+        self.trump = draw(len(Suit) + 1)  # last slot: no trump
+        self.tricks_needed = draw(2 * MAX_TRICKS_NEEDED + 1)
+
+
+ZOBRIST = ZobristKeys()
+
+
+def position_key(
+    state: GameState, hand: list[Card], tricks_needed: int, salt: int = 0,
+) -> int:
+    """Hash of the public position plus one player's hand.
+
+    Covers everything a card-play decision can see: cards in hand, cards played in
+    completed tricks, the current trick in order, the trump suit and how many tricks
+    the player still needs. `salt` separates strategies/parameter sets.
+    """
+    z = ZOBRIST
+    h = salt & MASK64
+    for c in hand:
+        h ^= z.in_hand[card_index(c)]
+
+    rs = state.round_state
+    if rs:
+        for trick in rs.tricks:
+            for tc in trick:
+                h ^= z.played[card_index(tc.card)]
+        for pos, tc in enumerate(rs.current_trick[:MAX_TRICK_POSITIONS]):
+            h ^= z.in_trick[pos][card_index(tc.card)]
+        trump = list(Suit).index(rs.trump_suit) if rs.trump_suit else len(Suit)
+    else:
+        trump = len(Suit)
+    h ^= z.trump[trump]
+
+    needed = max(-MAX_TRICKS_NEEDED, min(MAX_TRICKS_NEEDED, tricks_needed))
+    h ^= z.tricks_needed[needed + MAX_TRICKS_NEEDED]
+    return h
+
+
+@dataclass
+class TableStats:
+    probes: int = 0
+    hits: int = 0
+    stores: int = 0
+    overwrites: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class TranspositionTable:
+    """Fixed-size, set-associative cache of search results keyed by position hash.
+
+    Storage is preallocated flat arrays (`2**size_log2` buckets × `ways` slots), so
+    memory is fixed at construction no matter how many rooms or bots use it. The low
+    bits of the key pick the bucket; the full key is stored to reject collisions.
+
+    Replacement within a full bucket prefers slots from an older generation, then
+    the shallowest stored depth, so expensive deep results survive a flood of
+    shallow ones. The generation advances automatically every `capacity // 4`
+    stores, letting stale entries age out without any per-room bookkeeping.
+    """
+
+    EMPTY = 0
+
+    def __init__(self, size_log2: int = 16, ways: int = 4):
+        self.ways = ways
+        self.capacity = (1 << size_log2) * ways
+        self._bucket_mask = (1 << size_log2) - 1
+        self._keys = array("Q", bytes(8 * self.capacity))
+        self._values = array("i", bytes(4 * self.capacity))
+        self._depths = array("b", bytes(self.capacity))
+        self._ages = array("H", bytes(2 * self.capacity))
+        self._age = 1
+        self._stores_this_age = 0
+        self.stats = TableStats()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.itemsize * len(a) for a in (self._keys, self._values, self._depths, self._ages)
+        )
+
+    def probe(self, key: int, min_depth: int = 0) -> int | None:
+        """Return the stored value for `key` if present at `min_depth` or deeper."""
+        key = (key & MASK64) or 1  # 0 marks an empty slot
+        self.stats.probes += 1
+        base = (key & self._bucket_mask) * self.ways
+        for i in range(base, base + self.ways):
+            if self._keys[i] == key:
+                if self._depths[i] < min_depth:
+                    return None
+                self._ages[i] = self._age  # refresh so hot entries stay young
+                self.stats.hits += 1
+                return self._values[i]
+        return None
+
+    def store(self, key: int, value: int, depth: int = 0) -> None:
+        key = (key & MASK64) or 1
+        depth = max(-128, min(127, depth))
+        base = (key & self._bucket_mask) * self.ways
+        victim = base
+        victim_score = None
+        for i in range(base, base + self.ways):
+            stored = self._keys[i]
+            if stored == key:
+                if depth < self._depths[i] and self._ages[i] == self._age:
+                    return  # keep the deeper current result
+                victim = i
+                break
+            if stored == self.EMPTY:
+                victim = i
+                break
+            score = (self._ages[i] == self._age, self._depths[i])
+            if victim_score is None or score < victim_score:
+                victim, victim_score = i, score
+        else:
+            self.stats.overwrites += 1
+
+        self._keys[victim] = key
+        self._values[victim] = value
+        self._depths[victim] = depth
+        self._ages[victim] = self._age
+        self.stats.stores += 1
+
+        self._stores_this_age += 1
+        if self._stores_this_age >= self.capacity // 4:
+            self._stores_this_age = 0
+            self._age = self._age % 0xFFFF + 1
+
+    def clear(self) -> None:
+        self._keys = array("Q", bytes(8 * self.capacity))
+        self._values = array("i", bytes(4 * self.capacity))
+        self._depths = array("b", bytes(self.capacity))
+        self._ages = array("H", bytes(2 * self.capacity))
+        self._age = 1
+        self._stores_this_age = 0
+        self.stats = TableStats()
+
+
+# Process-wide table shared by every room's bots
+shared_table = TranspositionTable()
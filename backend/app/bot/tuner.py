@@ -0,0 +1,186 @@
+"""Self-play parameter tuner for the heuristic bots.
+
+Usage:
+    python -m app.bot.tuner --bot basic --generations 20 --population 12 --games 48
+
+Each generation perturbs the incumbent parameter vector, plays every candidate
+against opponents using the current parameters, and keeps the best. All candidates in
+a generation play the same deals (common random numbers), so differences in score
+come from the parameters rather than the cards. The winner is written to
+BOT_PARAMS_PATH with a bumped version, which bots load at startup.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+
+from app.bot.basic import BasicBot
+from app.bot.intermediate import IntermediateBot
+from app.bot.params import PARAM_BOUNDS, BotParams, load_params, save_params
+from app.bot.selfplay import play_to_completion
+from app.config import settings
+from app.game.engine import GameEngine
+from app.game.types import GameConfig
+
+logger = logging.getLogger(__name__)
+
+BOT_CLASSES = {"basic": BasicBot, "intermediate": IntermediateBot}
+FIELD_PREFIXES = {"basic": "basic_", "intermediate": "inter_"}
+
+
+def evaluate(
+    kind: str, vector: list[float], baseline: list[float], seeds: list[int],
+    num_players: int, max_hand_size: int | None,
+) -> float:
+    """Mean score margin of one candidate seat over the baseline seats across seeds.
+
+    The candidate's seat rotates with the seed so no parameter set gets a fixed
+    positional advantage.
+    """
+    bot_class = BOT_CLASSES[kind]
+    candidate = BotParams.from_vector(vector)
+    opponent = BotParams.from_vector(baseline)
+    total = 0.0
+    for seed in seeds:
+        seat = seed % num_players
+        engine = GameEngine(
+            room_code="TUNE", config=GameConfig(max_hand_size=max_hand_size),
+            rng=random.Random(seed),
+        )
+        bots = {}
+        for i in range(num_players):
+            pid = f"seat_{i}"
+            engine.add_player(pid, pid, is_bot=True)
+            bots[pid] = bot_class(candidate if i == seat else opponent)
+        engine.start_game("seat_0")
+        play_to_completion(engine, bots)
+
+        scores = [p.score for p in engine.players]
+        others = [s for i, s in enumerate(scores) if i != seat]
+        total += scores[seat] - sum(others) / len(others)
+    return total / len(seeds)
+
+
+def _perturb(
+    vector: list[float], tunable: list[int], sigma: float, rng: random.Random,
+) -> list[float]:
+    names = [f.name for f in fields(BotParams)]
+    out = list(vector)
+    for i in tunable:
+        lo, hi = PARAM_BOUNDS[names[i]]
+        out[i] = min(max(out[i] + rng.gauss(0.0, sigma * (hi - lo)), lo), hi)
+    return BotParams.from_vector(out).to_vector()
+
+
+def _score_candidates(
+    pool: ProcessPoolExecutor, kind: str, candidates: list[list[float]],
+    baseline: list[float], seeds: list[int], num_players: int,
+    max_hand_size: int | None, chunk: int,
+) -> list[float]:
+    """Evaluate every candidate on the same seeds, split into chunks across the pool."""
+    chunks = [seeds[i:i + chunk] for i in range(0, len(seeds), chunk)]
+    futures = [
+        [
+            pool.submit(evaluate, kind, vec, baseline, part, num_players, max_hand_size)
+            for part in chunks
+        ]
+        for vec in candidates
+    ]
+    return [
+        sum(f.result() * len(part) for f, part in zip(fs, chunks, strict=True)) / len(seeds)
+        for fs in futures
+    ]
+
+
+def tune(
+    kind: str, generations: int, population: int, games: int, num_players: int,
+    sigma: float, seed: int, workers: int, max_hand_size: int | None,
+    start: BotParams,
+) -> tuple[BotParams, float, float]:
+    """Run the search. Returns (best params, validation margin, baseline margin)."""
+    rng = random.Random(seed)
+    names = [f.name for f in fields(BotParams)]
+    tunable = [i for i, n in enumerate(names) if n.startswith(FIELD_PREFIXES[kind])]
+    baseline = start.to_vector()
+    incumbent = list(baseline)
+    chunk = max(1, games // max(workers, 1))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for gen in range(generations):
+            started = time.monotonic()
+            seeds = [rng.randrange(2**31) for _ in range(games)]
+            candidates = [incumbent] + [
+                _perturb(incumbent, tunable, sigma, rng) for _ in range(population)
+            ]
+            scores = _score_candidates(
+                pool, kind, candidates, baseline, seeds, num_players, max_hand_size, chunk,
+            )
+            best = max(range(len(candidates)), key=scores.__getitem__)
+            if best != 0:
+                incumbent = candidates[best]
+                sigma = min(sigma * 1.2, 0.5)
+            else:
+                sigma = max(sigma * 0.85, 0.01)
+            logger.info(
+                f"gen {gen + 1}/{generations}: incumbent={scores[0]:+.2f} "
+                f"best={scores[best]:+.2f} sigma={sigma:.3f} "
+                f"({time.monotonic() - started:.1f}s)"
+            )
+
+        # Fresh deals for validation so the reported margin isn't selection-biased
+        holdout = [rng.randrange(2**31) for _ in range(games * 2)]
+        validation, control = _score_candidates(
+            pool, kind, [incumbent, baseline], baseline, holdout,
+            num_players, max_hand_size, chunk,
+        )
+    return BotParams.from_vector(incumbent), validation, control
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Tune heuristic bot parameters by self-play")
+    parser.add_argument("--bot", choices=sorted(BOT_CLASSES), default="basic")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=12)
+    parser.add_argument("--games", type=int, default=48, help="deals per candidate")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--max-hand-size", type=int, default=None)
+    parser.add_argument("--sigma", type=float, default=0.15, help="step, fraction of range")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--params", type=Path, default=Path(settings.bot_params_path))
+    parser.add_argument("--force", action="store_true", help="write even if not better")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    start = load_params(args.params)
+    started = time.monotonic()
+    best, validation, control = tune(
+        kind=args.bot, generations=args.generations, population=args.population,
+        games=args.games, num_players=args.players, sigma=args.sigma, seed=args.seed,
+        workers=args.workers, max_hand_size=args.max_hand_size, start=start,
+    )
+    logger.info(
+        f"validation margin {validation:+.2f} vs {control:+.2f} for current params "
+        f"({time.monotonic() - started:.0f}s)"
+    )
+
+    if validation <= control and not args.force:
+        logger.info("No improvement on held-out deals; params file left unchanged")
+        return
+    version = save_params(
+        best, args.params,
+        bot=args.bot, players=args.players, games=args.games,
+        generations=args.generations, seed=args.seed,
+        validation_margin=round(validation, 3),
+    )
+    logger.info(f"Wrote {args.params} version {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,169 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterable
+
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.metrics import db_pool_checkout_seconds
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_pool(name: str) -> type[AsyncAdaptedQueuePool]:
+    """A queue pool class that reports how long each checkout waited."""
+    histogram = db_pool_checkout_seconds.labels(name)
 
-engine = create_async_engine(settings.database_url, echo=False)
+    class TimedQueuePool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+    return TimedQueuePool
+
+
+engine = create_async_engine(settings.database_url, echo=False, poolclass=_timed_pool("primary"))
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Optional read replica; without one, reads use the primary
+read_engine = (
+    create_async_engine(
+        settings.read_database_url, echo=False, pool_pre_ping=True,
+        poolclass=_timed_pool("replica"),
+    )
+    if settings.read_database_url
+    else None
+)
+replica_session = (
+    async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine
+    else None
+)
+
+REPLICA_ERRORS = (OperationalError, InterfaceError, OSError, TimeoutError)
+
+
+class ReadRouting:
+    """Decides whether a read may go to the replica.
+
+    A replica that failed is skipped for `cooldown` seconds. Users whose game
+    results were just written read from the primary for `write_window` seconds,
+    so replication lag never hides their own latest game.
+    """
+
+    def __init__(self, cooldown: float, write_window: float):
+        self.cooldown = cooldown
+        self.write_window = write_window
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+        self._unhealthy_until = 0.0
+        self._recent_writes: dict[str, float] = {}  # user_id → primary-until
+
+    def note_write(self, user_ids: Iterable[object]):
+        until = time.monotonic() + self.write_window
+        for user_id in user_ids:
+            self._recent_writes[str(user_id)] = until
+        if len(self._recent_writes) > 10_000:
+            now = time.monotonic()
+            self._recent_writes = {u: t for u, t in self._recent_writes.items() if t > now}
+
+    def mark_unhealthy(self):
+        self._unhealthy_until = time.monotonic() + self.cooldown
+
+    def use_replica(self, user_id: str | None = None) -> bool:
+        if replica_session is None:
+            return False
+        now = time.monotonic()
+        if now < self._unhealthy_until:
+            return False
+        return user_id is None or self._recent_writes.get(str(user_id), 0.0) <= now
+
+    def stats(self) -> dict:
+        return {
+            "replica_configured": replica_session is not None,
+            "replica_healthy": time.monotonic() >= self._unhealthy_until,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+        }
+
+
+read_routing = ReadRouting(
+    cooldown=settings.read_replica_cooldown_seconds,
+    write_window=settings.read_your_writes_seconds,
+)
+
+
+class ReadSession:
+    """Read-only session that connects lazily and falls back to the primary.
+
+    Nothing connects until the first statement, so requests served from caches
+    never take a connection. If that first statement fails to reach the replica,
+    the replica is marked unhealthy and the statement is re-run on the primary.
+    Later statements stay on whichever server the first one used.
+    """
+
+    def __init__(self, on_replica: bool):
+        self._on_replica = on_replica
+        self._session = (replica_session if on_replica else async_session)()
+        self._started = False
+
+    async def execute(self, *args, **kwargs):
+        return await self._run("execute", args, kwargs)
+
+    async def stream(self, *args, **kwargs):
+        return await self._run("stream", args, kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._run("scalar", args, kwargs)
+
+    async def _run(self, method: str, args, kwargs):
+        first = not self._started
+        self._started = True
+        if first:
+            if self._on_replica:
+                read_routing.replica_reads += 1
+            else:
+                read_routing.primary_reads += 1
+        try:
+            return await getattr(self._session, method)(*args, **kwargs)
+        except REPLICA_ERRORS as e:
+            if not (first and self._on_replica):
+                raise
+            logger.warning(f"Read replica unavailable, using primary: {e}")
+            read_routing.mark_unhealthy()
+            read_routing.fallbacks += 1
+            await self._session.close()
+            self._on_replica = False
+            self._session = async_session()
+            return await getattr(self._session, method)(*args, **kwargs)
+
+    async def close(self):
+        await self._session.close()
+
 
 async def get_db():
     async with async_session() as session:
         yield session
+
+
+def open_read_session(user_id: str | None = None) -> ReadSession:
+    """Read session, on the replica unless `user_id` needs read-your-writes."""
+    return ReadSession(on_replica=read_routing.use_replica(user_id))
+
+
+async def get_read_db():
+    """Session for read-only routes with no per-user freshness requirement."""
+    session = open_read_session()
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -7,6 +7,11 @@ def create_deck() -> list[Card]:
     return [Card(suit=s, rank=r) for s in Suit for r in Rank]
 
 
+def card_index(card: Card) -> int:
+    """Position of the card in an unshuffled deck (0-51), for compact encodings."""
+    return list(Suit).index(card.suit) * 13 + card.rank.value_order
+
+
 def shuffle_deck(deck: list[Card], rng: random.Random | None = None) -> list[Card]:
     shuffled = deck.copy()
     if rng:
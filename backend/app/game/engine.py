@@ -33,12 +33,20 @@ class GameError(Exception):
 
 
 class GameEngine:
-    def __init__(self, room_code: str | None = None, config: GameConfig | None = None):
+    def __init__(
+        self,
+        room_code: str | None = None,
+        config: GameConfig | None = None,
+        rng: random.Random | None = None,
+    ):
         self.state = GameState(
             room_code=room_code or generate_room_code(),
             config=config or GameConfig(),
         )
-        self._rng = random.Random()
+        # Pass a seeded one for reproducible deals
+        self._rng = rng or random.Random()
+        # Bumped on every move or seating change; checkpoints skip unchanged rooms
+        self.revision = 0
 
     @property
     def phase(self) -> GamePhase:
@@ -72,6 +80,7 @@ class GameEngine:
             avatar_url=avatar_url,
         )
         self.state.players.append(player)
+        self.revision += 1
 
         if not self.state.host_id:
             self.state.host_id = player_id
@@ -87,6 +96,7 @@ class GameEngine:
             raise GameError("Player not in game")
 
         self.state.players.remove(player)
+        self.revision += 1
 
         # Re-seat remaining players
         for i, p in enumerate(self.state.players):
@@ -109,6 +119,7 @@ class GameEngine:
         self._start_round()
 
     def _start_round(self) -> None:
+        self.revision += 1
         sequence = self.state.round_sequence()
         if self.state.round_number >= len(sequence):
             self.state.phase = GamePhase.GAME_OVER
@@ -174,6 +185,7 @@ class GameEngine:
 
         rs.bids[player_id] = bid
         current_player.bid = bid
+        self.revision += 1
 
         # Move to next player
         if len(rs.bids) == self.state.player_count:
@@ -203,6 +215,7 @@ class GameEngine:
         # Remove card from hand and add to trick
         current_player.hand.remove(card)
         rs.current_trick.append(TrickCard(player_id=player_id, card=card))
+        self.revision += 1
 
         # If this is the first card, set lead suit
         if len(rs.current_trick) == 1:
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+
+from app.game.deck import card_index
+from app.game.scoring import calculate_score
+from app.game.types import GamePhase, GameState, ScoringVariant, Suit
+
+SUITS = list(Suit)
+
+
+def _suit_of(c: int) -> int:
+    return c // 13
+
+
+def _rank_of(c: int) -> int:
+    return c % 13
+
+
+@dataclass
+class PublicSnapshot:
+    """Everything the estimator may look at: only information every seat can see.
+
+    Built on the event loop from a live GameState, then handed to the estimator so
+    the engine can keep mutating while the simulation runs.
+    """
+
+    round_number: int
+    player_ids: list[str]  # by seat
+    hand_counts: list[int]
+    bids: list[int]
+    tricks_won: list[int]
+    scores: list[int]
+    tricks: list[list[tuple[int, int]]]  # (seat, card) per trick, current trick last
+    next_seat: int
+    trump_suit: int | None
+    trump_card: int | None
+    scoring_variant: ScoringVariant
+    remaining_hand_sizes: list[int]  # hand sizes of rounds after this one
+    made_rates: list[float]  # smoothed historical exact-bid rate per seat
+
+    @property
+    def plays(self) -> list[tuple[int, int, int]]:
+        """Flattened (seat, card, lead_suit) in play order."""
+        out = []
+        for trick in self.tricks:
+            if not trick:
+                continue
+            lead = _suit_of(trick[0][1])
+            out.extend((seat, c, lead) for seat, c in trick)
+        return out
+
+
+def snapshot_from_state(state: GameState) -> PublicSnapshot | None:
+    """Capture the public position, or None if there is nothing to estimate yet."""
+    rs = state.round_state
+    if state.phase != GamePhase.PLAYING or rs is None:
+        return None
+    players = sorted(state.players, key=lambda p: p.seat_index)
+    if any(p.bid is None for p in players):
+        return None
+
+    seat_of = {p.player_id: p.seat_index for p in players}
+    tricks = [
+        [(seat_of[tc.player_id], card_index(tc.card)) for tc in trick]
+        for trick in [*rs.tricks, rs.current_trick]
+    ]
+
+    made = {p.player_id: 0 for p in players}
+    rounds = 0
+    for round_scores in state.scores_history:
+        rounds += 1
+        for s in round_scores:
+            if s.bid == s.tricks_won and s.player_id in made:
+                made[s.player_id] += 1
+
+    sequence = state.round_sequence()
+    return PublicSnapshot(
+        round_number=state.round_number,
+        player_ids=[p.player_id for p in players],
+        hand_counts=[len(p.hand) for p in players],
+        bids=[p.bid or 0 for p in players],
+        tricks_won=[p.tricks_won for p in players],
+        scores=[p.score for p in players],
+        tricks=tricks,
+        next_seat=rs.current_player_seat,
+        trump_suit=SUITS.index(rs.trump_suit) if rs.trump_suit else None,
+        trump_card=card_index(rs.trump_card) if rs.trump_card else None,
+        scoring_variant=state.config.scoring_variant,
+        remaining_hand_sizes=sequence[state.round_number + 1:],
+        made_rates=[(made[p.player_id] + 1) / (rounds + 2) for p in players],
+    )
+
+
+@dataclass
+class Estimate:
+    round_number: int
+    trick_number: int
+    bid_success: dict[str, float]
+    win_probability: dict[str, float]
+    samples: int
+    reused: int
+
+    def to_dict(self) -> dict:
+        return {
+            "round_number": self.round_number + 1,  # 1-indexed for display
+            "trick_number": self.trick_number,
+            "players": [
+                {
+                    "player_id": pid,
+                    "bid_success": round(self.bid_success[pid], 3),
+                    "win_probability": round(self.win_probability[pid], 3),
+                }
+                for pid in self.bid_success
+            ],
+        }
+
+
+@dataclass
+class WinEstimator:
+    """Monte Carlo estimate of bid success and game win for one room.
+
+    Each sample is a deal of the unseen cards to the seats that is consistent with
+    everything played so far. Samples are kept between updates: when a card is
+    played, a sample that gave the card to someone else is repaired by swapping
+    rather than discarded, so only samples that cannot be made consistent (void
+    constraints) are replaced with fresh deals.
+    """
+
+    num_samples: int = 128
+    future_rollouts: int = 4
+    rng: random.Random = field(default_factory=random.Random)
+    _round: int = -1
+    _plays_seen: int = 0
+    _samples: list[list[list[int]]] = field(default_factory=list)
+
+    def update(self, snap: PublicSnapshot) -> Estimate:
+        plays = snap.plays
+        if snap.round_number != self._round or len(plays) < self._plays_seen:
+            self._round = snap.round_number
+            self._plays_seen = 0
+            self._samples = []
+
+        voids = _voids(plays, len(snap.player_ids))
+        new_plays = plays[self._plays_seen:]
+        self._plays_seen = len(plays)
+
+        kept = []
+        for sample in self._samples:
+            if self._advance(sample, new_plays, voids):
+                kept.append(sample)
+        reused = len(kept)
+
+        unseen = _unseen_cards(snap, plays)
+        while len(kept) < self.num_samples:
+            sample = self._deal(unseen, snap.hand_counts, voids)
+            if sample is None:
+                break
+            kept.append(sample)
+        self._samples = kept
+
+        n = len(snap.player_ids)
+        made = [0] * n
+        wins = [0.0] * n
+        for sample in kept:
+            final_tricks = _rollout(snap, sample)
+            round_points = [
+                calculate_score(snap.bids[s], final_tricks[s], snap.scoring_variant)
+                for s in range(n)
+            ]
+            for s in range(n):
+                if final_tricks[s] == snap.bids[s]:
+                    made[s] += 1
+            scores = [snap.scores[s] + round_points[s] for s in range(n)]
+            for share, seat in self._simulate_rest_of_game(snap, scores):
+                wins[seat] += share
+
+        total = max(len(kept), 1)
+        trick_number = len([t for t in snap.tricks if len(t) == n])
+        return Estimate(
+            round_number=snap.round_number,
+            trick_number=trick_number,
+            bid_success={pid: made[s] / total for s, pid in enumerate(snap.player_ids)},
+            win_probability={pid: wins[s] / total for s, pid in enumerate(snap.player_ids)},
+            samples=len(kept),
+            reused=reused,
+        )
+
+    def _advance(
+        self, sample: list[list[int]], new_plays: list[tuple[int, int, int]],
+        voids: list[set[int]],
+    ) -> bool:
+        """Apply plays to a sample, repairing it where possible. False if unusable."""
+        for seat, c, _lead in new_plays:
+            hand = sample[seat]
+            if c not in hand:
+                other = next((s for s, h in enumerate(sample) if c in h), None)
+                if other is None:
+                    # The card was in the undealt stock in this sample
+                    hand[self.rng.randrange(len(hand))] = c
+                    hand.remove(c)
+                    continue
+                # Give the holder one of our cards it is allowed to hold
+                swaps = [x for x in hand if _suit_of(x) not in voids[other]]
+                if not swaps:
+                    return False
+                x = self.rng.choice(swaps)
+                holder = sample[other]
+                hand[hand.index(x)] = c
+                holder[holder.index(c)] = x
+            hand.remove(c)
+        return all(
+            not any(_suit_of(x) in voids[s] for x in hand) for s, hand in enumerate(sample)
+        )
+
+    def _deal(
+        self, unseen: list[int], counts: list[int], voids: list[set[int]],
+        attempts: int = 20,
+    ) -> list[list[int]] | None:
+        """Deal unseen cards respecting known voids, most constrained seat first."""
+        order = sorted(range(len(counts)), key=lambda s: -len(voids[s]))
+        for _ in range(attempts):
+            pool = list(unseen)
+            self.rng.shuffle(pool)
+            hands: list[list[int]] = [[] for _ in counts]
+            ok = True
+            for seat in order:
+                allowed = [c for c in pool if _suit_of(c) not in voids[seat]]
+                if len(allowed) < counts[seat]:
+                    ok = False
+                    break
+                chosen = allowed[:counts[seat]]
+                hands[seat] = chosen
+                taken = set(chosen)
+                pool = [c for c in pool if c not in taken]
+            if ok:
+                return hands
+        return None
+
+    def _simulate_rest_of_game(
+        self, snap: PublicSnapshot, scores: list[int],
+    ) -> list[tuple[float, int]]:
+        """Play out remaining rounds with a per-seat make/miss model.
+
+        Returns (share, seat) pairs summing to 1.0, splitting ties evenly.
+        """
+        n = len(scores)
+        if not snap.remaining_hand_sizes:
+            return _winner_shares(scores, 1.0)
+
+        out: list[tuple[float, int]] = []
+        weight = 1.0 / self.future_rollouts
+        for _ in range(self.future_rollouts):
+            totals = list(scores)
+            for hand_size in snap.remaining_hand_sizes:
+                bid = round(hand_size / n)
+                for s in range(n):
+                    if self.rng.random() < snap.made_rates[s]:
+                        tricks = bid
+                    else:
+                        tricks = bid + 1 if bid == 0 or self.rng.random() < 0.5 else bid - 1
+                    totals[s] += calculate_score(bid, tricks, snap.scoring_variant)
+            out.extend(_winner_shares(totals, weight))
+        return out
+
+
+# Estimators of the rooms assigned to this process, when it is an estimate worker
+_room_estimators: dict[str, WinEstimator] = {}
+
+
+def update_room(room_code: str, snap: PublicSnapshot, num_samples: int) -> Estimate:
+    """Update a room's estimate in a worker process, which keeps its samples between calls."""
+    estimator = _room_estimators.get(room_code)
+    if estimator is None:
+        estimator = _room_estimators[room_code] = WinEstimator(num_samples=num_samples)
+    return estimator.update(snap)
+
+
+def forget_room(room_code: str) -> None:
+    _room_estimators.pop(room_code, None)
+
+
+def _winner_shares(scores: list[int], weight: float) -> list[tuple[float, int]]:
+    best = max(scores)
+    leaders = [s for s, v in enumerate(scores) if v == best]
+    return [(weight / len(leaders), s) for s in leaders]
+
+
+def _voids(plays: list[tuple[int, int, int]], n: int) -> list[set[int]]:
+    voids: list[set[int]] = [set() for _ in range(n)]
+    for seat, c, lead in plays:
+        if _suit_of(c) != lead:
+            voids[seat].add(lead)
+    return voids
+
+
+def _unseen_cards(snap: PublicSnapshot, plays: list[tuple[int, int, int]]) -> list[int]:
+    seen = {c for _, c, _ in plays}
+    if snap.trump_card is not None:
+        seen.add(snap.trump_card)
+    return [c for c in range(52) if c not in seen]
+
+
+def _beats(c: int, best: int, trump: int | None) -> bool:
+    if _suit_of(c) == _suit_of(best):
+        return _rank_of(c) > _rank_of(best)
+    return trump is not None and _suit_of(c) == trump
+
+
+def _strength(c: int, trump: int | None) -> int:
+    return _rank_of(c) + (20 if trump is not None and _suit_of(c) == trump else 0)
+
+
+def _rollout(snap: PublicSnapshot, sample: list[list[int]]) -> list[int]:
+    """Finish the round greedily: seats that still need tricks try to win, others duck."""
+    n = len(snap.player_ids)
+    trump = snap.trump_suit
+    hands = [list(h) for h in sample]
+    tricks = list(snap.tricks_won)
+    current = list(snap.tricks[-1]) if snap.tricks and len(snap.tricks[-1]) < n else []
+    seat = snap.next_seat
+
+    while any(hands):
+        hand = hands[seat]
+        if not hand:
+            break
+        needs = snap.bids[seat] - tricks[seat] > 0
+        if not current:
+            pick = max if needs else min
+            card = pick(hand, key=lambda c: _strength(c, trump))
+        else:
+            lead = _suit_of(current[0][1])
+            valid = [c for c in hand if _suit_of(c) == lead] or hand
+            best = current[0][1]
+            for _, c in current[1:]:
+                if _beats(c, best, trump):
+                    best = c
+            winners = [c for c in valid if _beats(c, best, trump)]
+            losers = [c for c in valid if not _beats(c, best, trump)]
+            if needs and winners:
+                card = min(winners, key=lambda c: _strength(c, trump))
+            elif not needs and losers:
+                card = max(losers, key=lambda c: _strength(c, trump))
+            else:
+                card = min(valid, key=lambda c: _strength(c, trump))
+        hand.remove(card)
+        current.append((seat, card))
+
+        if len(current) == n:
+            winner, best = current[0]
+            for s, c in current[1:]:
+                if _beats(c, best, trump):
+                    winner, best = s, c
+            tricks[winner] += 1
+            current = []
+            seat = winner
+        else:
+            seat = (seat + 1) % n
+    return tricks
@@ -0,0 +1,142 @@
+"""Compact snapshots of a GameEngine, used to checkpoint live rooms.
+
+`dump_state` packs the game state into nested JSON lists, with cards as deck
+indexes and players as seat numbers after the first mention. `dump_rng` packs the
+shuffling RNG's state as raw 32-bit words; it only changes when a round is dealt,
+so callers can reuse it between deals. `load_engine` reverses both. Connection
+flags are not saved: a restored game starts with every human disconnected.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import weakref
+
+from app.game.deck import create_deck
+from app.game.engine import GameEngine
+from app.game.types import (
+    GameConfig,
+    GamePhase,
+    PlayerState,
+    RoundScoreEntry,
+    RoundState,
+    ScoringVariant,
+    Suit,
+    TrickCard,
+)
+
+FORMAT_VERSION = 1
+
+_DECK = create_deck()
+_INDEX = {card: i for i, card in enumerate(_DECK)}
+# Mersenne Twister state: 624 words plus the position
+_RNG_WORDS = struct.Struct("<625I")
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+# Scores history only ever grows, so each engine's finished rounds are encoded once
+_history_parts: weakref.WeakKeyDictionary[GameEngine, list[str]] = weakref.WeakKeyDictionary()
+
+
+class CheckpointFormatError(ValueError):
+    pass
+
+
+def dump_state(engine: GameEngine) -> bytes:
+    state = engine.state
+    cfg = state.config
+    rs = state.round_state
+    seat = {p.player_id: p.seat_index for p in state.players}
+
+    def trick(cards: list[TrickCard]) -> list:
+        return [[seat[tc.player_id], _INDEX[tc.card]] for tc in cards]
+
+    packed = [
+        FORMAT_VERSION,
+        state.room_code,
+        state.phase.value,
+        state.host_id,
+        [cfg.scoring_variant.value, cfg.hook_rule, cfg.turn_timer_seconds,
+         cfg.max_players, cfg.max_hand_size],
+        [
+            [p.player_id, p.display_name, p.seat_index, p.is_bot, p.avatar_url,
+             [_INDEX[c] for c in p.hand], p.bid, p.tricks_won, p.score]
+            for p in state.players
+        ],
+        None if rs is None else [
+            rs.round_number, rs.hand_size,
+            None if rs.trump_card is None else _INDEX[rs.trump_card],
+            rs.trump_suit and rs.trump_suit.value,
+            rs.dealer_seat, rs.current_player_seat,
+            [[seat[pid], bid] for pid, bid in rs.bids.items()],
+            [trick(t) for t in rs.tricks], trick(rs.current_trick),
+            rs.lead_suit and rs.lead_suit.value,
+        ],
+        state.round_number,
+        state.dealer_seat,
+    ]
+    parts = _history_parts.setdefault(engine, [])
+    del parts[len(state.scores_history):]  # only if history was replaced
+    for rnd in state.scores_history[len(parts):]:
+        parts.append(_dumps([
+            [seat[e.player_id], e.bid, e.tricks_won, e.round_points, e.cumulative_score]
+            for e in rnd
+        ]))
+    return f"{_dumps(packed)[:-1]},[{','.join(parts)}]]".encode()
+
+
+def dump_rng(engine: GameEngine) -> bytes:
+    _, words, gauss = engine._rng.getstate()
+    # gauss_next is only set by random.gauss, which dealing never calls
+    assert gauss is None
+    return _RNG_WORDS.pack(*words)
+
+
+def load_engine(blob: bytes, rng_blob: bytes) -> GameEngine:
+    packed = json.loads(blob)
+    if packed[0] != FORMAT_VERSION:
+        raise CheckpointFormatError(f"Unsupported checkpoint version {packed[0]}")
+    (_, room_code, phase, host_id, cfg, players, rs,
+     round_number, dealer_seat, history) = packed
+
+    engine = GameEngine(
+        room_code=room_code,
+        config=GameConfig(
+            scoring_variant=ScoringVariant(cfg[0]), hook_rule=cfg[1],
+            turn_timer_seconds=cfg[2], max_players=cfg[3], max_hand_size=cfg[4],
+        ),
+    )
+    state = engine.state
+    state.phase = GamePhase(phase)
+    state.host_id = host_id
+    state.players = [
+        PlayerState(
+            player_id=pid, display_name=name, seat_index=seat, is_bot=is_bot,
+            is_connected=is_bot, avatar_url=avatar, hand=[_DECK[i] for i in hand],
+            bid=bid, tricks_won=tricks, score=score,
+        )
+        for pid, name, seat, is_bot, avatar, hand, bid, tricks, score in players
+    ]
+    by_seat = [p.player_id for p in sorted(state.players, key=lambda p: p.seat_index)]
+
+    def untrick(cards: list) -> list[TrickCard]:
+        return [TrickCard(player_id=by_seat[s], card=_DECK[i]) for s, i in cards]
+
+    if rs is not None:
+        (rnum, hand_size, trump, trump_suit, dealer, current, bids,
+         tricks, current_trick, lead_suit) = rs
+        state.round_state = RoundState(
+            round_number=rnum, hand_size=hand_size,
+            trump_card=None if trump is None else _DECK[trump],
+            trump_suit=trump_suit and Suit(trump_suit),
+            dealer_seat=dealer, current_player_seat=current,
+            bids={by_seat[s]: bid for s, bid in bids},
+            tricks=[untrick(t) for t in tricks], current_trick=untrick(current_trick),
+            lead_suit=lead_suit and Suit(lead_suit),
+        )
+    state.round_number = round_number
+    state.dealer_seat = dealer_seat
+    state.scores_history = [
+        [RoundScoreEntry(by_seat[s], *rest) for s, *rest in rnd] for rnd in history
+    ]
+    engine._rng.setstate((3, _RNG_WORDS.unpack(rng_blob), None))
+    return engine
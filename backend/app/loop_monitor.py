@@ -0,0 +1,141 @@
+"""Event-loop lag sampling and a watchdog for stalls.
+
+A sampler task sleeps `interval` at a time and records how late it wakes up;
+that lag feeds /metrics and, smoothed, admission control. A watchdog thread
+watches the sampler's heartbeat: once the loop has been stuck for `threshold`
+seconds it captures the loop thread's stack and logs it, with the task that is
+running. Socket.IO handler tasks are named "sio:<event>:<sid>" and timer tasks
+after their room, so the report names the room and event at fault.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.config import settings
+from app.metrics import loop_lag_seconds, registry
+from app.sockets.manager import manager
+
+logger = logging.getLogger(__name__)
+
+loop_stalls = registry.counter(
+    "event_loop_stalls_total", "Times the event loop was blocked past the stall threshold",
+)
+
+
+def describe_task(name: str) -> dict:
+    """Room and event behind a task, from the names given to handler and timer tasks."""
+    kind, _, rest = name.partition(":")
+    if kind == "sio":
+        event, _, sid = rest.partition(":")
+        player_id = manager.sid_to_player.get(sid)
+        return {"event": event, "sid": sid, "room": manager.player_rooms.get(player_id)}
+    if kind in ("turn_timer", "bot_turns"):
+        return {"event": kind, "room": rest}
+    if kind == "grace":
+        return {"event": kind, "room": manager.player_rooms.get(rest)}
+    return {"task": name}
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float, smoothing: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.smoothing = smoothing
+        self.lag = 0.0  # lag of the last sample
+        self.smoothed = 0.0  # exponentially weighted lag, for load decisions
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.last_stall: dict | None = None
+        self._beat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = self._loop.create_task(self._sample())
+        self._stopping.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    def record(self, lag: float):
+        self.lag = lag
+        self.smoothed += self.smoothing * (lag - self.smoothed)
+        self.max_lag = max(self.max_lag, lag)
+        loop_lag_seconds.observe(lag)
+
+    async def _sample(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            self.record(max(0.0, now - started - self.interval))
+
+    # ── watchdog thread ───────────────────────────────────
+
+    def _watch(self):
+        reported = None
+        while not self._stopping.wait(self.threshold / 2):
+            beat = self._beat
+            if beat != reported and time.monotonic() - beat > self.threshold:
+                reported = beat
+                with contextlib.suppress(Exception):
+                    self._report_stall(time.monotonic() - beat)
+
+    def _report_stall(self, blocked: float):
+        frame = sys._current_frames().get(self._thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        # Called from the watchdog thread, so the loop is passed explicitly
+        task = asyncio.current_task(self._loop)
+        context = describe_task(task.get_name()) if task is not None else {}
+        self.stalls += 1
+        loop_stalls.inc()
+        self.last_stall = {"blocked_seconds": round(blocked, 3), **context}
+        where = " ".join(f"{k}={v}" for k, v in context.items()) or "outside any task"
+        logger.warning(
+            f"Event loop blocked for {blocked:.3f}s+ ({where}); loop thread stack:\n{stack}"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "lag": round(self.lag, 6),
+            "smoothed": round(self.smoothed, 6),
+            "max_lag": round(self.max_lag, 6),
+            "stalls": self.stalls,
+            "last_stall": self.last_stall,
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.loop_monitor_interval_seconds,
+    threshold=settings.loop_stall_threshold_seconds,
+)
+
+registry.gauge(
+    "event_loop_lag_smoothed_seconds", "Exponentially weighted event loop lag",
+    lambda: {(): loop_monitor.smoothed},
+)
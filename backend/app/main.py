@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import socketio
@@ -9,15 +10,80 @@ from fastapi.staticfiles import StaticFiles
 logging.basicConfig(level=logging.INFO)
 logging.getLogger("app").setLevel(logging.DEBUG)
 
+from app.api.admin import router as admin_router  # noqa: E402
 from app.api.auth import router as auth_router  # noqa: E402
 from app.api.health import router as health_router  # noqa: E402
 from app.api.lobby import router as lobby_router  # noqa: E402
+from app.api.metrics import router as metrics_router  # noqa: E402
 from app.api.users import router as users_router  # noqa: E402
 from app.config import settings  # noqa: E402
-from app.sockets.handlers import register_handlers  # noqa: E402
+from app.loop_monitor import loop_monitor  # noqa: E402
+from app.services.checkpoints import checkpoints  # noqa: E402
+from app.services.handoff import handoff  # noqa: E402
+from app.services.persistence_queue import persistence  # noqa: E402
+from app.services.purge import anonymous_purger  # noqa: E402
+from app.sockets import metrics as socket_metrics  # noqa: E402
+from app.sockets.admission import admission  # noqa: E402
+from app.sockets.estimates import estimates  # noqa: E402
+from app.sockets.handlers import (  # noqa: E402
+    notify_rooms_evicted,
+    register_handlers,
+    resume_lobby_updates,
+    resume_restored_games,
+)
 from app.sockets.lobby_namespace import LobbyNamespace  # noqa: E402
+from app.sockets.ratelimit import rate_limiter  # noqa: E402
+from app.sockets.reaper import reaper  # noqa: E402
+from app.sockets.sharding import shard  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Starting the worker early replays any games journaled while the DB was down
+    persistence.start()
+    loop_monitor.start()
+    if settings.anon_purge_enabled:
+        anonymous_purger.start()
+
+    async def restore_checkpoints():
+        await resume_restored_games(sio, await checkpoints.restore())
+
+    # Rooms another shard found in its handoff snapshot reach their owner as checkpoints
+    await shard.start(on_checkpointed=restore_checkpoints)
+    if settings.handoff_enabled:
+        handoff.install_signal_handler()
+        try:
+            await resume_restored_games(sio, *await handoff.restore())
+        except Exception as e:
+            logger.error(f"Could not restore rooms from handoff snapshot: {e}", exc_info=True)
+    if settings.checkpoint_enabled:
+        try:
+            await restore_checkpoints()
+        except Exception as e:
+            logger.error(f"Could not restore rooms from checkpoints: {e}", exc_info=True)
+        checkpoints.start()
+    reaper.start(lambda evicted: notify_rooms_evicted(sio, evicted))
+    if settings.admission_enabled:
+        admission.start(on_recovered=lambda: resume_lobby_updates(sio))
+    yield
+    await admission.stop()
+    await reaper.stop()
+    if settings.handoff_enabled:
+        try:
+            await handoff.drain_and_snapshot()
+        except Exception as e:
+            logger.error(f"Room handoff snapshot failed: {e}", exc_info=True)
+    await checkpoints.stop()
+    await estimates.stop()
+    await shard.stop()
+    await anonymous_purger.stop()
+    await persistence.stop()
+    await loop_monitor.stop()
+
 
-app = FastAPI(title="Oh Hell Online", version="0.1.0")
+app = FastAPI(title="Oh Hell Online", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,6 +98,9 @@ app.include_router(health_router, prefix="/api")
 app.include_router(auth_router, prefix="/api/auth")
 app.include_router(lobby_router, prefix="/api/lobby")
 app.include_router(users_router, prefix="/api/users")
+app.include_router(admin_router, prefix="/api/admin")
+# Prometheus scrape endpoint, at the conventional path
+app.include_router(metrics_router)
 
 # Socket.IO server
 sio = socketio.AsyncServer(
@@ -39,9 +108,17 @@ sio = socketio.AsyncServer(
     cors_allowed_origins=[settings.frontend_url, "http://localhost:5173"],
     logger=False,
     engineio_logger=False,
+    # With several shards, emits travel over the shard bus to whichever worker holds the client
+    client_manager=shard.client_manager(),
 )
 
 register_handlers(sio)
+shard.attach(sio)
+if settings.rate_limit_enabled:
+    rate_limiter.attach(sio)
+handoff.attach(sio)
+admission.attach(sio)
+socket_metrics.attach(sio)
 sio.register_namespace(LobbyNamespace("/lobby"))
 
 # Mount Socket.IO as ASGI sub-app
@@ -0,0 +1,224 @@
+"""Process metrics in the Prometheus text exposition format, served at /metrics.
+
+Instruments are plain objects updated in place: an observation is an attribute
+increment plus, for histograms, a bisect over the bucket bounds. Everything runs
+on the event loop thread, so no locks are needed. Gauges for state the server
+already holds (rooms, sids, timers) are computed only when scraped.
+"""
+from __future__ import annotations
+
+import math
+import os
+import resource
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+# Seconds; spans sub-millisecond handlers up to multi-second stalls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """The child for these label values; callers on hot paths should keep it."""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._child()
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_labels(self.label_names, values)} {_number(child.value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def _child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), child.counts, strict=True):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}"
+            labels = _labels(self.label_names, values)
+            yield f"{self.name}_sum{labels} {_number(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Gauge(_Metric):
+    """A value read at scrape time from `collect`, which returns {label values: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, collect: Callable[[], dict],
+                 labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def samples(self):
+        for values, value in self.collect().items():
+            yield f"{self.name}{_labels(self.label_names, values)} {_number(value)}"
+
+
+class CallbackCounter(Gauge):
+    """A counter read at scrape time, for totals something else already keeps."""
+
+    kind = "counter"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (),
+                  buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, collect: Callable[[], dict],
+              labels: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, collect, labels))
+
+    def callback_counter(self, name: str, help: str, collect: Callable[[], dict],
+                         labels: Iterable[str] = ()) -> CallbackCounter:
+        return self.register(CallbackCounter(name, help, collect, labels))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self.metrics.values()) + "\n"
+
+
+# Singleton registry and the instruments the rest of the server reports into
+registry = Registry()
+
+socket_handler_seconds = registry.histogram(
+    "socketio_handler_seconds", "Time spent in Socket.IO event handlers", labels=("event",),
+)
+socket_emitted_messages = registry.counter(
+    "socketio_emitted_messages_total", "Socket.IO event packets sent to clients",
+    labels=("event",),
+)
+socket_emitted_bytes = registry.counter(
+    "socketio_emitted_bytes_total",
+    "Encoded size of Socket.IO event packets sent to clients (characters)",
+    labels=("event",),
+)
+bot_decision_seconds = registry.histogram(
+    "bot_decision_seconds", "Time a bot takes to choose a bid or card", labels=("action",),
+)
+db_pool_checkout_seconds = registry.histogram(
+    "db_pool_checkout_seconds", "Wait for a database connection from the pool",
+    labels=("pool",),
+)
+loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a scheduled callback",
+)
+
+
+def _resident_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current size, where /proc isn't available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+registry.callback_counter(
+    "process_cpu_seconds_total", "User and system CPU time used by this process",
+    lambda: {(): time.process_time()},
+)
+registry.gauge(
+    "process_resident_memory_bytes", "Resident memory of this process",
+    lambda: {(): _resident_bytes()},
+)
@@ -1,5 +1,14 @@
-from app.models.game import Game, GameParticipant, GameRound, RoundScore
-from app.models.stats import UserStats
+from app.models.game import Game, GameParticipant, GameRound, RoomCheckpoint, RoundScore
+from app.models.stats import UserDailyStats, UserStats
 from app.models.user import User
 
-__all__ = ["User", "Game", "GameParticipant", "GameRound", "RoundScore", "UserStats"]
+__all__ = [
+    "User",
+    "Game",
+    "GameParticipant",
+    "GameRound",
+    "RoundScore",
+    "RoomCheckpoint",
+    "UserStats",
+    "UserDailyStats",
+]
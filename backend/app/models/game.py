@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, LargeBinary, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
@@ -8,9 +8,10 @@ from app.models.base import Base, TimestampMixin
 
 class Game(Base, TimestampMixin):
     __tablename__ = "games"
+    __table_args__ = (Index("ix_games_created_at_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    room_code: Mapped[str] = mapped_column(String(10), unique=True)
+    room_code: Mapped[str] = mapped_column(String(10), index=True)
     scoring_variant: Mapped[str] = mapped_column(String(20), default="standard")
     round_count: Mapped[int] = mapped_column(Integer)
     player_count: Mapped[int] = mapped_column(Integer)
@@ -24,6 +25,13 @@ class Game(Base, TimestampMixin):
 
 class GameParticipant(Base):
     __tablename__ = "game_participants"
+    __table_args__ = (
+        # Covers a user's match-history page without touching the heap
+        Index(
+            "ix_game_participants_user_id_game_id", "user_id", "game_id",
+            postgresql_include=["seat_index", "final_score", "final_rank"],
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     game_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("games.id"))
@@ -40,6 +48,7 @@ class GameParticipant(Base):
 
 class GameRound(Base):
     __tablename__ = "game_rounds"
+    __table_args__ = (Index("ix_game_rounds_game_id_round_number", "game_id", "round_number"),)
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     game_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("games.id"))
@@ -54,6 +63,10 @@ class GameRound(Base):
 
 class RoundScore(Base):
     __tablename__ = "round_scores"
+    __table_args__ = (
+        Index("ix_round_scores_round_id", "round_id"),
+        Index("ix_round_scores_participant_id", "participant_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     round_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("game_rounds.id"))
@@ -65,3 +78,14 @@ class RoundScore(Base):
 
     round: Mapped["GameRound"] = relationship(back_populates="scores")
     participant: Mapped["GameParticipant"] = relationship(back_populates="scores")
+
+
+class RoomCheckpoint(Base, TimestampMixin):
+    """Latest snapshot of a live room, used to restore games after a restart."""
+
+    __tablename__ = "room_checkpoints"
+
+    room_code: Mapped[str] = mapped_column(String(10), primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer)
+    state: Mapped[bytes] = mapped_column(LargeBinary)
+    rng_state: Mapped[bytes] = mapped_column(LargeBinary)
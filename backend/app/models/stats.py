@@ -1,6 +1,7 @@
 import uuid
+from datetime import date
 
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import Date, ForeignKey, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base, TimestampMixin
@@ -10,13 +11,27 @@ class UserStats(Base, TimestampMixin):
     __tablename__ = "user_stats"
 
     user_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id"), primary_key=True
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
     )
     games_played: Mapped[int] = mapped_column(Integer, default=0)
-    games_won: Mapped[int] = mapped_column(Integer, default=0)
+    games_won: Mapped[int] = mapped_column(Integer, default=0, index=True)
     total_rounds: Mapped[int] = mapped_column(Integer, default=0)
     exact_bids: Mapped[int] = mapped_column(Integer, default=0)
     total_bids: Mapped[int] = mapped_column(Integer, default=0)
     best_score: Mapped[int] = mapped_column(Integer, default=0)
     current_streak: Mapped[int] = mapped_column(Integer, default=0)
     best_streak: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class UserDailyStats(Base):
+    """Per-user totals for one UTC day; windowed leaderboards sum a few of these."""
+
+    __tablename__ = "user_daily_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    games_played: Mapped[int] = mapped_column(Integer, default=0)
+    games_won: Mapped[int] = mapped_column(Integer, default=0)
+    total_rounds: Mapped[int] = mapped_column(Integer, default=0)
+    exact_bids: Mapped[int] = mapped_column(Integer, default=0)
+    best_score: Mapped[int] = mapped_column(Integer, default=0)
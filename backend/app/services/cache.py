@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+MISSING: Any = object()
+
+
+class TTLCache:
+    """LRU cache whose entries also expire `ttl` seconds after being set.
+
+    Holds at most `maxsize` entries; the least recently used is evicted first.
+    Expired entries are dropped lazily when read.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # bumped by invalidate(); see set_if_current()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        item = self._data.get(key)
+        if item is None or item[0] <= self.clock():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def set_if_current(self, key: Hashable, value: Any, generation: int):
+        """Cache a value read when `generation` was current, unless invalidated since.
+
+        Stops a slow read that started before a write from caching the old value
+        after the write's invalidation.
+        """
+        if generation == self.generation:
+            self.set(key, value)
+
+    def invalidate(self, *keys: Hashable):
+        self.generation += 1
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class BatchLoader:
+    """Coalesces single-key lookups into batched `load_many` calls.
+
+    Keys requested within `window` seconds of the first pending one are fetched
+    together (or sooner, once `max_batch` are waiting), and concurrent requests for
+    the same key share one future until its batch completes. Results go into
+    `cache`, which is consulted first; keys `load_many` doesn't return resolve to
+    None and are cached as such. Invalidating the cache while a batch is in flight
+    keeps that batch's results out, and later requests wait for a fresh load.
+    """
+
+    def __init__(
+        self,
+        load_many: Callable[[list], Awaitable[dict]],
+        cache: TTLCache,
+        window: float = 0.005,
+        max_batch: int = 200,
+    ):
+        self.load_many = load_many
+        self.cache = cache
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.keys_loaded = 0
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        # Keys in a running batch → (future, cache generation when it was sent)
+        self._inflight: dict[Hashable, tuple[asyncio.Future, int]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def load(self, key: Hashable) -> Any:
+        value = self.cache.get(key)
+        if value is not MISSING:
+            return value
+
+        future = self._pending.get(key)
+        if future is None:
+            inflight = self._inflight.get(key)
+            if inflight is not None and inflight[1] == self.cache.generation:
+                future = inflight[0]
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            generation = self.cache.generation
+            for key, future in batch.items():
+                self._inflight[key] = (future, generation)
+            asyncio.get_running_loop().create_task(self._load_batch(batch, generation))
+
+    async def _load_batch(self, batch: dict[Hashable, asyncio.Future], generation: int):
+        self.batches += 1
+        self.keys_loaded += len(batch)
+        try:
+            found = await self.load_many(list(batch))
+            for key, future in batch.items():
+                value = found.get(key)
+                self.cache.set_if_current(key, value, generation)
+                if not future.done():
+                    future.set_result(value)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for key, future in batch.items():
+                if self._inflight.get(key, (None,))[0] is future:
+                    del self._inflight[key]
+                # Cancelled (at shutdown, or by a timeout around load_many): callers
+                # waiting on the batch are cancelled rather than left hanging
+                if not future.done():
+                    future.cancel()
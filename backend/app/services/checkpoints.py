@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.game.engine import GameEngine
+from app.game.serialization import dump_rng, dump_state, load_engine
+from app.game.types import GamePhase, RoundState
+from app.models.game import RoomCheckpoint
+from app.sockets.manager import manager
+from app.sockets.sharding import shard
+
+logger = logging.getLogger(__name__)
+
+# Lobbies hold no game to lose, and finished games are saved by the persistence queue
+CHECKPOINT_PHASES = (GamePhase.BIDDING, GamePhase.PLAYING, GamePhase.SCORING)
+
+
+@dataclass
+class CheckpointStats:
+    sweeps: int = 0
+    rooms_written: int = 0
+    rooms_deleted: int = 0
+    restored: int = 0
+    last_written: int = 0
+    last_encode_ms: float = 0.0
+    last_duration_ms: float = 0.0
+    failures: int = 0
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+def checkpoint_upsert(rows: list[dict]):
+    stmt = insert(RoomCheckpoint).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[RoomCheckpoint.room_code],
+        set_={
+            "revision": stmt.excluded.revision,
+            "state": stmt.excluded.state,
+            "rng_state": stmt.excluded.rng_state,
+            "updated_at": func.now(),
+        },
+    )
+
+
+class RoomCheckpointer:
+    """Periodically snapshots live rooms so their games survive a restart.
+
+    Each sweep re-encodes only rooms whose engine revision moved since their last
+    snapshot (an unchanged room costs one comparison), encoding and writing them
+    in batches of `batch_size` so the event loop gets a turn between batches. The
+    RNG state only changes when a round is dealt, so its packed form is reused
+    until the next deal. Checkpoints of rooms that finished or were cleaned up
+    are deleted in the same transaction.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        batch_size: int,
+        session_factory: Callable[[], AsyncSession] = async_session,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.stats = CheckpointStats()
+        self._saved: dict[str, int] = {}  # room_code → revision last written
+        self._rng: dict[str, tuple[RoundState | None, bytes]] = {}  # room_code → (deal, words)
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        """Rooms with a checkpoint on record."""
+        return len(self._saved)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop sweeping, then write a last checkpoint of every changed room."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Final room checkpoint failed: {e}", exc_info=True)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.stats.failures += 1
+                logger.error(f"Room checkpoint failed: {e}", exc_info=True)
+
+    def changed(self) -> tuple[list[GameEngine], list[str]]:
+        """Rooms changed since their last checkpoint, and room codes to delete."""
+        engines = []
+        live = set()
+        for code, engine in manager.games.items():
+            if engine.phase not in CHECKPOINT_PHASES:
+                continue
+            live.add(code)
+            if self._saved.get(code) != engine.revision:
+                engines.append(engine)
+        gone = [code for code in self._saved if code not in live]
+        for code in [code for code in self._rng if code not in live]:
+            del self._rng[code]
+        return engines, gone
+
+    def encode(self, engine: GameEngine) -> dict:
+        code = engine.room_code
+        deal = engine.state.round_state
+        cached = self._rng.get(code)
+        if cached is None or cached[0] is not deal:
+            cached = self._rng[code] = (deal, dump_rng(engine))
+        return {
+            "room_code": code,
+            "revision": engine.revision,
+            "state": dump_state(engine),
+            "rng_state": cached[1],
+        }
+
+    async def flush(self) -> int:
+        started = time.perf_counter()
+        engines, gone = self.changed()
+        written: list[tuple[str, int]] = []
+        encode_time = 0.0
+        if engines or gone:
+            async with self.session_factory() as db:
+                for i in range(0, len(engines), self.batch_size):
+                    t = time.perf_counter()
+                    rows = [self.encode(e) for e in engines[i:i + self.batch_size]]
+                    encode_time += time.perf_counter() - t
+                    await db.execute(checkpoint_upsert(rows))
+                    written.extend((r["room_code"], r["revision"]) for r in rows)
+                if gone:
+                    await db.execute(
+                        delete(RoomCheckpoint).where(RoomCheckpoint.room_code.in_(gone))
+                    )
+                await db.commit()
+            self._saved.update(written)
+            for code in gone:
+                self._saved.pop(code, None)
+
+        self.stats.sweeps += 1
+        self.stats.rooms_written += len(written)
+        self.stats.rooms_deleted += len(gone)
+        self.stats.last_written = len(written)
+        self.stats.last_encode_ms = round(encode_time * 1000, 3)
+        self.stats.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        return len(written)
+
+    async def save(self, engines: list[GameEngine]):
+        """Checkpoint rooms this shard doesn't run, for their owners to restore."""
+        rows = [
+            {
+                "room_code": e.room_code,
+                "revision": e.revision,
+                "state": dump_state(e),
+                "rng_state": dump_rng(e),
+            }
+            for e in engines
+        ]
+        async with self.session_factory() as db:
+            for i in range(0, len(rows), self.batch_size):
+                await db.execute(checkpoint_upsert(rows[i:i + self.batch_size]))
+            await db.commit()
+
+    async def restore(self) -> list[GameEngine]:
+        """Reinstall this shard's checkpointed rooms; their players rejoin via join_game."""
+        async with self.session_factory() as db:
+            rows = (await db.execute(select(RoomCheckpoint))).scalars().all()
+            broken = []
+            restored = []
+            for row in rows:
+                if not shard.is_local(row.room_code) or row.room_code in manager.games:
+                    continue
+                try:
+                    engine = load_engine(row.state, row.rng_state)
+                except (ValueError, TypeError, KeyError, IndexError) as e:
+                    logger.error(f"Dropping unreadable checkpoint for {row.room_code}: {e}")
+                    broken.append(row.room_code)
+                    continue
+                engine.revision = row.revision
+                manager.restore_game(engine)
+                self._saved[row.room_code] = row.revision
+                restored.append(engine)
+            if broken:
+                await db.execute(delete(RoomCheckpoint).where(RoomCheckpoint.room_code.in_(broken)))
+                await db.commit()
+
+        self.stats.restored += len(restored)
+        if restored:
+            logger.info(f"Restored {len(restored)} room(s) from checkpoints")
+        return restored
+
+
+checkpoints = RoomCheckpointer(
+    interval=settings.checkpoint_interval_seconds,
+    batch_size=settings.checkpoint_batch_size,
+)
@@ -0,0 +1,143 @@
+"""Streaming export of finished games for offline analysis.
+
+One flat row per player per round, joining games, participants, rounds and scores.
+Rows are read through a server-side cursor and written out in small chunks, so
+memory stays flat however many rows are exported.
+
+Usage:
+    python -m app.services.export --format csv --start 2026-01-01 --out games.csv
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select
+
+from app.database import open_read_session
+from app.models.game import Game, GameParticipant, GameRound, RoundScore
+
+EXPORT_FORMATS = ("ndjson", "csv")
+FETCH_ROWS = 5000
+CHUNK_BYTES = 64 * 1024
+
+COLUMNS = (
+    "game_id", "finished_at", "room_code", "scoring_variant", "player_count",
+    "winner_id", "round_number", "hand_size", "trump_suit", "dealer_seat",
+    "seat_index", "user_id", "display_name", "is_bot", "final_score", "final_rank",
+    "bid", "tricks_won", "round_points", "cumulative_score",
+)
+
+
+def export_query(start: date | None = None, end: date | None = None, variant: str | None = None):
+    """Rows for games finished in [start, end] (inclusive days, UTC)."""
+    query = (
+        select(
+            Game.id.label("game_id"),
+            Game.created_at.label("finished_at"),
+            Game.room_code,
+            Game.scoring_variant,
+            Game.player_count,
+            Game.winner_id,
+            GameRound.round_number,
+            GameRound.hand_size,
+            GameRound.trump_suit,
+            GameRound.dealer_seat,
+            GameParticipant.seat_index,
+            GameParticipant.user_id,
+            GameParticipant.display_name,
+            GameParticipant.is_bot,
+            GameParticipant.final_score,
+            GameParticipant.final_rank,
+            RoundScore.bid,
+            RoundScore.tricks_won,
+            RoundScore.round_points,
+            RoundScore.cumulative_score,
+        )
+        .join(GameRound, GameRound.game_id == Game.id)
+        .join(RoundScore, RoundScore.round_id == GameRound.id)
+        .join(GameParticipant, GameParticipant.id == RoundScore.participant_id)
+        .where(Game.status == "finished")
+        .order_by(Game.created_at, Game.id, GameRound.round_number, GameParticipant.seat_index)
+    )
+    if start:
+        query = query.where(Game.created_at >= datetime.combine(start, datetime.min.time()))
+    if end:
+        next_day = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        query = query.where(Game.created_at < next_day)
+    if variant:
+        query = query.where(Game.scoring_variant == variant)
+    return query.execution_options(yield_per=FETCH_ROWS)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    return str(value)  # UUIDs
+
+
+async def export_rows(
+    start: date | None = None, end: date | None = None, variant: str | None = None,
+) -> AsyncIterator[tuple]:
+    """Stream export rows as tuples in COLUMNS order, one fetch batch at a time."""
+    db = open_read_session()
+    try:
+        result = await db.stream(export_query(start, end, variant))
+        async for partition in result.partitions():
+            for row in partition:
+                yield tuple(_plain(v) for v in row)
+    finally:
+        await db.close()
+
+
+async def encode_rows(rows: AsyncIterator[tuple], fmt: str) -> AsyncIterator[str]:
+    """Render rows as NDJSON or CSV, yielding ~64KB chunks."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(COLUMNS)
+    async for row in rows:
+        if fmt == "csv":
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(COLUMNS, row, strict=True)), separators=(",", ":")))
+            buffer.write("\n")
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def _export_to(out, fmt: str, start: date | None, end: date | None, variant: str | None):
+    async for chunk in encode_rows(export_rows(start, end, variant), fmt):
+        out.write(chunk)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export finished games and round scores")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--start", type=date.fromisoformat, help="first day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day, inclusive")
+    parser.add_argument("--variant", help="scoring variant to include")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.out:
+        with open(args.out, "w", newline="") as out:
+            asyncio.run(_export_to(out, args.format, args.start, args.end, args.variant))
+    else:
+        asyncio.run(_export_to(sys.stdout, args.format, args.start, args.end, args.variant))
+
+
+if __name__ == "__main__":
+    main()
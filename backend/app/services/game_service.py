@@ -2,76 +2,204 @@ from __future__ import annotations
 
 import json
 import uuid
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import NamedTuple
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.game.engine import GameEngine
 from app.models.game import Game, GameParticipant, GameRound, RoundScore
 
 
-async def persist_game_results(db: AsyncSession, engine: GameEngine):
-    """Persist completed game results to the database."""
+class ParticipantRecord(NamedTuple):
+    user_id: str | None  # None for bots
+    display_name: str
+    is_bot: bool
+    seat_index: int
+    final_score: int
+    final_rank: int
+
+
+class RoundRecord(NamedTuple):
+    hand_size: int
+    dealer_seat: int
+    # (seat_index, bid, tricks_won, round_points, cumulative_score)
+    scores: list[tuple[int, int, int, int, int]]
+
+
+@dataclass
+class GameRecord:
+    """Engine-free summary of a finished game: everything needed to insert it.
+
+    Built once on the event loop at game over, so the engine can be cleaned up
+    immediately. Plain tuples keep it small in memory and JSON-serializable for
+    the persistence journal.
+    """
+
+    game_id: str
+    room_code: str
+    scoring_variant: str
+    config_json: str
+    round_count: int
+    player_count: int
+    winner_seat: int | None
+    finished_at: str  # ISO 8601, UTC
+    participants: list[ParticipantRecord]
+    rounds: list[RoundRecord]
+
+    @property
+    def winner_id(self) -> str | None:
+        for p in self.participants:
+            if p.seat_index == self.winner_seat:
+                return p.user_id
+        return None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> GameRecord:
+        return cls(
+            **{
+                **data,
+                "participants": [ParticipantRecord(*p) for p in data["participants"]],
+                "rounds": [
+                    RoundRecord(r[0], r[1], [tuple(s) for s in r[2]]) for r in data["rounds"]
+                ],
+            }
+        )
+
+
+def _user_id(player_id: str, is_bot: bool) -> str | None:
+    if is_bot:
+        return None
+    try:
+        return str(uuid.UUID(player_id))
+    except ValueError:
+        return None
+
+
+def build_game_record(engine: GameEngine) -> GameRecord:
+    """Capture a finished game from its engine."""
+    state = engine.state
     winner = engine.get_winner()
+    seat_of = {p.player_id: p.seat_index for p in engine.players}
+    sequence = state.round_sequence()
 
-    game = Game(
-        id=uuid.uuid4(),
-        room_code=engine.room_code,
-        scoring_variant=engine.state.config.scoring_variant.value,
-        round_count=engine.state.round_number,
-        player_count=engine.state.player_count,
-        winner_id=uuid.UUID(winner.player_id) if winner and not winner.is_bot else None,
-        status="finished",
-        config_json=json.dumps(engine.state.config.to_dict()),
-    )
-    db.add(game)
-
-    # Create participants
-    participants: dict[str, GameParticipant] = {}
-    sorted_players = sorted(engine.players, key=lambda p: p.score, reverse=True)
-
-    for rank, player in enumerate(sorted_players, 1):
-        participant = GameParticipant(
-            id=uuid.uuid4(),
-            game_id=game.id,
-            user_id=uuid.UUID(player.player_id) if not player.is_bot else None,
-            display_name=player.display_name,
-            is_bot=player.is_bot,
-            seat_index=player.seat_index,
-            final_score=player.score,
+    ranked = sorted(engine.players, key=lambda p: p.score, reverse=True)
+    participants = [
+        ParticipantRecord(
+            user_id=_user_id(p.player_id, p.is_bot),
+            display_name=p.display_name,
+            is_bot=p.is_bot,
+            seat_index=p.seat_index,
+            final_score=p.score,
             final_rank=rank,
         )
-        db.add(participant)
-        participants[player.player_id] = participant
-
-    # Create rounds and scores
-    for round_idx, round_scores in enumerate(engine.state.scores_history):
-        game_round = GameRound(
-            id=uuid.uuid4(),
-            game_id=game.id,
-            round_number=round_idx + 1,
-            hand_size=(
-                engine.state.round_sequence()[round_idx]
-                if round_idx < len(engine.state.round_sequence())
-                else 0
-            ),
-            trump_suit=None,
-            dealer_seat=round_idx % engine.state.player_count,
+        for rank, p in enumerate(ranked, 1)
+    ]
+
+    rounds = [
+        RoundRecord(
+            hand_size=sequence[i] if i < len(sequence) else 0,
+            dealer_seat=i % state.player_count,
+            scores=[
+                (seat_of[s.player_id], s.bid, s.tricks_won, s.round_points, s.cumulative_score)
+                for s in round_scores
+                if s.player_id in seat_of
+            ],
         )
-        db.add(game_round)
-
-        for score_entry in round_scores:
-            participant = participants.get(score_entry.player_id)
-            if participant:
-                round_score = RoundScore(
-                    id=uuid.uuid4(),
-                    round_id=game_round.id,
-                    participant_id=participant.id,
-                    bid=score_entry.bid,
-                    tricks_won=score_entry.tricks_won,
-                    round_points=score_entry.round_points,
-                    cumulative_score=score_entry.cumulative_score,
-                )
-                db.add(round_score)
+        for i, round_scores in enumerate(state.scores_history)
+    ]
+
+    return GameRecord(
+        game_id=str(uuid.uuid4()),
+        room_code=engine.room_code,
+        scoring_variant=state.config.scoring_variant.value,
+        config_json=json.dumps(state.config.to_dict()),
+        round_count=state.round_number,
+        player_count=state.player_count,
+        winner_seat=winner.seat_index if winner else None,
+        finished_at=datetime.now(UTC).isoformat(),
+        participants=participants,
+        rounds=rounds,
+    )
+
 
+async def insert_game_records(db: AsyncSession, records: list[GameRecord]):
+    """Insert finished games with one multi-row INSERT per table.
+
+    Does not commit, so callers can add stats updates to the same transaction.
+    """
+    games, participants, rounds, scores = [], [], [], []
+    for record in records:
+        game_id = uuid.UUID(record.game_id)
+        finished_at = datetime.fromisoformat(record.finished_at).replace(tzinfo=None)
+        winner_id = record.winner_id
+        games.append({
+            "id": game_id,
+            "room_code": record.room_code,
+            "scoring_variant": record.scoring_variant,
+            "round_count": record.round_count,
+            "player_count": record.player_count,
+            "winner_id": uuid.UUID(winner_id) if winner_id else None,
+            "status": "finished",
+            "config_json": record.config_json,
+            "created_at": finished_at,
+            "updated_at": finished_at,
+        })
+
+        participant_ids: dict[int, uuid.UUID] = {}
+        for p in record.participants:
+            participant_ids[p.seat_index] = uuid.uuid4()
+            participants.append({
+                "id": participant_ids[p.seat_index],
+                "game_id": game_id,
+                "user_id": uuid.UUID(p.user_id) if p.user_id else None,
+                "display_name": p.display_name,
+                "is_bot": p.is_bot,
+                "seat_index": p.seat_index,
+                "final_score": p.final_score,
+                "final_rank": p.final_rank,
+            })
+
+        for round_idx, r in enumerate(record.rounds):
+            round_id = uuid.uuid4()
+            rounds.append({
+                "id": round_id,
+                "game_id": game_id,
+                "round_number": round_idx + 1,
+                "hand_size": r.hand_size,
+                "trump_suit": None,
+                "dealer_seat": r.dealer_seat,
+            })
+            for seat, bid, tricks_won, round_points, cumulative in r.scores:
+                if seat not in participant_ids:
+                    continue
+                scores.append({
+                    "id": uuid.uuid4(),
+                    "round_id": round_id,
+                    "participant_id": participant_ids[seat],
+                    "bid": bid,
+                    "tricks_won": tricks_won,
+                    "round_points": round_points,
+                    "cumulative_score": cumulative,
+                })
+
+    # Parents first; executemany with a list renders batched multi-row VALUES
+    for model, rows in (
+        (Game, games), (GameParticipant, participants), (GameRound, rounds),
+        (RoundScore, scores),
+    ):
+        if rows:
+            await db.execute(insert(model), rows)
+
+
+async def persist_game_results(db: AsyncSession, engine: GameEngine) -> GameRecord:
+    """Persist completed game results to the database."""
+    record = build_game_record(engine)
+    await insert_game_records(db, [record])
     await db.commit()
-    return game
+    return record
@@ -0,0 +1,242 @@
+"""Hot handoff of live rooms across a restart.
+
+On SIGTERM the process enters drain mode: no new rooms are created, and lobby
+players keep their seats when their sockets close. At shutdown, once in-flight
+socket handlers have finished (or `drain_timeout` has passed), every room and its
+timers are written to a local snapshot file. The next process loads the file on
+startup and resumes each turn and grace timer with the time it had left, minus
+the time the restart took; players reattach through join_game.
+
+Rooms in the snapshot that now belong to another shard (the shard count
+changed) are written to the room checkpoints, and their owners told to restore
+them from there.
+
+The snapshot is a binary file: a header, then one length-prefixed record per
+room holding the engine blobs from `app.game.serialization` and its timers.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import socketio
+
+from app.config import settings
+from app.game.engine import GameEngine
+from app.game.serialization import dump_rng, dump_state, load_engine
+from app.services.checkpoints import checkpoints
+from app.sockets.manager import GameRoomManager, manager
+from app.sockets.sharding import shard
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"OHHANDOFF1\n"
+_HEADER = struct.Struct("<dI")  # wall-clock time written, room count
+_RECORD = struct.Struct("<III")  # lengths of state, RNG and timers blobs
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+@dataclass
+class RoomTimers:
+    turn_remaining: float | None = None
+    away: dict[str, float] = field(default_factory=dict)  # player_id → seconds disconnected
+    autopilot: list[str] = field(default_factory=list)
+
+
+def _room_timers(rooms: GameRoomManager, engine: GameEngine) -> RoomTimers:
+    away = {}
+    for p in engine.players:
+        seconds = rooms.disconnected_for(engine.room_code, p.player_id)
+        if seconds is not None:
+            away[p.player_id] = seconds
+    return RoomTimers(
+        turn_remaining=rooms.turn_time_remaining(engine.room_code),
+        away=away,
+        autopilot=[
+            p.player_id for p in engine.players
+            if (engine.room_code, p.player_id) in rooms.autopilot
+        ],
+    )
+
+
+def write_snapshot(path: str, rooms: GameRoomManager) -> int:
+    """Write every room and its timers to `path`, atomically. Returns the room count."""
+    parts = [MAGIC, _HEADER.pack(time.time(), len(rooms.games))]
+    for engine in rooms.games.values():
+        state = dump_state(engine)
+        rng = dump_rng(engine)
+        timers = _room_timers(rooms, engine)
+        meta = json.dumps(
+            [timers.turn_remaining, timers.away, timers.autopilot], separators=(",", ":"),
+        ).encode()
+        parts += [_RECORD.pack(len(state), len(rng), len(meta)), state, rng, meta]
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    tmp.write_bytes(b"".join(parts))
+    os.replace(tmp, target)
+    return len(rooms.games)
+
+
+def read_snapshot(path: str) -> list[tuple[GameEngine, RoomTimers]]:
+    """Rooms from a snapshot, with timers already reduced by the time since it was written."""
+    data = memoryview(Path(path).read_bytes())
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise SnapshotFormatError("Not a room handoff snapshot")
+    offset = len(MAGIC)
+    written_at, count = _HEADER.unpack_from(data, offset)
+    offset += _HEADER.size
+    downtime = max(0.0, time.time() - written_at)
+
+    rooms = []
+    for _ in range(count):
+        state_len, rng_len, meta_len = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        state = bytes(data[offset:offset + state_len])
+        offset += state_len
+        rng = bytes(data[offset:offset + rng_len])
+        offset += rng_len
+        turn, away, autopilot = json.loads(bytes(data[offset:offset + meta_len]))
+        offset += meta_len
+        rooms.append((load_engine(state, rng), RoomTimers(
+            turn_remaining=None if turn is None else max(0.0, turn - downtime),
+            away={pid: seconds + downtime for pid, seconds in away.items()},
+            autopilot=autopilot,
+        )))
+    return rooms
+
+
+class RoomHandoff:
+    """Drain mode plus snapshot/restore of rooms around a restart."""
+
+    def __init__(self, path: str, drain_timeout: float):
+        self.path = path
+        self.drain_timeout = drain_timeout
+        self.inflight = 0
+        self.last_snapshot: dict | None = None
+        self.last_restore: dict | None = None
+
+    def stats(self) -> dict:
+        return {
+            "draining": manager.draining,
+            "inflight": self.inflight,
+            "last_snapshot": self.last_snapshot,
+            "last_restore": self.last_restore,
+        }
+
+    def attach(self, sio: socketio.AsyncServer):
+        """Count running event handlers, so a drain can wait for them."""
+        handlers = sio.handlers["/"]
+        for event, handler in list(handlers.items()):
+            if event not in ("connect", "disconnect"):
+                handlers[event] = self._tracked(handler)
+
+    def _tracked(self, handler):
+        async def tracked(*args):
+            self.inflight += 1
+            try:
+                return await handler(*args)
+            finally:
+                self.inflight -= 1
+
+        return tracked
+
+    def install_signal_handler(self):
+        """Enter drain mode as soon as SIGTERM arrives, before sockets are closed.
+
+        Chains to the server's own handler, which starts the shutdown.
+        """
+        previous = signal.getsignal(signal.SIGTERM)
+        if not callable(previous):
+            return
+
+        def on_sigterm(signum, frame):
+            manager.draining = True
+            previous(signum, frame)
+
+        signal.signal(signal.SIGTERM, on_sigterm)
+
+    async def drain(self):
+        manager.draining = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.drain_timeout
+        while self.inflight and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self.inflight:
+            logger.warning(f"Drain timed out with {self.inflight} handler(s) still running")
+
+    async def drain_and_snapshot(self) -> int:
+        await self.drain()
+        started = time.perf_counter()
+        count = write_snapshot(self.path, manager)
+        self.last_snapshot = {
+            "rooms": count, "seconds": round(time.perf_counter() - started, 4),
+        }
+        logger.info(f"Wrote {count} room(s) to {self.path} in {self.last_snapshot['seconds']}s")
+        return count
+
+    async def restore(self) -> tuple[list[GameEngine], dict[str, RoomTimers]]:
+        """Install the rooms from a handoff snapshot, if the last process left one."""
+        if not os.path.exists(self.path):
+            return [], {}
+        started = time.perf_counter()
+        engines, timers, elsewhere = [], {}, []
+        try:
+            rooms = read_snapshot(self.path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Ignoring unreadable handoff snapshot {self.path}: {e}")
+            rooms = []
+        try:
+            for engine, room_timers in rooms:
+                code = engine.room_code
+                if code in manager.games:
+                    continue
+                if not shard.is_local(code):
+                    elsewhere.append(engine)
+                    continue
+                manager.restore_game(engine, away=room_timers.away)
+                engines.append(engine)
+                timers[code] = room_timers
+            if elsewhere:
+                await self._hand_over(elsewhere)
+        finally:
+            # Never load a snapshot twice; checkpoints cover a crash after this point
+            os.unlink(self.path)
+        self.last_restore = {
+            "rooms": len(engines),
+            "handed_over": len(elsewhere),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        logger.info(f"Restored {len(engines)} room(s) from handoff snapshot")
+        return engines, timers
+
+    async def _hand_over(self, engines: list[GameEngine]):
+        """Checkpoint rooms owned by other shards and tell the owners to pick them up."""
+        logger.warning(
+            f"{len(engines)} room(s) in the handoff snapshot belong to other shards; "
+            f"passing them on through checkpoints"
+        )
+        try:
+            await checkpoints.save(engines)
+        except Exception as e:
+            logger.error(f"Dropped {len(engines)} room(s) owned by other shards: {e}",
+                         exc_info=True)
+            return
+        await shard.rooms_checkpointed([e.room_code for e in engines])
+
+
+handoff = RoomHandoff(
+    path=settings.handoff_snapshot_path,
+    drain_timeout=settings.handoff_drain_timeout_seconds,
+)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import base64
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.game import Game, GameParticipant, GameRound, RoundScore
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, game_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{game_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, game_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(game_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(str(e)) from e
+
+
+def user_games_query(user_id: uuid.UUID, limit: int, cursor: str | None = None):
+    """Newest-first page of a user's games, seeking past the cursor instead of OFFSET."""
+    query = (
+        select(
+            Game.id,
+            Game.created_at,
+            Game.room_code,
+            Game.scoring_variant,
+            Game.round_count,
+            Game.player_count,
+            Game.winner_id,
+            GameParticipant.seat_index,
+            GameParticipant.final_score,
+            GameParticipant.final_rank,
+        )
+        .join(GameParticipant, GameParticipant.game_id == Game.id)
+        .where(GameParticipant.user_id == user_id)
+        .order_by(Game.created_at.desc(), Game.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, game_id = decode_cursor(cursor)
+        query = query.where(tuple_(Game.created_at, Game.id) < tuple_(created_at, game_id))
+    return query
+
+
+async def list_user_games(
+    db: AsyncSession, user_id: uuid.UUID, limit: int, cursor: str | None = None,
+) -> dict:
+    rows = (await db.execute(user_games_query(user_id, limit, cursor))).all()
+    page = rows[:limit]
+    return {
+        "games": [
+            {
+                "id": str(row.id),
+                "finished_at": row.created_at.isoformat(),
+                "room_code": row.room_code,
+                "scoring_variant": row.scoring_variant,
+                "round_count": row.round_count,
+                "player_count": row.player_count,
+                "won": row.winner_id == user_id,
+                "seat_index": row.seat_index,
+                "final_score": row.final_score,
+                "final_rank": row.final_rank,
+            }
+            for row in page
+        ],
+        "next_cursor": (
+            encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+        ),
+    }
+
+
+async def get_game_detail(
+    db: AsyncSession, game_id: uuid.UUID, user_id: uuid.UUID,
+) -> dict | None:
+    """A finished game with every round's scores, in two queries.
+
+    Returns None unless `user_id` took part, so players can only see their own games.
+    """
+    result = await db.execute(
+        select(Game, GameParticipant)
+        .join(GameParticipant, GameParticipant.game_id == Game.id)
+        .where(Game.id == game_id)
+        .order_by(GameParticipant.seat_index)
+    )
+    rows = result.all()
+    if not rows or all(p.user_id != user_id for _, p in rows):
+        return None
+    game = rows[0][0]
+    seat_of = {p.id: p.seat_index for _, p in rows}
+
+    result = await db.execute(
+        select(
+            GameRound.round_number,
+            GameRound.hand_size,
+            GameRound.trump_suit,
+            GameRound.dealer_seat,
+            RoundScore.participant_id,
+            RoundScore.bid,
+            RoundScore.tricks_won,
+            RoundScore.round_points,
+            RoundScore.cumulative_score,
+        )
+        .join(RoundScore, RoundScore.round_id == GameRound.id)
+        .where(GameRound.game_id == game_id)
+        .order_by(GameRound.round_number)
+    )
+    rounds: dict[int, dict] = {}
+    for row in result.all():
+        r = rounds.setdefault(row.round_number, {
+            "round_number": row.round_number,
+            "hand_size": row.hand_size,
+            "trump_suit": row.trump_suit,
+            "dealer_seat": row.dealer_seat,
+            "scores": [],
+        })
+        r["scores"].append({
+            "seat_index": seat_of.get(row.participant_id),
+            "bid": row.bid,
+            "tricks_won": row.tricks_won,
+            "round_points": row.round_points,
+            "cumulative_score": row.cumulative_score,
+        })
+    for r in rounds.values():
+        r["scores"].sort(key=lambda s: s["seat_index"])
+
+    return {
+        "id": str(game.id),
+        "finished_at": game.created_at.isoformat(),
+        "room_code": game.room_code,
+        "scoring_variant": game.scoring_variant,
+        "round_count": game.round_count,
+        "player_count": game.player_count,
+        "winner_id": str(game.winner_id) if game.winner_id else None,
+        "participants": [
+            {
+                "user_id": str(p.user_id) if p.user_id else None,
+                "display_name": p.display_name,
+                "is_bot": p.is_bot,
+                "seat_index": p.seat_index,
+                "final_score": p.final_score,
+                "final_rank": p.final_rank,
+            }
+            for _, p in rows
+        ],
+        "rounds": list(rounds.values()),
+    }
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.stats import UserStats
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ("wins", "win_rate", "bid_accuracy", "best_score")
+
+
+@dataclass(frozen=True, slots=True)
+class LeaderboardEntry:
+    user_id: uuid.UUID
+    display_name: str
+    avatar_url: str | None
+    games_played: int
+    games_won: int
+    exact_bids: int
+    total_bids: int
+    best_score: int
+    best_streak: int
+
+    @property
+    def win_rate(self) -> float:
+        return self.games_won / self.games_played if self.games_played > 0 else 0.0
+
+    @property
+    def bid_accuracy(self) -> float:
+        return self.exact_bids / self.total_bids if self.total_bids > 0 else 0.0
+
+    def sort_key(self, key: str) -> tuple:
+        """Ascending key for `key`: best first, ties broken deterministically."""
+        if key == "wins":
+            primary = (-self.games_won, self.games_played)
+        elif key == "win_rate":
+            primary = (-self.win_rate, -self.games_played)
+        elif key == "bid_accuracy":
+            primary = (-self.bid_accuracy, -self.total_bids)
+        else:
+            primary = (-self.best_score, self.games_played)
+        return (*primary, self.user_id.int)
+
+    def to_dict(self, rank: int) -> dict:
+        return {
+            "rank": rank,
+            "display_name": self.display_name,
+            "avatar_url": self.avatar_url,
+            "games_played": self.games_played,
+            "games_won": self.games_won,
+            "win_rate": round(self.win_rate * 100, 1),
+            "bid_accuracy": round(self.bid_accuracy * 100, 1),
+            "best_score": self.best_score,
+            "best_streak": self.best_streak,
+        }
+
+
+def _entry(user: User, stats: UserStats) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        user_id=user.id,
+        display_name=user.display_name,
+        avatar_url=user.avatar_url,
+        games_played=stats.games_played,
+        games_won=stats.games_won,
+        exact_bids=stats.exact_bids,
+        total_bids=stats.total_bids,
+        best_score=stats.best_score,
+        best_streak=stats.best_streak,
+    )
+
+
+def _ranked_query():
+    return (
+        select(User, UserStats)
+        .join(UserStats, User.id == UserStats.user_id)
+        .where(User.is_anonymous == False)  # noqa: E712
+        .where(UserStats.games_played >= 1)
+    )
+
+
+class Leaderboard:
+    """In-process leaderboard kept sorted under every supported sort key.
+
+    Each sort key has a list of entries in rank order, so a top-N page is a slice and
+    a user's rank is a binary search on their own sort key. Stats writes refresh only
+    the users they touched: each changed entry is removed from and re-inserted into
+    each list by bisection, with no re-sort. Rendered pages are cached per version
+    and the version doubles as the ETag, so an unchanged board costs a dict lookup.
+
+    The full table is read once, on the first request. Rate-based keys only rank
+    players with at least `min_rate_games` games, so one lucky game doesn't top them.
+    """
+
+    def __init__(self, min_rate_games: int = 10):
+        self.min_rate_games = min_rate_games
+        self.version = 0
+        self._epoch = uuid.uuid4().hex[:8]  # a restarted process never reuses an ETag
+        self.loaded = False
+        self._entries: dict[uuid.UUID, LeaderboardEntry] = {}
+        self._orders: dict[str, list[LeaderboardEntry]] = {k: [] for k in SORT_KEYS}
+        self._pages: dict[tuple[str, int], list[dict]] = {}
+        self._load_lock = asyncio.Lock()
+        self._loading = False
+        self._pending: set[uuid.UUID] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _eligible(self, entry: LeaderboardEntry, key: str) -> bool:
+        if key == "win_rate":
+            return entry.games_played >= self.min_rate_games
+        if key == "bid_accuracy":
+            return entry.total_bids >= self.min_rate_games
+        return True
+
+    def _index(self, key: str, entry: LeaderboardEntry) -> int:
+        return bisect_left(
+            self._orders[key], entry.sort_key(key), key=lambda e: e.sort_key(key),
+        )
+
+    def _build(self, entries: Iterable[LeaderboardEntry]):
+        by_user = {e.user_id: e for e in entries}
+        orders = {
+            key: sorted(
+                (e for e in by_user.values() if self._eligible(e, key)),
+                key=lambda e, k=key: e.sort_key(k),
+            )
+            for key in SORT_KEYS
+        }
+        return by_user, orders
+
+    def replace_all(self, entries: Iterable[LeaderboardEntry]):
+        self._install(*self._build(entries))
+
+    def _install(self, by_user, orders):
+        self._entries, self._orders = by_user, orders
+        self._changed()
+        self.loaded = True
+
+    def upsert(self, entry: LeaderboardEntry):
+        old = self._entries.get(entry.user_id)
+        if old == entry:
+            return
+        if old is not None:
+            self._remove_from_orders(old)
+        self._entries[entry.user_id] = entry
+        for key in SORT_KEYS:
+            if self._eligible(entry, key):
+                insort(self._orders[key], entry, key=lambda e, k=key: e.sort_key(k))
+        self._changed()
+
+    def remove(self, user_id: uuid.UUID):
+        old = self._entries.pop(user_id, None)
+        if old is not None:
+            self._remove_from_orders(old)
+            self._changed()
+
+    def _remove_from_orders(self, entry: LeaderboardEntry):
+        for key in SORT_KEYS:
+            if not self._eligible(entry, key):
+                continue
+            order = self._orders[key]
+            i = self._index(key, entry)
+            if i < len(order) and order[i].user_id == entry.user_id:
+                del order[i]
+
+    def _changed(self):
+        self.version += 1
+        self._pages.clear()
+
+    def etag(self, key: str, limit: int) -> str:
+        return f'W/"lb-{self._epoch}-{self.version}-{key}-{limit}"'
+
+    def top(self, key: str, limit: int) -> list[dict]:
+        page = self._pages.get((key, limit))
+        if page is None:
+            page = [e.to_dict(rank) for rank, e in enumerate(self._orders[key][:limit], 1)]
+            self._pages[(key, limit)] = page
+        return page
+
+    def rank(self, user_id: uuid.UUID, key: str) -> int | None:
+        """1-based rank of a user under `key`, or None if they aren't ranked."""
+        entry = self._entries.get(user_id)
+        if entry is None or not self._eligible(entry, key):
+            return None
+        return self._index(key, entry) + 1
+
+    def ranked_count(self, key: str) -> int:
+        return len(self._orders[key])
+
+    async def ensure_loaded(self):
+        """Load the board on first use.
+
+        Always from the primary: refreshes that arrive before the load are dropped
+        on the assumption that it sees them, which a lagging replica may not.
+        """
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if self.loaded:
+                return
+            async with async_session() as db:
+                self._loading = True
+                try:
+                    query = _ranked_query().execution_options(yield_per=5000)
+                    result = await db.stream(query)
+                    entries = [_entry(user, stats) async for user, stats in result]
+                    # Sorting a large board takes seconds; keep it off the event loop
+                    self._install(*await asyncio.to_thread(self._build, entries))
+                    logger.info(f"Leaderboard loaded with {len(entries)} players")
+                finally:
+                    self._loading = False
+                if self._pending:
+                    pending, self._pending = self._pending, set()
+                    await self.refresh_users(db, pending)
+
+    async def refresh_users(self, db: AsyncSession, user_ids: Iterable[uuid.UUID]):
+        """Re-read the given users' rows after their stats or profile changed."""
+        ids = set(user_ids)
+        if not ids:
+            return
+        if self._loading:
+            self._pending |= ids
+            return
+        if not self.loaded:
+            return  # the first request loads everything fresh
+        try:
+            result = await db.execute(_ranked_query().where(User.id.in_(ids)))
+            found = set()
+            for user, stats in result.all():
+                found.add(user.id)
+                self.upsert(_entry(user, stats))
+            for user_id in ids - found:
+                self.remove(user_id)
+        except Exception as e:
+            # Can't tell what changed; rebuild from scratch on the next request
+            logger.error(f"Leaderboard refresh failed, will reload: {e}", exc_info=True)
+            self.loaded = False
+
+
+leaderboard = Leaderboard(min_rate_games=settings.leaderboard_min_rate_games)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session, read_routing
+from app.services.game_service import GameRecord, insert_game_records
+from app.services.leaderboard import leaderboard
+from app.services.profiles import invalidate_users
+from app.services.rollups import apply_game_records_to_rollups
+from app.services.stats_service import apply_game_records_to_stats
+from app.sockets.sharding import shard
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueueStats:
+    enqueued: int = 0
+    written: int = 0
+    batches: int = 0
+    retries: int = 0
+    spilled: int = 0
+    replayed: int = 0
+    rejected: int = 0
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class PersistenceQueue:
+    """Write-behind queue that saves finished games off the game's hot path.
+
+    `enqueue` is synchronous and never blocks: records go into a bounded in-memory
+    queue, or straight to an on-disk JSONL journal when the queue is full. A single
+    worker drains the queue in batches and writes each batch (games, participants,
+    rounds, scores and stats) in one transaction with multi-row inserts.
+
+    Transient database errors are retried with exponential backoff; a batch that
+    still fails is spilled to the journal, which is replayed after the next
+    successful write or on startup. An IntegrityError means some record in the batch
+    can never be written, so the batch is retried one record at a time; records
+    that fail alone (including replays of games already saved, which collide on
+    the game id) are moved to a `.rejected` file instead of blocking the queue.
+    """
+
+    def __init__(
+        self,
+        journal_path: Path,
+        maxsize: int = 1000,
+        batch_size: int = 50,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        session_factory: Callable[[], AsyncSession] = async_session,
+    ):
+        self.journal_path = Path(journal_path)
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.session_factory = session_factory
+        self.stats = QueueStats()
+        self._queue: asyncio.Queue[GameRecord] = asyncio.Queue(maxsize=maxsize)
+        self._task: asyncio.Task | None = None
+        self._delay = base_delay
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def replay_path(self) -> Path:
+        return self.journal_path.with_suffix(".replay.jsonl")
+
+    @property
+    def rejected_path(self) -> Path:
+        return self.journal_path.with_suffix(".rejected.jsonl")
+
+    def enqueue(self, record: GameRecord):
+        self.stats.enqueued += 1
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            logger.warning(f"Persistence queue full; journaling game {record.room_code}")
+            self._spill([record])
+        self.start()
+
+    def start(self):
+        """Start the worker if it isn't running. Safe to call repeatedly."""
+        if self._task is not None and not self._task.done():
+            return
+        # Outside a loop there is nothing to start; the first enqueue inside one does
+        with contextlib.suppress(RuntimeError):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Give the worker `timeout` seconds to drain, then journal whatever is left."""
+        if self._task is not None and not self._task.done():
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._queue.join(), timeout)
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+            self._queue.task_done()
+        if leftover:
+            self._spill(leftover)
+        self._task = None
+
+    async def _run(self):
+        await self._replay_journal()
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                if await self._flush(batch):
+                    await self._replay_journal()
+            except asyncio.CancelledError:
+                self._spill(batch)  # shutting down mid-write; replayed on next start
+                raise
+            except Exception as e:
+                logger.error(f"Persistence worker error: {e}", exc_info=True)
+                self._spill(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list[GameRecord]) -> bool:
+        """Write a batch, retrying transient failures. True if the database took it."""
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self._write(batch)
+            except IntegrityError:
+                await self._write_each(batch)
+                self._delay = self.base_delay
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(
+                        f"Could not persist {len(batch)} game(s) after {attempt} attempts: {e}"
+                    )
+                    self._spill(batch)
+                    return False
+                self.stats.retries += 1
+                delay = self._delay * random.uniform(0.5, 1.0)
+                logger.warning(f"Persist attempt {attempt} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                self._delay = min(self._delay * 2, self.max_delay)
+            else:
+                self.stats.batches += 1
+                self.stats.written += len(batch)
+                self._delay = self.base_delay
+                return True
+        return False
+
+    async def _write(self, batch: list[GameRecord]):
+        async with self.session_factory() as db:
+            await insert_game_records(db, batch)
+            await apply_game_records_to_stats(db, batch)
+            await apply_game_records_to_rollups(db, batch)
+            await db.commit()
+            user_ids = {
+                uuid.UUID(p.user_id) for r in batch for p in r.participants if p.user_id
+            }
+            invalidate_users(user_ids)
+            read_routing.note_write(user_ids)
+            await shard.users_changed(user_ids)
+            await leaderboard.refresh_users(db, user_ids)
+
+    async def _write_each(self, batch: list[GameRecord]):
+        for record in batch:
+            try:
+                await self._write([record])
+            except IntegrityError as e:
+                logger.error(f"Rejected game {record.game_id} ({record.room_code}): {e.orig}")
+                self.stats.rejected += 1
+                self._append(self.rejected_path, [record])
+            else:
+                self.stats.written += 1
+
+    def _spill(self, records: list[GameRecord]):
+        self.stats.spilled += len(records)
+        self._append(self.journal_path, records)
+
+    @staticmethod
+    def _append(path: Path, records: list[GameRecord]):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a") as f:
+                for record in records:
+                    f.write(json.dumps(record.to_dict(), separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.error(f"Could not journal {len(records)} game(s) to {path}: {e}")
+
+    async def _replay_journal(self):
+        """Write journaled games back in batches, streaming the file."""
+        if not self.replay_path.exists():
+            if not self.journal_path.exists():
+                return
+            # Anything that fails during replay is spilled to a fresh journal
+            self.journal_path.replace(self.replay_path)
+
+        logger.info(f"Replaying persistence journal {self.replay_path}")
+        batch: list[GameRecord] = []
+        healthy = True
+
+        async def flush():
+            nonlocal healthy
+            self.stats.replayed += len(batch)
+            if healthy:
+                healthy = await self._flush(batch)
+            else:
+                self._spill(batch)  # database went away again; don't retry every batch
+
+        with self.replay_path.open() as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(GameRecord.from_dict(json.loads(line)))
+                except (ValueError, TypeError, KeyError) as e:
+                    logger.error(f"Skipping unreadable journal line: {e}")
+                    continue
+                if len(batch) >= self.batch_size:
+                    await flush()
+                    batch = []
+        if batch:
+            await flush()
+        self.replay_path.unlink(missing_ok=True)
+
+
+persistence = PersistenceQueue(
+    journal_path=Path(settings.persistence_journal_path),
+    maxsize=settings.persistence_queue_size,
+    batch_size=settings.persistence_batch_size,
+    max_retries=settings.persistence_max_retries,
+)
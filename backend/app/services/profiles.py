@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.stats import UserStats
+from app.models.user import User
+from app.services.cache import MISSING, BatchLoader, TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class UserProfile:
+    display_name: str
+    avatar_url: str | None
+    is_anonymous: bool
+
+
+async def _load_profiles(user_ids: list[str]) -> dict[str, UserProfile]:
+    """Fetch many profiles with one `WHERE id IN (...)` query."""
+    ids = []
+    for user_id in user_ids:
+        try:
+            ids.append(uuid.UUID(user_id))
+        except ValueError:
+            continue
+    if not ids:
+        return {}
+    async with async_session() as db:
+        result = await db.execute(
+            select(User.id, User.display_name, User.avatar_url, User.is_anonymous)
+            .where(User.id.in_(ids))
+        )
+        return {
+            str(row.id): UserProfile(row.display_name, row.avatar_url, row.is_anonymous)
+            for row in result.all()
+        }
+
+
+# Reconnect storms become a handful of IN queries instead of one session per socket
+profile_loader = BatchLoader(
+    _load_profiles,
+    cache=TTLCache(maxsize=settings.profile_cache_size, ttl=settings.profile_cache_ttl),
+    window=settings.profile_batch_window,
+)
+
+# Rendered /api/users/me bodies, keyed by user UUID
+profile_responses = TTLCache(maxsize=settings.profile_cache_size, ttl=settings.profile_cache_ttl)
+
+
+def _profile_body(user: User, stats: UserStats | None) -> dict:
+    return {
+        "id": str(user.id),
+        "display_name": user.display_name,
+        "email": user.email,
+        "avatar_url": user.avatar_url,
+        "is_anonymous": user.is_anonymous,
+        "stats": {
+            "games_played": stats.games_played,
+            "games_won": stats.games_won,
+            "total_rounds": stats.total_rounds,
+            "exact_bids": stats.exact_bids,
+            "total_bids": stats.total_bids,
+            "bid_accuracy": (
+                round(stats.exact_bids / stats.total_bids * 100, 1)
+                if stats.total_bids > 0
+                else 0
+            ),
+            "best_score": stats.best_score,
+            "current_streak": stats.current_streak,
+            "best_streak": stats.best_streak,
+        } if stats else None,
+    }
+
+
+async def get_profile_response(db: AsyncSession, user_id: uuid.UUID) -> dict | None:
+    """The /me body for a user, from cache or one joined query. None if no such user."""
+    body = profile_responses.get(user_id)
+    if body is not MISSING:
+        return body
+
+    generation = profile_responses.generation
+    result = await db.execute(
+        select(User, UserStats)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    body = _profile_body(*row)
+    profile_responses.set_if_current(user_id, body, generation)
+    return body
+
+
+def invalidate_users(user_ids: set[uuid.UUID]):
+    """Forget cached profile data after a user's stats or account changed."""
+    profile_responses.invalidate(*user_ids)
+    profile_loader.cache.invalidate(*(str(user_id) for user_id in user_ids))
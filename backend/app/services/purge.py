@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.game import Game, GameParticipant
+from app.models.stats import UserStats
+from app.models.user import User
+from app.services.profiles import invalidate_users
+from app.sockets.manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeStats:
+    runs: int = 0
+    total_purged: int = 0
+    last_purged: int = 0
+    last_batches: int = 0
+    last_duration: float = 0.0
+    last_run_at: str | None = None
+    failures: int = 0
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+def purge_batch_statement(cutoff: datetime, batch_size: int, exclude: set = frozenset()):
+    """DELETE one bounded batch of stale, gameless anonymous users, returning their ids.
+
+    The inner SELECT caps each statement at `batch_size` rows and skips rows other
+    transactions have locked, so each batch holds its locks only briefly. Stats rows
+    go with their user via ON DELETE CASCADE.
+    """
+    stale = (
+        select(User.id)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(
+            User.is_anonymous == True,  # noqa: E712
+            User.created_at < cutoff,
+            func.coalesce(UserStats.games_played, 0) == 0,
+            ~exists().where(GameParticipant.user_id == User.id),
+            ~exists().where(Game.winner_id == User.id),
+        )
+        .limit(batch_size)
+        .with_for_update(of=User, skip_locked=True)
+    )
+    if exclude:
+        stale = stale.where(User.id.not_in(exclude))
+    return delete(User).where(User.id.in_(stale.scalar_subquery())).returning(User.id)
+
+
+class AnonymousUserPurger:
+    """Background job that deletes anonymous users who never finished a game.
+
+    Users younger than the retention period, or than the JWT lifetime (their token
+    could still reconnect), are kept, as is anyone currently seated in a room.
+    Each run deletes in batches of `batch_size`, committing and yielding to the
+    event loop between batches, until a short batch shows nothing is left.
+    """
+
+    def __init__(
+        self,
+        retention_days: int,
+        batch_size: int,
+        interval: float,
+        max_batches: int = 1000,
+        session_factory: Callable[[], AsyncSession] = async_session,
+    ):
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_batches = max_batches
+        self.session_factory = session_factory
+        self.stats = PurgeStats()
+        self._task: asyncio.Task | None = None
+
+    def cutoff(self, now: datetime | None = None) -> datetime:
+        now = now or datetime.now(UTC).replace(tzinfo=None)
+        keep = max(
+            timedelta(days=self.retention_days),
+            timedelta(hours=settings.jwt_expiration_hours),
+        )
+        return now - keep
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.stats.failures += 1
+                logger.error(f"Anonymous user purge failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        started = time.monotonic()
+        cutoff = self.cutoff()
+        purged = batches = 0
+        async with self.session_factory() as db:
+            while batches < self.max_batches:
+                seated = set()
+                for player_id in manager.player_rooms:
+                    with contextlib.suppress(ValueError):
+                        seated.add(uuid.UUID(player_id))
+                result = await db.execute(purge_batch_statement(cutoff, self.batch_size, seated))
+                ids = set(result.scalars().all())
+                await db.commit()
+                batches += 1
+                purged += len(ids)
+                invalidate_users(ids)
+                if len(ids) < self.batch_size:
+                    break
+                await asyncio.sleep(0)
+
+        duration = time.monotonic() - started
+        self.stats.runs += 1
+        self.stats.total_purged += purged
+        self.stats.last_purged = purged
+        self.stats.last_batches = batches
+        self.stats.last_duration = round(duration, 3)
+        self.stats.last_run_at = datetime.now(UTC).isoformat()
+        logger.info(
+            f"Purged {purged} stale anonymous users in {batches} batch(es) ({duration:.2f}s)"
+        )
+        return purged
+
+
+anonymous_purger = AnonymousUserPurger(
+    retention_days=settings.anon_retention_days,
+    batch_size=settings.anon_purge_batch_size,
+    interval=settings.anon_purge_interval_seconds,
+)
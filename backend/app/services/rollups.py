@@ -0,0 +1,220 @@
+"""Daily per-user stat rollups and the windowed leaderboards built from them.
+
+Backfill existing games with:
+    python -m app.services.rollups --before 2026-10-01 --chunk 2000
+
+The backfill rebuilds every day before `--before` (default: today, UTC) from the
+game tables, a chunk of games at a time, so it can be re-run safely. Days from
+`--before` on are left to the live persistence path.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import Date, Float, cast, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.game import Game, GameParticipant, RoundScore
+from app.models.stats import UserDailyStats
+from app.models.user import User
+from app.services.game_service import GameRecord
+from app.services.leaderboard import LeaderboardEntry
+from app.services.stats_service import stats_deltas
+
+logger = logging.getLogger(__name__)
+
+COUNTER_COLUMNS = ("games_played", "games_won", "total_rounds", "exact_bids")
+WINDOW_DAYS = {"week": 7, "month": 30}
+
+
+def _additive_upsert(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=[UserDailyStats.user_id, UserDailyStats.day],
+        set_={
+            **{c: getattr(UserDailyStats, c) + getattr(stmt.excluded, c) for c in COUNTER_COLUMNS},
+            "best_score": func.greatest(UserDailyStats.best_score, stmt.excluded.best_score),
+        },
+    )
+
+
+def rollup_rows(records: list[GameRecord]) -> list[dict]:
+    """Fold games into one row per (user, day) so a single upsert can apply them."""
+    rows: dict[tuple[uuid.UUID, date], dict] = {}
+    for record in records:
+        day = datetime.fromisoformat(record.finished_at).astimezone(UTC).date()
+        for delta in stats_deltas(record):
+            row = rows.get((delta["user_id"], day))
+            if row is None:
+                rows[(delta["user_id"], day)] = {
+                    "user_id": delta["user_id"],
+                    "day": day,
+                    **{c: delta[c] for c in COUNTER_COLUMNS},
+                    "best_score": delta["best_score"],
+                }
+                continue
+            for c in COUNTER_COLUMNS:
+                row[c] += delta[c]
+            row["best_score"] = max(row["best_score"], delta["best_score"])
+    return list(rows.values())
+
+
+async def apply_game_records_to_rollups(db: AsyncSession, records: list[GameRecord]):
+    """Add finished games to the daily buckets. Does not commit."""
+    rows = rollup_rows(records)
+    if rows:
+        await db.execute(_additive_upsert(insert(UserDailyStats).values(rows)))
+
+
+def _window_order(agg, sort: str):
+    if sort == "win_rate":
+        return [(cast(agg.c.games_won, Float) / agg.c.games_played).desc(),
+                agg.c.games_played.desc()]
+    if sort == "bid_accuracy":
+        return [(cast(agg.c.exact_bids, Float) / agg.c.total_rounds).desc(),
+                agg.c.total_rounds.desc()]
+    if sort == "best_score":
+        return [agg.c.best_score.desc(), agg.c.games_played]
+    return [agg.c.games_won.desc(), agg.c.games_played]
+
+
+async def windowed_leaderboard(
+    db: AsyncSession, window: str, sort: str, limit: int, min_rate_games: int,
+    today: date | None = None,
+) -> list[dict]:
+    """Leaderboard over the last week or month, summing at most 30 buckets per user."""
+    today = today or datetime.now(UTC).date()
+    start = today - timedelta(days=WINDOW_DAYS[window] - 1)
+
+    agg = select(
+        UserDailyStats.user_id,
+        *(func.sum(getattr(UserDailyStats, c)).label(c) for c in COUNTER_COLUMNS),
+        func.max(UserDailyStats.best_score).label("best_score"),
+    ).where(UserDailyStats.day >= start).group_by(UserDailyStats.user_id)
+    if sort == "win_rate":
+        agg = agg.having(func.sum(UserDailyStats.games_played) >= min_rate_games)
+    elif sort == "bid_accuracy":
+        agg = agg.having(func.sum(UserDailyStats.total_rounds) >= min_rate_games)
+    agg = agg.subquery()
+
+    result = await db.execute(
+        select(User.id, User.display_name, User.avatar_url, agg)
+        .join(agg, agg.c.user_id == User.id)
+        .where(User.is_anonymous == False)  # noqa: E712
+        .order_by(*_window_order(agg, sort), User.id)
+        .limit(limit)
+    )
+    out = []
+    for rank, row in enumerate(result.all(), 1):
+        entry = LeaderboardEntry(
+            user_id=row.id,
+            display_name=row.display_name,
+            avatar_url=row.avatar_url,
+            games_played=row.games_played,
+            games_won=row.games_won,
+            exact_bids=row.exact_bids,
+            total_bids=row.total_rounds,
+            best_score=row.best_score,
+            best_streak=0,
+        )
+        data = entry.to_dict(rank)
+        data.pop("best_streak")  # streaks are lifetime-only
+        out.append(data)
+    return out
+
+
+def backfill_chunk_statement(game_ids: list[uuid.UUID]):
+    """INSERT ... SELECT that rolls up one chunk of games entirely in SQL."""
+    gp = GameParticipant
+    per_participant = (
+        select(
+            gp.id.label("participant_id"),
+            func.count(RoundScore.id).label("rounds"),
+            func.count(RoundScore.id)
+            .filter(RoundScore.bid == RoundScore.tricks_won)
+            .label("exact"),
+        )
+        .select_from(gp)
+        .outerjoin(RoundScore, RoundScore.participant_id == gp.id)
+        .where(gp.game_id.in_(game_ids), gp.user_id.is_not(None), gp.is_bot == False)  # noqa: E712
+        .group_by(gp.id)
+        .subquery()
+    )
+    day = cast(Game.created_at, Date)
+    rows = (
+        select(
+            gp.user_id,
+            day,
+            func.count(),
+            func.count().filter(Game.winner_id == gp.user_id),
+            func.sum(per_participant.c.rounds),
+            func.sum(per_participant.c.exact),
+            func.greatest(func.max(func.coalesce(gp.final_score, 0)), 0),
+        )
+        .select_from(gp)
+        .join(per_participant, per_participant.c.participant_id == gp.id)
+        .join(Game, Game.id == gp.game_id)
+        .group_by(gp.user_id, day)
+    )
+    return _additive_upsert(
+        insert(UserDailyStats).from_select(
+            ["user_id", "day", *COUNTER_COLUMNS, "best_score"], rows,
+        )
+    )
+
+
+async def backfill(before: date, chunk: int) -> int:
+    """Rebuild all rollups for days before `before`. Returns the number of games read."""
+    cutoff = datetime.combine(before, datetime.min.time())
+    async with async_session() as db:
+        await db.execute(delete(UserDailyStats).where(UserDailyStats.day < before))
+        await db.commit()
+
+        total = 0
+        cursor: tuple[datetime, uuid.UUID] | None = None
+        started = time.monotonic()
+        while True:
+            query = (
+                select(Game.created_at, Game.id)
+                .where(Game.created_at < cutoff, Game.status == "finished")
+                .order_by(Game.created_at, Game.id)
+                .limit(chunk)
+            )
+            if cursor is not None:
+                query = query.where(tuple_(Game.created_at, Game.id) > tuple_(*cursor))
+            keys = (await db.execute(query)).all()
+            if not keys:
+                break
+            await db.execute(backfill_chunk_statement([k.id for k in keys]))
+            await db.commit()
+            total += len(keys)
+            cursor = (keys[-1].created_at, keys[-1].id)
+            logger.info(
+                f"Rolled up {total} games through {cursor[0]:%Y-%m-%d} "
+                f"({time.monotonic() - started:.1f}s)"
+            )
+    return total
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Backfill daily user stat rollups")
+    parser.add_argument(
+        "--before", type=date.fromisoformat, default=datetime.now(UTC).date(),
+        help="rebuild days before this date (YYYY-MM-DD, UTC); default today",
+    )
+    parser.add_argument("--chunk", type=int, default=2000, help="games per transaction")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    total = asyncio.run(backfill(args.before, args.chunk))
+    logger.info(f"Backfill complete: {total} games")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,51 +2,113 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.game.engine import GameEngine
 from app.models.stats import UserStats
+from app.services.game_service import GameRecord, build_game_record
 
+COUNTER_COLUMNS = ("games_played", "games_won", "total_rounds", "exact_bids", "total_bids")
 
-async def update_player_stats(db: AsyncSession, engine: GameEngine):
-    """Update user stats for all human players after a game ends."""
-    winner = engine.get_winner()
 
-    for player in engine.players:
-        if player.is_bot:
-            continue
+def stats_deltas(record: GameRecord) -> list[dict]:
+    """Per-human stat increments for one game, from a single pass over its rounds."""
+    rounds = dict.fromkeys((p.seat_index for p in record.participants), 0)
+    exact = dict(rounds)
+    for r in record.rounds:
+        for seat, bid, tricks_won, _points, _cumulative in r.scores:
+            if seat in rounds:
+                rounds[seat] += 1
+                if bid == tricks_won:
+                    exact[seat] += 1
 
-        try:
-            user_id = uuid.UUID(player.player_id)
-        except ValueError:
+    rows = []
+    for p in record.participants:
+        if not p.user_id:
             continue
+        won = int(record.winner_seat == p.seat_index)
+        rows.append({
+            "user_id": uuid.UUID(p.user_id),
+            "games_played": 1,
+            "games_won": won,
+            "total_rounds": rounds[p.seat_index],
+            "exact_bids": exact[p.seat_index],
+            "total_bids": rounds[p.seat_index],
+            "best_score": max(p.final_score, 0),
+            "current_streak": won,
+            "best_streak": won,
+        })
+    return rows
+
+
+def stats_upsert(rows: list[dict]):
+    """One INSERT ... ON CONFLICT DO UPDATE applying single-game deltas.
+
+    Each row holds one game's increments for one user (at most one row per user).
+    A win extends the stored streak and a loss resets it, evaluated in SQL against
+    the row's current values.
+    """
+    stmt = insert(UserStats).values(rows)
+    won = stmt.excluded.games_won > 0
+    streak = case((won, UserStats.current_streak + 1), else_=literal(0))
+    return stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            **{c: getattr(UserStats, c) + getattr(stmt.excluded, c) for c in COUNTER_COLUMNS},
+            "best_score": func.greatest(UserStats.best_score, stmt.excluded.best_score),
+            "current_streak": streak,
+            "best_streak": func.greatest(UserStats.best_streak, streak),
+            "updated_at": func.now(),
+        },
+    )
+
 
-        result = await db.execute(select(UserStats).where(UserStats.user_id == user_id))
-        stats = result.scalar_one_or_none()
-        if not stats:
-            stats = UserStats(user_id=user_id)
-            db.add(stats)
-
-        stats.games_played += 1
-
-        is_winner = winner and winner.player_id == player.player_id
-        if is_winner:
-            stats.games_won += 1
-            stats.current_streak += 1
-            stats.best_streak = max(stats.best_streak, stats.current_streak)
-        else:
-            stats.current_streak = 0
-
-        stats.best_score = max(stats.best_score, player.score)
-
-        # Count round stats
-        for round_scores in engine.state.scores_history:
-            for score_entry in round_scores:
-                if score_entry.player_id == player.player_id:
-                    stats.total_rounds += 1
-                    stats.total_bids += 1
-                    if score_entry.bid == score_entry.tricks_won:
-                        stats.exact_bids += 1
+async def apply_game_records_to_stats(db: AsyncSession, records: list[GameRecord]):
+    """Update user stats for every human in the given games, oldest game first.
 
+    Usually a single statement. A user who appears in several games of the batch
+    has their games applied in later statements, so streaks are evaluated in order
+    and no statement touches the same row twice. Does not commit.
+    """
+    layers: list[list[dict]] = []
+    seen: dict[uuid.UUID, int] = {}
+    for record in records:
+        for row in stats_deltas(record):
+            depth = seen.get(row["user_id"], 0)
+            seen[row["user_id"]] = depth + 1
+            if depth == len(layers):
+                layers.append([])
+            layers[depth].append(row)
+    for rows in layers:
+        await db.execute(stats_upsert(rows))
+
+
+async def update_player_stats(db: AsyncSession, engine: GameEngine):
+    """Update user stats for all human players after a game ends."""
+    await apply_game_records_to_stats(db, [build_game_record(engine)])
     await db.commit()
+
+
+async def merge_user_stats(db: AsyncSession, source_id: uuid.UUID, target_id: uuid.UUID):
+    """Fold one user's stats into another's with a single INSERT ... SELECT upsert.
+
+    Creates the target row if it has none. Does not commit.
+    """
+    source = select(
+        literal(target_id, UserStats.user_id.type),
+        *(getattr(UserStats, c) for c in (*COUNTER_COLUMNS, "best_score")),
+    ).where(UserStats.user_id == source_id)
+    stmt = insert(UserStats).from_select(
+        ["user_id", *COUNTER_COLUMNS, "best_score"], source,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            **{c: getattr(UserStats, c) + getattr(stmt.excluded, c) for c in COUNTER_COLUMNS},
+            "best_score": func.greatest(UserStats.best_score, stmt.excluded.best_score),
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
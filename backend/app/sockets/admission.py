@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+
+import socketio
+
+from app.config import settings
+from app.loop_monitor import loop_monitor
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+admission_rejected = registry.counter(
+    "admission_rejected_total", "Requests turned away while overloaded", labels=("event",),
+)
+admission_transitions = registry.counter(
+    "admission_transitions_total", "Changes between normal and overloaded", labels=("to",),
+)
+
+
+class _Handler:
+    __slots__ = ("done", "paused")
+
+    def __init__(self):
+        self.done = False
+        self.paused = False
+
+
+# The event handler the current task is running for (inherited by tasks it spawns)
+_current_handler: ContextVar[_Handler | None] = ContextVar("admission_handler", default=None)
+
+
+class AdmissionController:
+    """Sheds new work while the event loop is lagging or handlers are piling up.
+
+    Overload starts when smoothed loop lag or busy socket handlers cross their
+    `enter` thresholds, and ends only once both are back under the lower `exit`
+    thresholds and at least `min_hold` seconds have passed, so the state doesn't
+    flap around a single threshold. While overloaded, new rooms and joins are
+    refused with a retry-after, lobby broadcasts are held back (one is sent on
+    recovery), bots skip most of their think time and pacing pauses stretch.
+    Games already running keep going.
+
+    A handler counts as busy unless it is sleeping through `sleep`, as handlers do
+    for bot think time and pacing: many tables waiting on those is not load.
+    """
+
+    def __init__(
+        self,
+        enter_lag: float,
+        exit_lag: float,
+        enter_inflight: int,
+        exit_inflight: int,
+        min_hold: float,
+        check_interval: float,
+        retry_after: float,
+        bot_delay_factor: float,
+        pacing_factor: float,
+        lag: Callable[[], float] = lambda: loop_monitor.smoothed,
+        inflight: Callable[[], int] | None = None,
+    ):
+        self.enter_lag = enter_lag
+        self.exit_lag = exit_lag
+        self.enter_inflight = enter_inflight
+        self.exit_inflight = exit_inflight
+        self.min_hold = min_hold
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self.bot_delay_factor = bot_delay_factor
+        self.pacing_factor = pacing_factor
+        self.lag = lag
+        self.busy = 0  # event handlers running and not sleeping
+        self.inflight = inflight if inflight is not None else lambda: self.busy
+        self.overloaded = False
+        self.since = 0.0
+        self.lobby_pending = False
+        self.overloads = 0
+        self._task: asyncio.Task | None = None
+
+    def update(self, now: float | None = None) -> bool:
+        """Re-evaluate the load signals; True if the state changed."""
+        now = time.monotonic() if now is None else now
+        lag, inflight = self.lag(), self.inflight()
+        if not self.overloaded:
+            if lag >= self.enter_lag or inflight >= self.enter_inflight:
+                self.overloaded, self.since = True, now
+                self.overloads += 1
+                admission_transitions.labels("overloaded").inc()
+                logger.warning(f"Overloaded (loop lag {lag:.3f}s, {inflight} handlers running)")
+                return True
+        elif (lag <= self.exit_lag and inflight <= self.exit_inflight
+              and now - self.since >= self.min_hold):
+            self.overloaded, self.since = False, now
+            admission_transitions.labels("normal").inc()
+            logger.info(f"Load back to normal after {self.overloads} overload(s)")
+            return True
+        return False
+
+    def attach(self, sio: socketio.AsyncServer):
+        """Count busy event handlers."""
+        handlers = sio.handlers["/"]
+        for event, handler in list(handlers.items()):
+            if event not in ("connect", "disconnect"):
+                handlers[event] = self._counted(handler)
+
+    def _counted(self, handler):
+        async def counted(*args):
+            running = _Handler()
+            token = _current_handler.set(running)
+            self.busy += 1
+            try:
+                return await handler(*args)
+            finally:
+                running.done = True
+                if not running.paused:
+                    self.busy -= 1
+                _current_handler.reset(token)
+
+        return counted
+
+    async def sleep(self, seconds: float):
+        """asyncio.sleep that doesn't count the calling handler as busy meanwhile."""
+        running = _current_handler.get()
+        if running is None or running.done or running.paused:
+            await asyncio.sleep(seconds)
+            return
+        running.paused = True
+        self.busy -= 1
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            running.paused = False
+            if not running.done:
+                self.busy += 1
+
+    def start(self, on_recovered: Callable[[], Awaitable[None]] | None = None):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(on_recovered))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self, on_recovered):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if self.update() and not self.overloaded and self.lobby_pending:
+                self.lobby_pending = False
+                if on_recovered is not None:
+                    try:
+                        await on_recovered()
+                    except Exception as e:
+                        logger.error(f"Lobby update after overload failed: {e}", exc_info=True)
+
+    def reject(self, event: str) -> float | None:
+        """Seconds the client should wait before retrying `event`, or None to admit it."""
+        if not self.overloaded:
+            return None
+        admission_rejected.labels(event).inc()
+        return self.retry_after
+
+    def hold_lobby_update(self) -> bool:
+        """True if a lobby broadcast should wait until load is back to normal."""
+        if self.overloaded:
+            self.lobby_pending = True
+        return self.overloaded
+
+    def bot_delay(self, seconds: float) -> float:
+        return seconds * self.bot_delay_factor if self.overloaded else seconds
+
+    def pacing(self, seconds: float) -> float:
+        return seconds * self.pacing_factor if self.overloaded else seconds
+
+    def stats(self) -> dict:
+        return {
+            "overloaded": self.overloaded,
+            "overloads": self.overloads,
+            "lag": round(self.lag(), 6),
+            "inflight": self.inflight(),
+            "lobby_pending": self.lobby_pending,
+        }
+
+
+admission = AdmissionController(
+    enter_lag=settings.admission_enter_lag_seconds,
+    exit_lag=settings.admission_exit_lag_seconds,
+    enter_inflight=settings.admission_enter_inflight,
+    exit_inflight=settings.admission_exit_inflight,
+    min_hold=settings.admission_min_hold_seconds,
+    check_interval=settings.admission_check_interval_seconds,
+    retry_after=settings.admission_retry_after_seconds,
+    bot_delay_factor=settings.admission_bot_delay_factor,
+    pacing_factor=settings.admission_pacing_factor,
+)
+
+registry.gauge(
+    "admission_overloaded", "1 while new rooms and joins are being shed",
+    lambda: {(): int(admission.overloaded)},
+)
@@ -4,6 +4,8 @@ import socketio
 
 from app.game.engine import GameEngine
 from app.game.types import GamePhase, RoundScoreEntry, TrickCard
+from app.services.game_service import build_game_record
+from app.services.persistence_queue import persistence
 from app.sockets.manager import manager
 
 
@@ -107,6 +109,8 @@ async def emit_round_scored(
 
 
 async def emit_game_over(sio: socketio.AsyncServer, engine: GameEngine):
+    # Saved by the write-behind queue; never waits on the database
+    persistence.enqueue(build_game_record(engine))
     winner = engine.get_winner()
     last_scores = engine.state.scores_history[-1] if engine.state.scores_history else []
     await emit_to_room(sio, engine, "game_over", {
@@ -157,5 +161,24 @@ async def emit_turn_timed_out(sio: socketio.AsyncServer, engine: GameEngine, pla
     })
 
 
-async def emit_error(sio: socketio.AsyncServer, sid: str, message: str):
-    await sio.emit("error", {"message": message}, to=sid)
+async def emit_autopilot(
+    sio: socketio.AsyncServer, engine: GameEngine, player_id: str, enabled: bool,
+):
+    """Tell the table a bot has taken over (or handed back) a player's seat."""
+    await emit_to_room(sio, engine, "player_autopilot", {
+        "player_id": player_id,
+        "enabled": enabled,
+    })
+
+
+async def emit_win_estimates(sio: socketio.AsyncServer, engine: GameEngine, estimate: dict):
+    await emit_to_room(sio, engine, "win_estimates", estimate)
+
+
+async def emit_error(
+    sio: socketio.AsyncServer, sid: str, message: str, retry_after: float | None = None,
+):
+    payload = {"message": message}
+    if retry_after is not None:
+        payload["retry_after"] = retry_after
+    await sio.emit("error", payload, to=sid)
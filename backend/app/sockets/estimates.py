@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import socketio
+
+from app.config import settings
+from app.game.engine import GameEngine
+from app.game.estimator import forget_room, snapshot_from_state, update_room
+from app.game.types import GamePhase
+from app.sockets.emitters import emit_win_estimates
+from app.sockets.manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+class EstimateService:
+    """Keeps a live win-probability estimate per room and pushes it once per trick.
+
+    Handlers only mark a room as pending; a single background task picks pending rooms
+    whose per-room interval has elapsed and runs the simulation in a worker process,
+    so a burst of plays across many rooms never queues more than one update per room.
+    The simulation is pure Python and would hold the GIL against the event loop, so
+    each room is hashed to one of `workers` single-process pools, which keeps the
+    room's samples between updates; rooms on different workers simulate in parallel.
+    """
+
+    def __init__(self, samples: int, min_interval: float, workers: int = 1):
+        self.samples = samples
+        self.min_interval = min_interval
+        self.workers = max(1, workers)
+        self._pools: list[ProcessPoolExecutor] = []  # started with the first update
+        self._pushed: dict[str, tuple[int, int]] = {}  # room_code → (round, trick)
+        self._last_run: dict[str, float] = {}
+        self._pending: dict[str, None] = {}  # insertion-ordered set
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def notify(self, sio: socketio.AsyncServer, engine: GameEngine):
+        """Mark a room's estimate as stale after a card_played/trick_won."""
+        if not settings.win_estimates_enabled or engine.phase != GamePhase.PLAYING:
+            return
+        self._pending[engine.room_code] = None
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(sio))
+
+    def forget(self, room_code: str):
+        self._pushed.pop(room_code, None)
+        self._pending.pop(room_code, None)
+        if self._last_run.pop(room_code, None) is not None and self._pools:
+            with contextlib.suppress(BrokenProcessPool, RuntimeError):
+                self._pools[self._worker(room_code)].submit(forget_room, room_code)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for pool in self._pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools = []
+
+    def _worker(self, room_code: str) -> int:
+        return hash(room_code) % self.workers
+
+    def _pool(self, index: int) -> ProcessPoolExecutor:
+        if not self._pools:
+            self._pools = [self._start_worker() for _ in range(self.workers)]
+        return self._pools[index]
+
+    @staticmethod
+    def _start_worker() -> ProcessPoolExecutor:
+        # Spawned rather than forked: the server process has threads and a running loop
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+    async def _run(self, sio: socketio.AsyncServer):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            next_due = None
+            for room_code in list(self._pending):
+                wait = self._last_run.get(room_code, 0.0) + self.min_interval - time.monotonic()
+                if wait > 0:
+                    next_due = wait if next_due is None else min(next_due, wait)
+                    continue
+                self._pending.pop(room_code, None)
+                try:
+                    await self._update_room(sio, room_code)
+                except Exception as e:
+                    logger.error(f"Win estimate failed for {room_code}: {e}", exc_info=True)
+
+            if next_due is not None:
+                await asyncio.sleep(next_due)
+                self._wakeup.set()
+
+    async def _update_room(self, sio: socketio.AsyncServer, room_code: str):
+        engine = manager.get_engine(room_code)
+        if not engine or engine.phase == GamePhase.GAME_OVER:
+            self.forget(room_code)
+            return
+
+        snap = snapshot_from_state(engine.state)
+        if snap is None:
+            return
+        key = (snap.round_number, sum(1 for t in snap.tricks if len(t) == len(snap.player_ids)))
+        if self._pushed.get(room_code) == key:
+            return
+
+        self._last_run[room_code] = time.monotonic()
+        index = self._worker(room_code)
+        loop = asyncio.get_running_loop()
+        try:
+            estimate = await loop.run_in_executor(
+                self._pool(index), update_room, room_code, snap, self.samples,
+            )
+        except BrokenProcessPool:
+            # The worker died with its rooms' samples; they start over on a new one
+            self._pools[index] = self._start_worker()
+            raise
+
+        # The room may have moved on while we were simulating; still worth sending
+        # unless the round is already over.
+        if manager.get_engine(room_code) is not engine or engine.phase != GamePhase.PLAYING:
+            return
+        self._pushed[room_code] = key
+        await emit_win_estimates(sio, engine, estimate.to_dict())
+
+
+# Singleton instance
+estimates = EstimateService(
+    samples=settings.win_estimate_samples,
+    min_interval=settings.win_estimate_min_interval,
+    workers=settings.win_estimate_workers,
+)
@@ -4,16 +4,22 @@ import asyncio
 import contextlib
 import logging
 import random
+import time
 
 import socketio
-from sqlalchemy import select
 
-from app.database import async_session
+from app.bot.basic import BasicBot
+from app.bot.selfplay import play_to_completion
+from app.config import settings
 from app.game.engine import GameEngine, GameError
 from app.game.types import Card, GameConfig, GamePhase, Rank, ScoringVariant, Suit
-from app.models.user import User
+from app.metrics import bot_decision_seconds
 from app.services.auth_service import decode_token
+from app.services.handoff import RoomTimers
+from app.services.profiles import profile_loader
+from app.sockets.admission import admission
 from app.sockets.emitters import (
+    emit_autopilot,
     emit_bid_placed,
     emit_card_played,
     emit_error,
@@ -27,11 +33,17 @@ from app.sockets.emitters import (
     emit_turn_timed_out,
     emit_your_turn,
 )
+from app.sockets.estimates import estimates
 from app.sockets.manager import manager
+from app.sockets.sharding import shard
 
 logger = logging.getLogger(__name__)
 
 NUM_AVATARS = 12
+DISCONNECT_GRACE_SECONDS = 60.0
+
+_BOT_BID_SECONDS = bot_decision_seconds.labels("bid")
+_BOT_CARD_SECONDS = bot_decision_seconds.labels("card")
 
 
 def _random_avatar_url() -> str:
@@ -54,14 +66,11 @@ def register_handlers(sio: socketio.AsyncServer):
             logger.warning(f"Connection rejected: invalid token from {sid}: {e}")
             raise socketio.exceptions.ConnectionRefusedError("Invalid token") from e
 
-        # Look up avatar_url from database
+        # Look up avatar_url (cached, batched with other connects)
         avatar_url = None
         try:
-            async with async_session() as db:
-                result = await db.execute(
-                    select(User.avatar_url).where(User.id == player_id)
-                )
-                avatar_url = result.scalar_one_or_none()
+            profile = await profile_loader.load(player_id)
+            avatar_url = profile.avatar_url if profile else None
         except Exception as e:
             logger.warning(f"Could not look up avatar for {player_id}: {e}")
 
@@ -79,7 +88,6 @@ def register_handlers(sio: socketio.AsyncServer):
 
     @sio.event
     async def disconnect(sid):
-        await sio.get_session(sid)
         player_id = manager.get_player_id(sid)
         if not player_id:
             return
@@ -88,13 +96,8 @@ def register_handlers(sio: socketio.AsyncServer):
         if result:
             room_code, engine = result
             if engine.state.phase != GamePhase.LOBBY:
-                engine.set_player_connected(player_id, False)
-                # Start auto-play timer for disconnected player
-                manager.start_disconnect_timer(
-                    player_id,
-                    lambda pid: _auto_play(sio, room_code),
-                    timeout=60.0,
-                )
+                manager.set_disconnected(engine, player_id)
+                _start_disconnect_grace(sio, room_code, player_id)
                 for p in engine.players:
                     other_sid = manager.get_sid(p.player_id)
                     if other_sid:
@@ -103,6 +106,9 @@ def register_handlers(sio: socketio.AsyncServer):
                             {"player_id": player_id},
                             to=other_sid,
                         )
+            elif manager.draining:
+                # Keep the lobby seat; the room is handed to the next process
+                manager.set_disconnected(engine, player_id)
             else:
                 manager.leave_game(player_id)
                 await emit_player_left(sio, engine, player_id)
@@ -113,7 +119,7 @@ def register_handlers(sio: socketio.AsyncServer):
 
     @sio.event
     async def join_game(sid, data):
-        session = await sio.get_session(sid)
+        session = await shard.session(sid)
         player_id = session["player_id"]
         display_name = session["display_name"]
         avatar_url = session.get("avatar_url")
@@ -123,15 +129,32 @@ def register_handlers(sio: socketio.AsyncServer):
             await emit_error(sio, sid, "Room code required")
             return
 
+        # Players returning to their own game are always let back in
+        engine = manager.get_engine(room_code)
+        if engine is None or engine.state.get_player(player_id) is None:
+            retry_after = admission.reject("join_game")
+            if retry_after is not None:
+                await emit_error(sio, sid, "Server is busy, please try again", retry_after)
+                return
+
+        was_autopilot = (room_code, player_id) in manager.autopilot
         try:
             engine = manager.join_game(room_code, player_id, display_name, avatar_url=avatar_url)
         except GameError as e:
             await emit_error(sio, sid, str(e))
             return
 
-        await sio.enter_room(sid, room_code)
+        await shard.joined(sid, room_code)
+        await _enter_room(sio, sid, room_code)
         await emit_game_state(sio, engine, player_id)
         await emit_player_joined(sio, engine, player_id)
+        if was_autopilot:
+            await emit_autopilot(sio, engine, player_id, False)
+            if engine.get_current_player_id() == player_id:
+                await emit_your_turn(
+                    sio, engine, player_id, engine.state.config.turn_timer_seconds,
+                )
+                _start_turn_timer(sio, engine, room_code)
         await _notify_lobby_update(sio)
 
     @sio.event
@@ -143,13 +166,20 @@ def register_handlers(sio: socketio.AsyncServer):
         result = manager.leave_game(player_id)
         if result:
             room_code, engine = result
-            await sio.leave_room(sid, room_code)
+            await _leave_room(sio, sid, room_code)
             await emit_player_left(sio, engine, player_id)
             await _notify_lobby_update(sio)
 
     @sio.event
     async def create_game(sid, data=None):
-        session = await sio.get_session(sid)
+        if manager.draining:
+            await emit_error(sio, sid, "Server is restarting, please try again in a moment")
+            return
+        retry_after = admission.reject("create_game")
+        if retry_after is not None:
+            await emit_error(sio, sid, "Server is busy, please try again", retry_after)
+            return
+        session = await shard.session(sid)
         player_id = session["player_id"]
         display_name = session["display_name"]
         avatar_url = session.get("avatar_url")
@@ -171,10 +201,14 @@ def register_handlers(sio: socketio.AsyncServer):
                 max_hand_size=mhs,
             )
 
-        engine = manager.create_game(player_id, display_name, config, avatar_url=avatar_url)
+        # Pick a code that hashes to this shard so the room lives where it was created
+        engine = manager.create_game(
+            player_id, display_name, config, avatar_url=avatar_url, owned=shard.is_local,
+        )
         room_code = engine.room_code
 
-        await sio.enter_room(sid, room_code)
+        await shard.joined(sid, room_code)
+        await _enter_room(sio, sid, room_code)
         await emit_game_state(sio, engine, player_id)
         await _notify_lobby_update(sio)
         await sio.emit("game_created", {"room_code": room_code}, to=sid)
@@ -279,10 +313,12 @@ def register_handlers(sio: socketio.AsyncServer):
             return
 
         await emit_card_played(sio, engine, player_id, card.to_dict())
+        estimates.notify(sio, engine)
 
         if trick_result.trick_complete:
             await emit_trick_won(sio, engine, trick_result.winner_id, trick_result.trick)
-            await asyncio.sleep(1.5)  # Brief pause to show winning trick before clearing
+            # Brief pause to show winning trick before clearing
+            await admission.sleep(admission.pacing(1.5))
 
             if trick_result.round_over:
                 scores = engine.state.scores_history[-1]
@@ -296,7 +332,7 @@ def register_handlers(sio: socketio.AsyncServer):
                 else:
                     await emit_round_scored(sio, engine, scores, round_num)
                     # Auto-advance to next round after a brief pause
-                    await asyncio.sleep(2)
+                    await admission.sleep(admission.pacing(2))
                     engine.advance_to_next_round()
                     await emit_game_state_to_all(sio, engine)
 
@@ -426,7 +462,7 @@ def register_handlers(sio: socketio.AsyncServer):
             return
 
         room_code, engine = result
-        session = await sio.get_session(sid)
+        session = await shard.session(sid)
         message = (data.get("message", ""))[:200].strip()
         if not message:
             return
@@ -441,17 +477,117 @@ def register_handlers(sio: socketio.AsyncServer):
                 }, to=p_sid)
 
 
-def _start_turn_timer(sio: socketio.AsyncServer, engine: GameEngine, room_code: str):
+async def _enter_room(sio: socketio.AsyncServer, sid: str, room_code: str):
+    # A sid forwarded from another shard isn't connected here. Every emit goes
+    # to=sid, so only local connections need the room membership
+    if sio.manager.is_connected(sid, "/"):
+        await sio.enter_room(sid, room_code)
+
+
+async def _leave_room(sio: socketio.AsyncServer, sid: str, room_code: str):
+    if sio.manager.is_connected(sid, "/"):
+        await sio.leave_room(sid, room_code)
+
+
+def _disconnect_grace_seconds() -> float:
+    if settings.autopilot_enabled:
+        return settings.autopilot_grace_seconds
+    return DISCONNECT_GRACE_SECONDS
+
+
+def _start_disconnect_grace(
+    sio: socketio.AsyncServer, room_code: str, player_id: str, timeout: float | None = None,
+):
+    """Keep a disconnected player's game moving if they don't come back in time."""
+    if timeout is None:
+        timeout = _disconnect_grace_seconds()
+    if settings.autopilot_enabled:
+        # Hand the seat to a bot if they don't come back soon
+        manager.start_disconnect_timer(
+            player_id,
+            lambda pid: _engage_autopilot(sio, room_code, pid),
+            timeout=timeout,
+        )
+    else:
+        # Start auto-play timer for disconnected player
+        manager.start_disconnect_timer(
+            player_id,
+            lambda pid: _on_disconnect_grace_expired(sio, room_code),
+            timeout=timeout,
+        )
+
+
+async def resume_restored_games(
+    sio: socketio.AsyncServer,
+    engines: list[GameEngine],
+    timers: dict[str, RoomTimers] | None = None,
+):
+    """Restart the timers and bot turns of restored games.
+
+    From a checkpoint, every human gets the full grace period to rejoin and the
+    current player a full turn. A handoff snapshot carries the time that was left
+    on each timer, and which seats were already on autopilot.
+    """
+    for engine in engines:
+        room_code = engine.room_code
+        saved = (timers or {}).get(room_code) or RoomTimers()
+        if engine.phase == GamePhase.LOBBY:
+            # Lobby seats kept through a handoff are given up if not reclaimed
+            for p in engine.players:
+                if not p.is_bot:
+                    manager.start_disconnect_timer(
+                        p.player_id,
+                        lambda pid, rc=room_code: _on_lobby_seat_expired(sio, rc, pid),
+                        timeout=DISCONNECT_GRACE_SECONDS,
+                    )
+            continue
+        if engine.phase == GamePhase.SCORING:
+            engine.advance_to_next_round()
+            saved.turn_remaining = None
+        for p in engine.players:
+            if p.is_bot:
+                continue
+            if p.player_id in saved.autopilot:
+                manager.enable_autopilot(engine, p.player_id)
+            else:
+                away = saved.away.get(p.player_id, 0.0)
+                remaining = max(0.0, _disconnect_grace_seconds() - away)
+                _start_disconnect_grace(sio, room_code, p.player_id, timeout=remaining)
+
+        current_id = engine.get_current_player_id()
+        current = engine.state.get_player(current_id) if current_id else None
+        if current and manager.is_bot_controlled(engine, current):
+            asyncio.create_task(_handle_bot_turns(sio, engine), name=f"bot_turns:{room_code}")
+        else:
+            _start_turn_timer(sio, engine, room_code, timeout=saved.turn_remaining)
+
+
+async def notify_rooms_evicted(sio: socketio.AsyncServer, engines: list[GameEngine]):
+    """Tell players still sitting in a reaped lobby, and refresh the lobby list."""
+    for engine in engines:
+        if engine.phase != GamePhase.LOBBY:
+            continue
+        for p in engine.players:
+            sid = manager.get_sid(p.player_id)
+            if sid:
+                await emit_error(sio, sid, "This room was closed after being idle")
+    await _notify_lobby_update(sio)
+
+
+def _start_turn_timer(
+    sio: socketio.AsyncServer, engine: GameEngine, room_code: str, timeout: float | None = None,
+):
     """Start a server-side turn timer for the current human player."""
     current_id = engine.get_current_player_id()
     if not current_id:
         return
 
     player = engine.state.get_player(current_id)
-    if not player or player.is_bot:
+    if not player or manager.is_bot_controlled(engine, player):
         return
 
-    timeout = engine.state.config.turn_timer_seconds
+    if timeout is None:
+        timeout = engine.state.config.turn_timer_seconds
 
     async def _on_timeout(rc: str):
         await _auto_play(sio, rc)
@@ -468,23 +604,30 @@ async def _handle_bot_turns(
     sio: socketio.AsyncServer, engine: GameEngine,
 ):
     """Process bot turns with delays."""
-    from app.bot.basic import BasicBot
-
     while True:
+        if manager.is_abandoned(engine, DISCONNECT_GRACE_SECONDS):
+            await _fast_forward(sio, engine.room_code)
+            return
+
         current_id = engine.get_current_player_id()
         if not current_id:
             logger.info("_handle_bot_turns: no current player, breaking")
             break
 
         player = engine.state.get_player(current_id)
-        if not player or not player.is_bot:
+        if not player or not manager.is_bot_controlled(engine, player):
             logger.info(f"_handle_bot_turns: current player {current_id} is not a bot, breaking")
             break
 
         logger.info(f"_handle_bot_turns: bot {current_id} turn, phase={engine.phase}")
 
         # Delay to feel natural
-        await asyncio.sleep(1.5)
+        await admission.sleep(admission.bot_delay(1.5))
+
+        # An autopiloted player may have reconnected during the pause
+        if (engine.get_current_player_id() != current_id
+                or not manager.is_bot_controlled(engine, player)):
+            break
 
         bot = BasicBot()
 
@@ -492,7 +635,9 @@ async def _handle_bot_turns(
             if engine.phase == GamePhase.BIDDING:
                 valid_bids = engine.get_valid_bids_for_player(current_id)
                 logger.info(f"Bot {current_id} valid bids: {valid_bids}")
+                started = time.perf_counter()
                 bid = bot.choose_bid(player, engine.state, valid_bids)
+                _BOT_BID_SECONDS.observe(time.perf_counter() - started)
                 logger.info(f"Bot {current_id} chose bid: {bid}")
                 engine.place_bid(current_id, bid)
                 await emit_bid_placed(sio, engine, current_id, bid)
@@ -502,10 +647,13 @@ async def _handle_bot_turns(
 
             elif engine.phase == GamePhase.PLAYING:
                 valid_cards = engine.get_valid_cards_for_player(current_id)
+                started = time.perf_counter()
                 card = bot.choose_card(player, engine.state, valid_cards)
+                _BOT_CARD_SECONDS.observe(time.perf_counter() - started)
                 trick_result = engine.play_card(current_id, card)
 
                 await emit_card_played(sio, engine, current_id, card.to_dict())
+                estimates.notify(sio, engine)
 
                 if trick_result.trick_complete:
                     await emit_trick_won(sio, engine, trick_result.winner_id, trick_result.trick)
@@ -520,7 +668,7 @@ async def _handle_bot_turns(
                             return
                         else:
                             await emit_round_scored(sio, engine, scores, round_num)
-                            await asyncio.sleep(2)
+                            await admission.sleep(admission.pacing(2))
                             engine.advance_to_next_round()
                             await emit_game_state_to_all(sio, engine)
             else:
@@ -533,7 +681,7 @@ async def _handle_bot_turns(
         next_id = engine.get_current_player_id()
         if next_id:
             next_player = engine.state.get_player(next_id)
-            if next_player and not next_player.is_bot:
+            if next_player and not manager.is_bot_controlled(engine, next_player):
                 room_code = engine.room_code
                 await emit_your_turn(sio, engine, next_id, engine.state.config.turn_timer_seconds)
                 _start_turn_timer(sio, engine, room_code)
@@ -546,6 +694,10 @@ async def _auto_play(sio: socketio.AsyncServer, room_code: str):
     if not engine:
         return
 
+    if manager.is_abandoned(engine, DISCONNECT_GRACE_SECONDS):
+        await _fast_forward(sio, room_code)
+        return
+
     player_id = engine.get_current_player_id()
     if not player_id:
         return
@@ -573,10 +725,11 @@ async def _auto_play(sio: socketio.AsyncServer, room_code: str):
             card = valid_cards[0]
             trick_result = engine.play_card(player_id, card)
             await emit_card_played(sio, engine, player_id, card.to_dict())
+            estimates.notify(sio, engine)
 
             if trick_result.trick_complete:
                 await emit_trick_won(sio, engine, trick_result.winner_id, trick_result.trick)
-                await asyncio.sleep(1.5)
+                await admission.sleep(admission.pacing(1.5))
 
                 if trick_result.round_over:
                     scores = engine.state.scores_history[-1]
@@ -588,7 +741,7 @@ async def _auto_play(sio: socketio.AsyncServer, room_code: str):
                         return
                     else:
                         await emit_round_scored(sio, engine, scores, round_num)
-                        await asyncio.sleep(2)
+                        await admission.sleep(admission.pacing(2))
                         engine.advance_to_next_round()
                         await emit_game_state_to_all(sio, engine)
         else:
@@ -606,13 +759,90 @@ async def _auto_play(sio: socketio.AsyncServer, room_code: str):
         final_id = engine.get_current_player_id()
         if final_id:
             final_player = engine.state.get_player(final_id)
-            if final_player and not final_player.is_bot:
+            if final_player and not manager.is_bot_controlled(engine, final_player):
                 _start_turn_timer(sio, engine, room_code)
 
 
+async def _on_disconnect_grace_expired(sio: socketio.AsyncServer, room_code: str):
+    """A disconnected player did not come back in time: finish or keep the game moving."""
+    engine = manager.get_engine(room_code)
+    if not engine:
+        return
+    if manager.is_abandoned(engine, DISCONNECT_GRACE_SECONDS):
+        await _fast_forward(sio, room_code)
+    else:
+        await _auto_play(sio, room_code)
+
+
+async def _on_lobby_seat_expired(sio: socketio.AsyncServer, room_code: str, player_id: str):
+    engine = manager.get_engine(room_code)
+    if not engine or engine.state.phase != GamePhase.LOBBY:
+        return
+    player = engine.state.get_player(player_id)
+    if player and not player.is_connected:
+        manager.leave_game(player_id)
+        await emit_player_left(sio, engine, player_id)
+        await _notify_lobby_update(sio)
+
+
+async def _engage_autopilot(sio: socketio.AsyncServer, room_code: str, player_id: str):
+    """Grace period is over: a bot plays this seat on every turn until they rejoin."""
+    engine = manager.get_engine(room_code)
+    if not engine or not manager.enable_autopilot(engine, player_id):
+        return
+
+    logger.info(f"Autopilot engaged for {player_id} in {room_code}")
+    await emit_autopilot(sio, engine, player_id, True)
+
+    if manager.is_abandoned(engine, DISCONNECT_GRACE_SECONDS):
+        await _fast_forward(sio, room_code)
+    elif engine.get_current_player_id() == player_id:
+        _cancel_turn_timer(room_code)
+        await _handle_bot_turns(sio, engine)
+        _start_turn_timer(sio, engine, room_code)
+
+
+async def _fast_forward(sio: socketio.AsyncServer, room_code: str):
+    """Finish a game nobody is watching at engine speed, then report and evict it.
+
+    Every seat is played by a bot with no pacing delays or turn timers. Anyone still
+    subscribed gets one final game_state and game_over instead of a move-by-move replay.
+    """
+    _cancel_turn_timer(room_code)
+    engine = manager.get_engine(room_code)
+    if not engine or engine.phase == GamePhase.GAME_OVER:
+        return
+
+    logger.info(
+        f"Fast-forwarding abandoned game {room_code} "
+        f"from round {engine.state.round_number + 1}"
+    )
+    bots = {p.player_id: BasicBot() for p in engine.players}
+    try:
+        play_to_completion(engine, bots)
+    except (GameError, ValueError) as e:
+        logger.error(f"Fast-forward failed for {room_code}: {e}", exc_info=True)
+        manager.cleanup_game(room_code)
+        return
+
+    await emit_game_state_to_all(sio, engine)
+    await emit_game_over(sio, engine)
+    estimates.forget(room_code)
+    manager.cleanup_game(room_code)
+    await _notify_lobby_update(sio)
+
+
+async def resume_lobby_updates(sio: socketio.AsyncServer):
+    """Send the lobby update held back while the server was overloaded."""
+    await _notify_lobby_update(sio)
+
+
 async def _notify_lobby_update(sio: socketio.AsyncServer):
     """Notify lobby namespace clients of room list changes."""
-    rooms = manager.get_lobby_rooms()
+    if admission.hold_lobby_update():
+        return
+    await shard.publish_lobby()
+    rooms = shard.lobby_rooms()
     # Emit to the /lobby namespace
     with contextlib.suppress(Exception):
         await sio.emit("rooms_updated", {"rooms": rooms}, namespace="/lobby")
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections.abc import Callable
 
 from app.game.engine import GameEngine, GameError, generate_room_code
-from app.game.types import GameConfig, GamePhase
+from app.game.types import GameConfig, GamePhase, PlayerState
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +21,22 @@ class GameRoomManager:
         self.player_to_sid: dict[str, str] = {}  # player_id → socket sid
         self._disconnect_tasks: dict[str, asyncio.Task] = {}  # player_id → auto-play task
         self._turn_timers: dict[str, asyncio.Task] = {}  # room_code → turn timer task
+        self._turn_deadlines: dict[str, float] = {}  # room_code → monotonic deadline
+        # (room_code, player_id) → monotonic time; per room, so leaving doesn't follow them
+        self._disconnected_at: dict[tuple[str, str], float] = {}
+        # (room_code, player_id) of disconnected seats a bot is playing
+        self.autopilot: set[tuple[str, str]] = set()
+        self.draining = False  # set before a restart: no new rooms, lobby seats are kept
 
     def create_game(
         self, host_id: str, host_name: str,
         config: GameConfig | None = None,
         avatar_url: str | None = None,
+        owned: Callable[[str], bool] | None = None,
     ) -> GameEngine:
+        """Create a room hosted by `host_id`; `owned` restricts codes to this shard's."""
         room_code = generate_room_code()
-        while room_code in self.games:
+        while room_code in self.games or (owned and not owned(room_code)):
             room_code = generate_room_code()
 
         engine = GameEngine(room_code=room_code, config=config)
@@ -35,6 +45,21 @@ class GameRoomManager:
         self.player_rooms[host_id] = room_code
         return engine
 
+    def restore_game(self, engine: GameEngine, away: dict[str, float] | None = None):
+        """Install a restored game; its humans start disconnected.
+
+        `away` gives how many seconds each player had already been disconnected.
+        """
+        self.games[engine.room_code] = engine
+        now = time.monotonic()
+        for p in engine.players:
+            if not p.is_bot:
+                self.player_rooms[p.player_id] = engine.room_code
+                engine.set_player_connected(p.player_id, False)
+                self._disconnected_at[engine.room_code, p.player_id] = (
+                    now - (away or {}).get(p.player_id, 0.0)
+                )
+
     def join_game(
         self, room_code: str, player_id: str,
         display_name: str, avatar_url: str | None = None,
@@ -48,10 +73,21 @@ class GameRoomManager:
             if player:
                 player.is_connected = True
                 self.player_rooms[player_id] = room_code
+                self._disconnected_at.pop((room_code, player_id), None)
+                self.autopilot.discard((room_code, player_id))
                 self._cancel_disconnect_timer(player_id)
                 return engine
             raise GameError("Game already in progress")
 
+        player = engine.state.get_player(player_id)
+        if player and not player.is_connected:
+            # Back in a lobby whose seat was kept across a restart
+            player.is_connected = True
+            self.player_rooms[player_id] = room_code
+            self._disconnected_at.pop((room_code, player_id), None)
+            self._cancel_disconnect_timer(player_id)
+            return engine
+
         engine.add_player(player_id, display_name, avatar_url=avatar_url)
         self.player_rooms[player_id] = room_code
         return engine
@@ -67,10 +103,11 @@ class GameRoomManager:
 
         if engine.state.phase == GamePhase.LOBBY:
             engine.remove_player(player_id)
+            self._disconnected_at.pop((room_code, player_id), None)
             if not engine.players:
                 del self.games[room_code]
         else:
-            engine.set_player_connected(player_id, False)
+            self.set_disconnected(engine, player_id)
 
         return room_code, engine
 
@@ -92,8 +129,9 @@ class GameRoomManager:
 
     def unregister_sid(self, sid: str) -> str | None:
         player_id = self.sid_to_player.pop(sid, None)
-        if player_id:
-            self.player_to_sid.pop(player_id, None)
+        # The player may have connected again under a new sid
+        if player_id and self.player_to_sid.get(player_id) == sid:
+            del self.player_to_sid[player_id]
         return player_id
 
     def get_player_id(self, sid: str) -> str | None:
@@ -102,6 +140,45 @@ class GameRoomManager:
     def get_sid(self, player_id: str) -> str | None:
         return self.player_to_sid.get(player_id)
 
+    def set_disconnected(self, engine: GameEngine, player_id: str):
+        """Mark a player in a running game as disconnected, remembering since when."""
+        engine.set_player_connected(player_id, False)
+        self._disconnected_at.setdefault((engine.room_code, player_id), time.monotonic())
+
+    def disconnected_for(self, room_code: str, player_id: str) -> float | None:
+        """Seconds since the player disconnected from the room, or None if they're connected."""
+        since = self._disconnected_at.get((room_code, player_id))
+        return None if since is None else time.monotonic() - since
+
+    def enable_autopilot(self, engine: GameEngine, player_id: str) -> bool:
+        """Let a bot take over a disconnected player's seat. False if they're back."""
+        player = engine.state.get_player(player_id)
+        if not player or player.is_connected or player.is_bot:
+            return False
+        self.autopilot.add((engine.room_code, player_id))
+        return True
+
+    def is_bot_controlled(self, engine: GameEngine, player: PlayerState) -> bool:
+        return player.is_bot or (engine.room_code, player.player_id) in self.autopilot
+
+    def is_abandoned(self, engine: GameEngine, grace: float) -> bool:
+        """True if a running game has no human who is connected or within the grace period.
+
+        A table of only bots counts as abandoned straight away.
+        """
+        if engine.state.phase not in (GamePhase.BIDDING, GamePhase.PLAYING, GamePhase.SCORING):
+            return False
+        now = time.monotonic()
+        for p in engine.players:
+            if p.is_bot:
+                continue
+            if p.is_connected:
+                return False
+            since = self._disconnected_at.get((engine.room_code, p.player_id))
+            if since is None or now - since < grace:
+                return False
+        return True
+
     def get_lobby_rooms(self) -> list[dict]:
         rooms = []
         for code, engine in self.games.items():
@@ -126,7 +203,9 @@ class GameRoomManager:
             await asyncio.sleep(timeout)
             await callback(player_id)
 
-        self._disconnect_tasks[player_id] = asyncio.create_task(_timer())
+        self._disconnect_tasks[player_id] = asyncio.create_task(
+            _timer(), name=f"grace:{player_id}",
+        )
 
     def _cancel_disconnect_timer(self, player_id: str):
         task = self._disconnect_tasks.pop(player_id, None)
@@ -141,20 +220,39 @@ class GameRoomManager:
             await asyncio.sleep(timeout)
             await callback(room_code)
 
-        self._turn_timers[room_code] = asyncio.create_task(_timer())
+        self._turn_timers[room_code] = asyncio.create_task(
+            _timer(), name=f"turn_timer:{room_code}",
+        )
+        self._turn_deadlines[room_code] = time.monotonic() + timeout
+
+    def turn_time_remaining(self, room_code: str) -> float | None:
+        deadline = self._turn_deadlines.get(room_code)
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
 
     def cancel_turn_timer(self, room_code: str):
         """Cancel the turn timer for a room if one exists."""
+        self._turn_deadlines.pop(room_code, None)
         task = self._turn_timers.pop(room_code, None)
         if task:
             task.cancel()
 
+    def pending_timers(self) -> dict[str, int]:
+        return {
+            "turn": sum(not t.done() for t in self._turn_timers.values()),
+            "disconnect": sum(not t.done() for t in self._disconnect_tasks.values()),
+        }
+
     def cleanup_game(self, room_code: str):
         self.cancel_turn_timer(room_code)
         engine = self.games.pop(room_code, None)
         if engine:
             for p in engine.players:
-                self.player_rooms.pop(p.player_id, None)
+                self._disconnected_at.pop((room_code, p.player_id), None)
+                self.autopilot.discard((room_code, p.player_id))
+                # The player may already have moved on to another room
+                if self.player_rooms.get(p.player_id) != room_code:
+                    continue
+                del self.player_rooms[p.player_id]
                 self._cancel_disconnect_timer(p.player_id)
 
 
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+
+import socketio
+from engineio import packet as eio_packet
+
+from app.metrics import (
+    registry,
+    socket_emitted_bytes,
+    socket_emitted_messages,
+    socket_handler_seconds,
+)
+from app.sockets.manager import manager
+
+
+def _event_name(encoded: str) -> str | None:
+    """Event name of an encoded Socket.IO EVENT packet, e.g. '2/lobby,["rooms_updated",…'."""
+    if not encoded.startswith("2"):
+        return None
+    start = encoded.find('["')
+    if start < 0:
+        return None
+    end = encoded.find('"', start + 2)
+    return encoded[start + 2:end] if end > 0 else None
+
+
+def attach(sio: socketio.AsyncServer):
+    """Time every event handler and count what is emitted, per event name.
+
+    Attach last, so handler timings include shard routing and drain tracking.
+    Connect and disconnect are left alone: python-socketio retries a legacy
+    one-argument disconnect handler on TypeError, which a wrapper would hide.
+    """
+    for namespace, handlers in sio.handlers.items():
+        for event, handler in list(handlers.items()):
+            if namespace == "/" and event not in ("connect", "disconnect"):
+                handlers[event] = _timed(event, handler)
+
+    send = sio._send_eio_packet
+    messages: dict[str, object] = {}
+    sizes: dict[str, object] = {}
+
+    async def counted(eio_sid, pkt):
+        data = pkt.data
+        if pkt.packet_type == eio_packet.MESSAGE and isinstance(data, str):
+            event = _event_name(data)
+            if event is not None:
+                counter = messages.get(event)
+                if counter is None:
+                    counter = messages[event] = socket_emitted_messages.labels(event)
+                    sizes[event] = socket_emitted_bytes.labels(event)
+                counter.inc()
+                sizes[event].inc(len(data))
+        await send(eio_sid, pkt)
+
+    sio._send_eio_packet = counted
+
+
+def _timed(event: str, handler):
+    histogram = socket_handler_seconds.labels(event)
+
+    async def timed(*args):
+        # Lets the loop monitor say which event and room a stalled handler belongs to
+        asyncio.current_task().set_name(f"sio:{event}:{args[0]}")
+        started = time.perf_counter()
+        try:
+            return await handler(*args)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return timed
+
+
+def _rooms_by_phase() -> dict:
+    phases = Counter(engine.phase.value for engine in manager.games.values())
+    return {(phase,): n for phase, n in phases.items()}
+
+
+registry.gauge("rooms", "Live rooms on this worker, by phase", _rooms_by_phase, labels=("phase",))
+registry.gauge(
+    "socketio_connected_sids", "Socket.IO sessions known to this worker",
+    lambda: {(): len(manager.sid_to_player)},
+)
+registry.gauge(
+    "pending_timers", "Turn and disconnect-grace timers not yet fired",
+    lambda: {(kind,): n for kind, n in manager.pending_timers().items()},
+    labels=("kind",),
+)
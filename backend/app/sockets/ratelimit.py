@@ -0,0 +1,187 @@
+"""Token-bucket limits on the socket events that cost the server the most.
+
+Each connection gets one bucket per limited event, and so does each player
+across all of their connections, at `player_factor` times the per-connection
+budget. A check refills the bucket from the time since its last use and takes
+one token, so it is O(1) and there is no background refill task. Connection
+buckets are dropped on disconnect. A player's buckets are dropped with their
+last connection, unless they are still short of tokens: those are parked until
+they would have refilled, so reconnecting doesn't reset a player's budget.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+
+import socketio
+
+from app.config import settings
+from app.metrics import registry
+from app.sockets.emitters import emit_error
+from app.sockets.manager import manager
+
+logger = logging.getLogger(__name__)
+
+rate_limited = registry.counter(
+    "socketio_rate_limited_total", "Socket.IO events dropped by the rate limiter",
+    labels=("event", "scope"),
+)
+
+
+@dataclass(frozen=True)
+class Budget:
+    rate: float  # tokens added per second
+    burst: int  # bucket size
+
+    def scaled(self, factor: float) -> Budget:
+        return Budget(self.rate * factor, max(1, round(self.burst * factor)))
+
+
+# Per connection; a human player never gets near these
+DEFAULT_BUDGETS = {
+    "create_game": Budget(rate=0.1, burst=3),
+    "send_chat": Budget(rate=1.0, burst=5),
+    "play_card": Budget(rate=4.0, burst=8),
+    "place_bid": Budget(rate=4.0, burst=8),
+    "update_config": Budget(rate=4.0, burst=10),
+    "add_bot": Budget(rate=2.0, burst=7),
+}
+
+
+class TokenBucket:
+    __slots__ = ("budget", "tokens", "stamp")
+
+    def __init__(self, budget: Budget, now: float):
+        self.budget = budget
+        self.tokens = float(budget.burst)
+        self.stamp = now
+
+    def take(self, now: float) -> float:
+        """Take a token; 0.0 if there was one, otherwise seconds until there will be."""
+        rate, burst = self.budget.rate, self.budget.burst
+        self.tokens = min(burst, self.tokens + (now - self.stamp) * rate)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / rate
+
+    def full_at(self) -> float:
+        return self.stamp + (self.budget.burst - self.tokens) / self.budget.rate
+
+
+class RateLimiter:
+    def __init__(self, budgets: dict[str, Budget], player_factor: float = 2.0):
+        self.budgets = budgets
+        self.player_budgets = {e: b.scaled(player_factor) for e, b in budgets.items()}
+        self._sids: dict[str, dict[str, TokenBucket]] = {}
+        self._players: dict[str, dict[str, TokenBucket]] = {}
+        self._player_sids: dict[str, set[str]] = {}
+        self._parked: dict[str, float] = {}  # player_id → when their buckets are full again
+        self.dropped = 0
+
+    def attach(self, sio: socketio.AsyncServer):
+        """Check limited events before they are handled or routed to another shard.
+
+        Attach after the shard router, so a gateway drops floods before forwarding them.
+        """
+        handlers = sio.handlers["/"]
+        for event in self.budgets:
+            if event in handlers:
+                handlers[event] = self._limited(sio, event, handlers[event])
+        if "disconnect" in handlers:
+            handlers["disconnect"] = self._forgetting(handlers["disconnect"])
+
+    def _limited(self, sio: socketio.AsyncServer, event: str, handler):
+        sid_drops = rate_limited.labels(event, "sid")
+        player_drops = rate_limited.labels(event, "player")
+
+        async def limited(sid, *args):
+            wait, scope = self.check(sid, manager.get_player_id(sid), event)
+            if wait:
+                self.dropped += 1
+                (sid_drops if scope == "sid" else player_drops).inc()
+                await emit_error(sio, sid, "Too many requests, slow down", round(wait, 2))
+                return None
+            return await handler(sid, *args)
+
+        return limited
+
+    def _forgetting(self, handler):
+        async def forgetting(sid, *args):
+            player_id = manager.get_player_id(sid)
+            try:
+                return await handler(sid, *args)
+            finally:
+                self.forget(sid, player_id)
+
+        return forgetting
+
+    def check(self, sid: str, player_id: str | None, event: str,
+              now: float | None = None) -> tuple[float, str]:
+        """(seconds to wait, scope) if `event` is over budget, else (0.0, "")."""
+        now = time.monotonic() if now is None else now
+        buckets = self._sids.get(sid)
+        if buckets is None:
+            buckets = self._sids[sid] = {}
+        bucket = buckets.get(event)
+        if bucket is None:
+            bucket = buckets[event] = TokenBucket(self.budgets[event], now)
+        wait = bucket.take(now)
+        if wait:
+            return wait, "sid"
+        if player_id is None:
+            return 0.0, ""
+
+        buckets = self._players.get(player_id)
+        if buckets is None:
+            buckets = self._players[player_id] = {}
+        self._parked.pop(player_id, None)
+        sids = self._player_sids.get(player_id)
+        if sids is None:
+            sids = self._player_sids[player_id] = set()
+        sids.add(sid)
+        bucket = buckets.get(event)
+        if bucket is None:
+            bucket = buckets[event] = TokenBucket(self.player_budgets[event], now)
+        wait = bucket.take(now)
+        if wait:
+            # Give back the connection's token, so only one bucket is charged
+            self._sids[sid][event].tokens += 1.0
+            return wait, "player"
+        return 0.0, ""
+
+    def forget(self, sid: str, player_id: str | None, now: float | None = None):
+        """Drop a closed connection's buckets, and its player's once none are left."""
+        now = time.monotonic() if now is None else now
+        self._sids.pop(sid, None)
+        sids = self._player_sids.get(player_id) if player_id else None
+        if sids is not None:
+            sids.discard(sid)
+            if not sids:
+                del self._player_sids[player_id]
+                buckets = self._players.get(player_id, {})
+                full_at = max((b.full_at() for b in buckets.values()), default=now)
+                if full_at > now:
+                    self._parked[player_id] = full_at
+                else:
+                    self._players.pop(player_id, None)
+        # Parked players are roughly in refill order; drop the ones that have refilled
+        while self._parked:
+            player_id, full_at = next(iter(self._parked.items()))
+            if full_at > now:
+                break
+            del self._parked[player_id]
+            self._players.pop(player_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "dropped": self.dropped,
+            "connections": len(self._sids),
+            "players": len(self._players),
+            "parked": len(self._parked),
+        }
+
+
+rate_limiter = RateLimiter(DEFAULT_BUDGETS, player_factor=settings.rate_limit_player_factor)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.config import settings
+from app.game.deck import create_deck
+from app.game.engine import GameEngine
+from app.game.types import (
+    Card,
+    GamePhase,
+    PlayerState,
+    RoundScoreEntry,
+    RoundState,
+    TrickCard,
+)
+from app.metrics import registry
+from app.sockets.estimates import estimates
+from app.sockets.manager import manager
+
+logger = logging.getLogger(__name__)
+
+FINISHED_PHASES = (GamePhase.GAME_OVER, GamePhase.FINISHED)
+
+rooms_evicted = registry.counter(
+    "rooms_evicted_total", "Rooms dropped from memory by the reaper", labels=("reason",),
+)
+
+
+def _allocated(factory: Callable[[int], object], n: int = 256) -> int:
+    """Average bytes held by an object built by `factory`, measured with tracemalloc."""
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [factory(i) for i in range(n)]
+        held = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(kept)
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return max(0, held // n)
+
+
+# Approximate sizes of the objects a room holds, measured once on this interpreter
+_CARDS = create_deck()
+_REF = 8  # one list or dict slot
+_ROOM = _allocated(lambda i: GameEngine(f"R{i:05d}"))
+_PLAYER = _allocated(
+    lambda i: PlayerState(f"{i:08d}-0000-0000-0000-000000000000", f"Player {i}", 0)
+) + _REF
+_CARD = _allocated(lambda i: Card(_CARDS[i % 52].suit, _CARDS[i % 52].rank)) + _REF
+_ROUND = _allocated(lambda i: RoundState(i, 1, None, None, 0))
+_TRICK_CARD = _allocated(lambda i: TrickCard("p", _CARDS[0])) + _REF
+_SCORE_ENTRY = _allocated(lambda i: RoundScoreEntry("p", 1, 2, 30, 1000 + i)) + _REF
+_LIST = sys.getsizeof([])
+
+
+def estimate_room_bytes(engine: GameEngine) -> int:
+    """Rough resident size of a room, from counts of the objects it holds.
+
+    Cheap enough to run for every room on each sweep, and close to what tracemalloc
+    reports for a real game.
+    """
+    state = engine.state
+    size = _ROOM + len(state.players) * _PLAYER
+    cards = sum(len(p.hand) for p in state.players)
+    rs = state.round_state
+    if rs is not None:
+        played = sum(len(t) for t in rs.tricks) + len(rs.current_trick)
+        size += _ROUND + sys.getsizeof(rs.bids) + len(rs.tricks) * _LIST
+        size += played * _TRICK_CARD
+        cards += played + (rs.trump_card is not None)
+    size += cards * _CARD
+    for rnd in state.scores_history:
+        size += _LIST + len(rnd) * _SCORE_ENTRY
+    return size
+
+
+@dataclass
+class ReaperStats:
+    sweeps: int = 0
+    evicted_finished: int = 0
+    evicted_idle: int = 0
+    live_rooms: int = 0
+    estimated_bytes: int = 0
+    last_duration_ms: float = 0.0
+    failures: int = 0
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class RoomReaper:
+    """Evicts finished games after a grace period and lobbies left idle past a TTL.
+
+    A room's clock restarts whenever its phase or engine revision changes, so the
+    sweep needs no hooks in the game handlers. Eviction goes through
+    `manager.cleanup_game`, which cancels the room's timers and frees its players'
+    room mappings. The per-room size estimate is cached by revision.
+    """
+
+    def __init__(self, interval: float, finished_grace: float, lobby_ttl: float):
+        self.interval = interval
+        self.finished_grace = finished_grace
+        self.lobby_ttl = lobby_ttl
+        self.stats = ReaperStats()
+        self._seen: dict[str, tuple[int, GamePhase, float]] = {}  # code → (rev, phase, since)
+        self._bytes: dict[str, tuple[int, int]] = {}  # room_code → (revision, bytes)
+        self._task: asyncio.Task | None = None
+
+    def start(self, on_evicted: Callable[[list[GameEngine]], Awaitable[None]] | None = None):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(on_evicted))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self, on_evicted):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                evicted = self.sweep()
+                if evicted and on_evicted is not None:
+                    await on_evicted(evicted)
+            except Exception as e:
+                self.stats.failures += 1
+                logger.error(f"Room reaper sweep failed: {e}", exc_info=True)
+
+    def _expired(self, phase: GamePhase, idle: float) -> bool:
+        if phase in FINISHED_PHASES:
+            return idle >= self.finished_grace
+        return phase == GamePhase.LOBBY and idle >= self.lobby_ttl
+
+    def sweep(self, now: float | None = None) -> list[GameEngine]:
+        """Evict expired rooms and refresh the size totals. Returns the evicted engines."""
+        started = time.perf_counter()
+        now = time.monotonic() if now is None else now
+        evicted = []
+        total = 0
+        for code, engine in list(manager.games.items()):
+            seen = self._seen.get(code)
+            if seen is None or seen[0] != engine.revision or seen[1] != engine.phase:
+                self._seen[code] = (engine.revision, engine.phase, now)
+            elif self._expired(engine.phase, now - seen[2]):
+                evicted.append(engine)
+                continue
+            cached = self._bytes.get(code)
+            if cached is None or cached[0] != engine.revision:
+                cached = self._bytes[code] = (engine.revision, estimate_room_bytes(engine))
+            total += cached[1]
+
+        for engine in evicted:
+            code = engine.room_code
+            if engine.phase in FINISHED_PHASES:
+                self.stats.evicted_finished += 1
+                rooms_evicted.labels("finished").inc()
+            else:
+                self.stats.evicted_idle += 1
+                rooms_evicted.labels("idle").inc()
+            manager.cleanup_game(code)
+            estimates.forget(code)
+        for code in [code for code in self._seen if code not in manager.games]:
+            del self._seen[code]
+            self._bytes.pop(code, None)
+
+        self.stats.sweeps += 1
+        self.stats.live_rooms = len(manager.games)
+        self.stats.estimated_bytes = total
+        self.stats.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} room(s); {len(manager.games)} live")
+        return evicted
+
+
+reaper = RoomReaper(
+    interval=settings.room_reaper_interval_seconds,
+    finished_grace=settings.room_finished_grace_seconds,
+    lobby_ttl=settings.room_lobby_ttl_seconds,
+)
+
+registry.gauge(
+    "rooms_estimated_bytes", "Estimated memory held by live rooms, as of the last sweep",
+    lambda: {(): reaper.stats.estimated_bytes},
+)
@@ -0,0 +1,572 @@
+"""Room sharding across worker processes.
+
+Each room belongs to one shard (worker process), picked by a consistent hash of
+its room code. A client may be connected to any worker: events about a room the
+worker doesn't own are forwarded over a message bus to the shard that does, and
+every emit goes through python-socketio's pub/sub client manager on the same bus,
+so it reaches the client whichever worker holds the connection. Emits to a
+client on another worker travel as an already-encoded Socket.IO packet, which
+that worker writes to the connection as is. Shards also share their lobby room
+lists and user-data invalidations over the bus.
+
+Gateway workers own no rooms: they only hold connections, authenticate them and
+forward every room event, including create_game, to the engine shards. Game
+logic, bot turns and payload encoding then run on the engine shards' cores while
+the gateways' event loops stay free for socket I/O.
+
+The bus is a small fan-out broker on a Unix socket, which covers one machine.
+Run several shards with:
+
+    python -m app.sockets.sharding --workers 4 --port 8001
+
+    python -m app.sockets.sharding --workers 4 --gateways 2 --port 8001
+
+Worker i listens on port + i, and gateways follow the engine shards. The proxy in
+front must keep each client on one worker (e.g. nginx `ip_hash`) because the
+long-polling transport is stateful; with gateways, send clients only to them.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from pathlib import Path
+
+import socketio
+from engineio import packet as eio_packet
+from socketio import packet
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from app.config import settings
+from app.database import async_session, read_routing
+from app.services.leaderboard import leaderboard
+from app.services.profiles import invalidate_users
+from app.sockets.manager import manager
+
+logger = logging.getLogger(__name__)
+
+# Events routed to the shard owning the sender's room; create_game and connect
+# are handled where they arrive, except that gateways forward create_game.
+ROUTED_EVENTS = (
+    "join_game", "leave_game", "start_game", "place_bid", "play_card", "add_bot",
+    "remove_bot", "update_config", "send_chat", "disconnect",
+)
+
+FORWARD = "shard_event"
+ROUTE = "shard_route"
+LOBBY = "shard_lobby"
+LOBBY_SYNC = "shard_lobby_sync"
+USERS_CHANGED = "shard_users_changed"
+CHECKPOINTED = "shard_checkpointed"
+PACKET = "shard_packet"
+SHARD_METHODS = {FORWARD, ROUTE, LOBBY, LOBBY_SYNC, USERS_CHANGED, CHECKPOINTED}
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash of keys onto `shards` shards, `vnodes` points per shard.
+
+    Changing the shard count moves only about 1/shards of the keys.
+    """
+
+    def __init__(self, shards: int, vnodes: int = 64):
+        points = sorted((_hash(f"shard-{s}-{v}"), s) for s in range(shards) for v in range(vnodes))
+        self._points = [p for p, _ in points]
+        self._shards = [s for _, s in points]
+
+    def owner(self, key: str) -> int:
+        i = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._shards[i]
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    size = int.from_bytes(await reader.readexactly(4), "big")
+    return await reader.readexactly(size)
+
+
+def frame(payload: bytes) -> bytes:
+    return len(payload).to_bytes(4, "big") + payload
+
+
+class Broker:
+    """Fan-out message broker on a Unix socket: every frame a client sends is
+    relayed to every other connected client, in order."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self):
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        try:
+            while True:
+                data = frame(await read_frame(reader))
+                peers = [w for w in self._clients if w is not writer]
+                for peer in peers:
+                    peer.write(data)
+                # A slow peer slows its senders rather than growing buffers without bound
+                await asyncio.gather(*(p.drain() for p in peers), return_exceptions=True)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+
+class UnixSocketManager(AsyncPubSubManager):
+    """Socket.IO client manager publishing through a `Broker`.
+
+    Shard control messages arriving on the bus are handed to `router` instead of
+    the Socket.IO machinery.
+    """
+
+    name = "unixsocket"
+
+    def __init__(self, path: str, router: ShardRouter, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.router = router
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def emit(self, event, data, namespace=None, room=None, skip_sid=None,
+                   callback=None, to=None, **kwargs):
+        room = to or room
+        if callback is None and isinstance(room, str):
+            # A client connected to this worker needs no round trip through the bus
+            if self.is_connected(room, namespace or "/"):
+                kwargs["ignore_queue"] = True
+            elif skip_sid is None and await self._emit_encoded(event, data, namespace, room):
+                return
+        return await super().emit(event, data, namespace=namespace, room=room,
+                                  skip_sid=skip_sid, callback=callback, **kwargs)
+
+    async def _emit_encoded(self, event, data, namespace, room: str) -> bool:
+        """Encode the packet here, once, so the receiving worker only writes it out.
+
+        False for binary payloads, which take the regular pub/sub path.
+        """
+        namespace = namespace or "/"
+        args = list(data) if isinstance(data, tuple) else [] if data is None else [data]
+        if packet.Packet.data_is_binary(args):
+            return False
+        encoded = self.server.packet_class(
+            packet.EVENT, namespace=namespace, data=[event, *args],
+        ).encode()
+        await self._deliver(namespace, room, encoded)
+        await self.send({"method": PACKET, "namespace": namespace, "room": room,
+                         "packet": encoded})
+        return True
+
+    async def _deliver(self, namespace: str, room: str, encoded: str):
+        pkt = eio_packet.Packet(eio_packet.MESSAGE, encoded)
+        for _, eio_sid in self.get_participants(namespace, room):
+            await self.server._send_eio_packet(eio_sid, pkt)
+
+    async def send(self, message: dict):
+        await self._publish({**message, "host_id": self.host_id})
+
+    async def _connect(self) -> asyncio.StreamReader:
+        async with self._lock:
+            delay = 0.1
+            while self._reader is None:
+                try:
+                    self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+                except OSError as e:
+                    logger.warning(f"Shard bus unavailable at {self.path}: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 5.0)
+            return self._reader
+
+    def _reset(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _publish(self, data):
+        await self._connect()
+        try:
+            self._writer.write(frame(json.dumps(data, separators=(",", ":")).encode()))
+            await self._writer.drain()
+        except ConnectionError as e:
+            logger.warning(f"Shard bus write failed: {e}")
+            self._reset()
+
+    async def _listen(self):
+        while True:
+            reader = await self._connect()
+            try:
+                message = json.loads(await read_frame(reader))
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                logger.warning(f"Shard bus connection lost: {e}")
+                self._reset()
+                continue
+            if message.get("method") == PACKET:
+                if message.get("host_id") != self.host_id:
+                    await self._deliver(message["namespace"], message["room"], message["packet"])
+                continue
+            if message.get("method") in SHARD_METHODS:
+                if message.get("host_id") != self.host_id:
+                    self.router.receive(message)
+                continue
+            yield message
+
+
+class ShardRouter:
+    """This process's view of the shard layout, and the forwarding between shards.
+
+    With a single shard and no gateways (the default) everything is handled
+    locally and nothing here touches a bus. A gateway takes a `shard_id` past the
+    `shard_count` engine shards, so no room hashes to it.
+    """
+
+    def __init__(self, shard_id: int, shard_count: int, bus_path: str,
+                 lobby_interval: float = 15.0, gateway: bool = False, gateways: int = 0):
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+        self.gateway = gateway
+        self.gateways = gateways
+        self.bus_path = bus_path
+        self.lobby_interval = lobby_interval
+        self.ring = HashRing(shard_count)
+        self.routes: dict[str, str] = {}  # local sid → room code its events go to
+        self.remote_sessions: dict[str, dict] = {}  # sid on another worker → session
+        self.remote_rooms: dict[int, tuple[float, list[dict]]] = {}  # shard → (at, rooms)
+        self.forwarded = 0
+        self.received = 0
+        self.sio: socketio.AsyncServer | None = None
+        self.bus: UnixSocketManager | None = None
+        self._handlers: dict = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._heartbeat: asyncio.Task | None = None
+        self._on_checkpointed: Callable[[], Awaitable] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.shard_count > 1 or self.gateway or self.gateways > 0
+
+    def owner(self, room_code: str) -> int:
+        return self.ring.owner(room_code) if self.enabled else self.shard_id
+
+    def is_local(self, room_code: str) -> bool:
+        return self.owner(room_code) == self.shard_id
+
+    def client_manager(self) -> UnixSocketManager | None:
+        if not self.enabled:
+            return None
+        self.bus = UnixSocketManager(self.bus_path, self)
+        return self.bus
+
+    def attach(self, sio: socketio.AsyncServer):
+        """Wrap the registered room event handlers with shard routing."""
+        self.sio = sio
+        if not self.enabled:
+            return
+        handlers = sio.handlers["/"]
+        # Engine shards run create_game for the gateways
+        self._handlers = {event: handlers[event] for event in (*ROUTED_EVENTS, "create_game")}
+        for event in (*ROUTED_EVENTS, "create_game") if self.gateway else ROUTED_EVENTS:
+            handlers[event] = self._routed(event)
+
+    async def start(self, on_checkpointed: Callable[[], Awaitable] | None = None):
+        """Join the bus; `on_checkpointed` restores rooms another shard checkpointed for us."""
+        self._on_checkpointed = on_checkpointed
+        if not self.enabled or self.sio is None:
+            return
+        # The server would otherwise start the bus listener on the first client connect
+        if not self.sio.manager_initialized:
+            self.sio.manager_initialized = True
+            self.sio.manager.initialize()
+        await self.bus.send({"method": LOBBY_SYNC})
+        self._heartbeat = asyncio.get_running_loop().create_task(self._publish_lobby_forever())
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._heartbeat
+            self._heartbeat = None
+
+    async def session(self, sid: str) -> dict:
+        """Socket session for `sid`, whichever worker it is connected to."""
+        remote = self.remote_sessions.get(sid)
+        return remote if remote is not None else await self.sio.get_session(sid)
+
+    async def joined(self, sid: str, room_code: str):
+        """Send `sid`'s later events to `room_code`'s shard."""
+        if not self.enabled:
+            return
+        if sid in self.remote_sessions:
+            await self.bus.send({"method": ROUTE, "sid": sid, "room_code": room_code})
+            return
+        previous = self.routes.get(sid)
+        self.routes[sid] = room_code
+        if previous is not None and self.owner(previous) != self.owner(room_code):
+            # Lets the shard of the previous room drop what it held for this sid
+            await self.bus.send({"method": ROUTE, "sid": sid, "room_code": room_code})
+
+    # ── event forwarding ──────────────────────────────────
+
+    def _routed(self, event: str):
+        handler = self._handlers[event]
+
+        async def route(sid, *args):
+            if event == "join_game":
+                data = args[0] if args else None
+                room_code = str((data or {}).get("room_code", "")).strip().upper()
+            else:
+                room_code = self.routes.get(sid)
+            if event in ("disconnect", "leave_game"):
+                self.routes.pop(sid, None)
+            if event != "create_game" and (not room_code or self.is_local(room_code)):
+                # Disconnect handlers take no reason argument
+                return await (handler(sid) if event == "disconnect" else handler(sid, *args))
+
+            self.forwarded += 1
+            session = await self.sio.get_session(sid)
+            if event == "create_game":
+                # A gateway creates rooms on an engine shard picked by the creator
+                target = self.ring.owner(f"player:{session['player_id']}")
+            else:
+                target = self.owner(room_code)
+            data = None if event == "disconnect" else (args[0] if args else None)
+            await self.bus.send({
+                "method": FORWARD, "shard": target, "event": event,
+                "sid": sid, "session": session, "data": data,
+            })
+            if event == "disconnect":
+                manager.unregister_sid(sid)
+
+        return route
+
+    def receive(self, message: dict):
+        """Handle a shard message from the bus without blocking the listener."""
+        method = message["method"]
+        if method == FORWARD:
+            if message["shard"] == self.shard_id:
+                name = f"sio:{message['event']}:{message['sid']}"
+                self._spawn(self._handle_forwarded(message), name=name)
+        elif method == ROUTE:
+            sid, room_code = message["sid"], message["room_code"]
+            if self.sio.manager.is_connected(sid, "/"):
+                self.routes[sid] = room_code
+            elif sid in self.remote_sessions and not self.is_local(room_code):
+                # The sid's events go to another shard from now on
+                self._forget_remote(sid)
+        elif method == LOBBY:
+            self.remote_rooms[message["shard"]] = (time.monotonic(), message["rooms"])
+        elif method == LOBBY_SYNC:
+            self._spawn(self.publish_lobby())
+        elif method == USERS_CHANGED:
+            self._spawn(self._apply_users_changed(message["user_ids"]))
+        elif method == CHECKPOINTED:
+            self._spawn(self._restore_checkpointed(message["room_codes"]))
+
+    def _spawn(self, coro, name: str | None = None):
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle_forwarded(self, message: dict):
+        self.received += 1
+        sid, event, session = message["sid"], message["event"], message["session"]
+        self.remote_sessions[sid] = session
+        manager.register_sid(sid, session["player_id"])
+        handler = self._handlers[event]
+        try:
+            if event == "disconnect":
+                await handler(sid)
+            else:
+                await handler(sid, message["data"])
+        except Exception as e:
+            logger.error(f"Forwarded {event} from {sid} failed: {e}", exc_info=True)
+        finally:
+            if event == "disconnect":
+                self.remote_sessions.pop(sid, None)
+            elif (event in ("join_game", "leave_game")
+                  and manager.get_player_engine(session["player_id"]) is None):
+                # Left, or never got in: this shard won't hear from the sid again
+                self._forget_remote(sid)
+
+    def _forget_remote(self, sid: str):
+        self.remote_sessions.pop(sid, None)
+        manager.unregister_sid(sid)
+
+    async def rooms_checkpointed(self, room_codes: list[str]):
+        """Tell the owners of `room_codes` to restore them from their checkpoints."""
+        if self.enabled:
+            await self.bus.send({"method": CHECKPOINTED, "room_codes": room_codes})
+
+    async def _restore_checkpointed(self, room_codes: list[str]):
+        if self._on_checkpointed is None or not any(self.is_local(c) for c in room_codes):
+            return
+        try:
+            await self._on_checkpointed()
+        except Exception as e:
+            logger.error(f"Restoring rooms checkpointed by another shard failed: {e}",
+                         exc_info=True)
+
+    # ── lobby aggregation ─────────────────────────────────
+
+    def lobby_rooms(self) -> list[dict]:
+        """Open rooms on every shard; entries from a shard that went quiet expire."""
+        rooms = manager.get_lobby_rooms()
+        stale_before = time.monotonic() - 3 * self.lobby_interval
+        for shard, (at, remote) in list(self.remote_rooms.items()):
+            if at < stale_before:
+                del self.remote_rooms[shard]
+            else:
+                rooms.extend(remote)
+        return rooms
+
+    async def publish_lobby(self):
+        if self.enabled and not self.gateway:
+            await self.bus.send({
+                "method": LOBBY, "shard": self.shard_id, "rooms": manager.get_lobby_rooms(),
+            })
+
+    async def _publish_lobby_forever(self):
+        while True:
+            try:
+                await self.publish_lobby()
+            except Exception as e:
+                logger.warning(f"Lobby heartbeat failed: {e}")
+            await asyncio.sleep(self.lobby_interval)
+
+    # ── cache coherence ───────────────────────────────────
+
+    async def users_changed(self, user_ids: Iterable[object]):
+        """Tell the other shards these users' stats or profiles changed."""
+        if self.enabled:
+            await self.bus.send({
+                "method": USERS_CHANGED, "user_ids": [str(u) for u in user_ids],
+            })
+
+    async def _apply_users_changed(self, raw_ids: list[str]):
+        user_ids = {uuid.UUID(u) for u in raw_ids}
+        invalidate_users(user_ids)
+        read_routing.note_write(user_ids)
+        if leaderboard.loaded:
+            async with async_session() as db:
+                await leaderboard.refresh_users(db, user_ids)
+
+    def stats(self) -> dict:
+        return {
+            "shard_id": self.shard_id,
+            "shard_count": self.shard_count,
+            "gateway": self.gateway,
+            "routes": len(self.routes),
+            "remote_sessions": len(self.remote_sessions),
+            "forwarded": self.forwarded,
+            "received": self.received,
+        }
+
+
+shard = ShardRouter(
+    shard_id=settings.shard_id,
+    shard_count=settings.shard_count,
+    bus_path=settings.shard_bus_path,
+    lobby_interval=settings.shard_lobby_interval,
+    gateway=settings.shard_gateway,
+    gateways=settings.shard_gateways,
+)
+
+
+# ── launcher ──────────────────────────────────────────────
+
+async def _launch(workers: int, host: str, port: int, gateways: int = 0) -> int:
+    broker = Broker(settings.shard_bus_path)
+    await broker.start()
+    journal = Path(settings.persistence_journal_path)
+    snapshot = Path(settings.handoff_snapshot_path)
+    procs = []
+    total = workers + gateways
+    for i in range(total):
+        env = {
+            **os.environ,
+            "SHARD_ID": str(i),
+            "SHARD_COUNT": str(workers),
+            "SHARD_GATEWAYS": str(gateways),
+            "SHARD_BUS_PATH": settings.shard_bus_path,
+            "PERSISTENCE_JOURNAL_PATH": str(journal.with_stem(f"{journal.stem}-{i}")),
+            "HANDOFF_SNAPSHOT_PATH": str(snapshot.with_stem(f"{snapshot.stem}-{i}")),
+            # One purger is enough for the whole database
+            "ANON_PURGE_ENABLED": str(settings.anon_purge_enabled and i == 0).lower(),
+        }
+        if i >= workers:
+            # Gateways hold no rooms, so there is nothing to checkpoint or hand off
+            env.update({
+                "SHARD_GATEWAY": "true",
+                "CHECKPOINT_ENABLED": "false",
+                "HANDOFF_ENABLED": "false",
+            })
+        procs.append(await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", host, "--port", str(port + i), env=env,
+        ))
+    logger.info(f"Started {workers} shards on ports {port}-{port + workers - 1}")
+    if gateways:
+        logger.info(f"Started {gateways} gateways on ports {port + workers}-{port + total - 1}")
+
+    # Run until signalled or until any shard exits, then stop them all
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    waits = [asyncio.ensure_future(p.wait()) for p in procs]
+    await asyncio.wait(
+        [*waits, asyncio.ensure_future(stopping.wait())], return_when=asyncio.FIRST_COMPLETED,
+    )
+    for p in procs:
+        if p.returncode is None:
+            p.send_signal(signal.SIGTERM)
+    await asyncio.gather(*waits)
+    await broker.stop()
+    return 0 if stopping.is_set() else 1
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the server as several room shards")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--gateways", type=int, default=0,
+        help="extra workers that only hold client connections, after the engine shards",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001, help="port of shard 0")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_launch(args.workers, args.host, args.port, args.gateways)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""Load generator: simulated players playing full games against a running server.
+
+    python -m loadtest --url http://localhost:8000 --tables 500 --slo loadtest/slo.json
+
+Each table is a host and guests, every one an anonymous user with its own
+Socket.IO connection, plus any server bots the host adds. The run reports
+action-to-`your_turn` latency percentiles, message rates, the server's CPU and
+memory (scraped from /metrics) and, given an SLO file, a pass/fail verdict.
+Needs the `loadtest` extra (the asyncio Socket.IO client).
+"""
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from loadtest.client import LoadTestOptions, Stats, run_load
+from loadtest.report import ServerSampler, check_slo
+
+
+def _think(value: str) -> tuple[float, float]:
+    low, _, high = value.partition(":")
+    low_s, high_s = float(low), float(high or low)
+    if not 0 <= low_s <= high_s:
+        raise argparse.ArgumentTypeError("think time must be MIN:MAX with 0 <= MIN <= MAX")
+    return low_s, high_s
+
+
+def build_report(options: LoadTestOptions, stats: Stats, elapsed: float, server: dict) -> dict:
+    errors = sum(stats.errors.values())
+    started = stats.games_started
+    return {
+        "options": {**options.__dict__, "think": list(options.think)},
+        "duration_seconds": round(elapsed, 2),
+        "turn_latency_ms": stats.latency.summary(),
+        "games": {
+            "started": started,
+            "completed": stats.games_completed,
+            "completed_ratio": round(stats.games_completed / started, 4) if started else 0.0,
+            "tables_failed": stats.tables_failed,
+        },
+        "clients": {
+            "connections": options.tables * options.humans,
+            "connect_failures": stats.connect_failures,
+            "sent": stats.sent,
+            "received": stats.received,
+            "received_per_second": round(stats.received / elapsed, 1) if elapsed else 0.0,
+            "sent_per_second": round(stats.sent / elapsed, 1) if elapsed else 0.0,
+            "errors": dict(stats.errors.most_common(10)),
+            "error_rate": round(errors / stats.sent, 4) if stats.sent else 0.0,
+            "turn_timeouts": stats.timeouts,
+        },
+        "server": server,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest", description="Play simulated games against a server.",
+    )
+    defaults = LoadTestOptions()
+    parser.add_argument("--url", default=defaults.url)
+    parser.add_argument("--tables", type=int, default=defaults.tables)
+    parser.add_argument("--humans", type=int, default=defaults.humans,
+                        help="simulated players per table")
+    parser.add_argument("--bots", type=int, default=defaults.bots,
+                        help="server bots added to each table")
+    parser.add_argument("--games", type=int, default=defaults.games,
+                        help="games played in a row at each table")
+    parser.add_argument("--max-hand-size", type=int, default=defaults.max_hand_size)
+    parser.add_argument("--think", type=_think, default=defaults.think, metavar="MIN:MAX",
+                        help="seconds a simulated player waits before acting")
+    parser.add_argument("--ramp", type=float, default=defaults.ramp,
+                        help="seconds over which the tables start")
+    parser.add_argument("--connect-concurrency", type=int, default=defaults.connect_concurrency)
+    parser.add_argument("--game-timeout", type=float, default=defaults.game_timeout)
+    parser.add_argument("--slo", help="JSON file of SLO limits to judge the run against")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--metrics-interval", type=float, default=1.0,
+                        help="seconds between scrapes of the server's /metrics")
+    args = parser.parse_args(argv)
+
+    if not 3 <= args.humans + args.bots <= 7:
+        parser.error("a table seats 3 to 7 players (--humans + --bots)")
+    if args.humans < 1:
+        parser.error("each table needs at least one simulated player to host it")
+    if not 1 <= args.max_hand_size <= 13:
+        parser.error("--max-hand-size must be between 1 and 13")
+    slo = None
+    if args.slo:
+        with open(args.slo) as f:
+            slo = json.load(f)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    options = LoadTestOptions(
+        url=args.url, tables=args.tables, humans=args.humans, bots=args.bots,
+        games=args.games, max_hand_size=args.max_hand_size, think=args.think,
+        ramp=args.ramp, connect_concurrency=args.connect_concurrency,
+        game_timeout=args.game_timeout,
+    )
+    sampler = ServerSampler(args.url, args.metrics_interval)
+    stats, elapsed = asyncio.run(run_load(options, sampler))
+    report = build_report(options, stats, elapsed, sampler.summary())
+
+    passed = True
+    if slo is not None:
+        report["slo"] = check_slo(report, slo)
+        passed = all(result["passed"] for result in report["slo"])
+        report["verdict"] = "pass" if passed else "fail"
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
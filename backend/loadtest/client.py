@@ -0,0 +1,236 @@
+"""Simulated players and the tables they play at."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+import httpx
+import socketio
+
+from loadtest.report import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadTestOptions:
+    url: str = "http://localhost:8000"
+    tables: int = 10
+    humans: int = 2  # simulated players per table, the first one hosts
+    bots: int = 2  # server bots the host adds to each table
+    games: int = 1  # games played back to back at each table
+    max_hand_size: int = 3  # keeps games short; 1–13
+    think: tuple[float, float] = (0.2, 1.0)  # seconds before each bid or card
+    ramp: float = 10.0  # seconds over which tables start
+    connect_concurrency: int = 50
+    game_timeout: float = 600.0
+    join_attempts: int = 5
+
+
+class Stats:
+    """Counters shared by every simulated client in the run."""
+
+    def __init__(self):
+        self.latency = LatencyRecorder()
+        self.received = 0
+        self.sent = 0
+        self.errors: Counter[str] = Counter()
+        self.timeouts = 0
+        self.connect_failures = 0
+        self.games_started = 0
+        self.games_completed = 0
+        self.tables_failed = 0
+
+
+class SimPlayer:
+    """One Socket.IO connection playing as an anonymous user.
+
+    Every event goes through one catch-all handler, which counts it and wakes
+    anyone waiting for it; `your_turn` is answered after the think time with a
+    random legal bid or card.
+    """
+
+    def __init__(self, table: Table, stats: Stats):
+        self.table = table
+        self.stats = stats
+        self.player_id = ""
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.client.on("*", self._on_event)
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+        self._turns: set[asyncio.Task] = set()
+
+    async def connect(self, http: httpx.AsyncClient, url: str):
+        response = await http.post("/api/auth/anonymous")
+        response.raise_for_status()
+        auth = response.json()
+        self.player_id = auth["user_id"]
+        await self.client.connect(url, auth={"token": auth["token"]}, transports=["websocket"])
+
+    async def disconnect(self):
+        await self.client.disconnect()
+
+    async def emit(self, event: str, data: dict | None = None):
+        self.stats.sent += 1
+        await self.client.emit(event, data or {})
+
+    def wait_for(self, *events: str) -> asyncio.Future:
+        """A future resolved with (event, data) by the next of `events` to arrive."""
+        future = asyncio.get_running_loop().create_future()
+        for event in events:
+            self._waiters.setdefault(event, []).append(future)
+        return future
+
+    async def _on_event(self, event: str, data=None):
+        self.stats.received += 1
+        for future in self._waiters.pop(event, ()):
+            if not future.done():
+                future.set_result((event, data))
+
+        if event == "your_turn":
+            self.table.turn_arrived()
+            task = asyncio.get_running_loop().create_task(self._take_turn(data))
+            self._turns.add(task)
+            task.add_done_callback(self._turns.discard)
+        elif event in ("bid_placed", "card_played"):
+            if data["player_id"] not in self.table.human_ids:
+                self.table.pacing()
+        elif event in ("trick_won", "round_scored"):
+            self.table.pacing()
+        elif event == "turn_timed_out":
+            if data["player_id"] == self.player_id:
+                self.stats.timeouts += 1
+        elif event == "error":
+            self.stats.errors[data.get("message", "")] += 1
+
+    async def _take_turn(self, data: dict):
+        await asyncio.sleep(random.uniform(*self.table.options.think))
+        if not self.client.connected:
+            return
+        self.table.acting()
+        try:
+            if "valid_bids" in data:
+                await self.emit("place_bid", {"bid": random.choice(data["valid_bids"])})
+            elif data.get("valid_cards"):
+                await self.emit("play_card", {"card": random.choice(data["valid_cards"])})
+        except socketio.exceptions.SocketIOError as e:
+            logger.warning(f"Table {self.table.index}: could not take a turn: {e}")
+
+
+class Table:
+    """A host and its guests: create a room, fill it, play `games` games in a row."""
+
+    def __init__(self, index: int, options: LoadTestOptions, stats: Stats):
+        self.index = index
+        self.options = options
+        self.stats = stats
+        self.players = [SimPlayer(self, stats) for _ in range(options.humans)]
+        self.human_ids: set[str] = set()
+        self._acted_at: float | None = None
+        self._paced = False
+
+    # ── turn latency ──────────────────────────────────────
+
+    def acting(self):
+        self._acted_at, self._paced = time.perf_counter(), False
+
+    def pacing(self):
+        self._paced = True
+
+    def turn_arrived(self):
+        if self._acted_at is not None:
+            self.stats.latency.record(time.perf_counter() - self._acted_at, self._paced)
+            self._acted_at = None
+
+    # ── lifecycle ─────────────────────────────────────────
+
+    async def run(self, http: httpx.AsyncClient, connecting: asyncio.Semaphore):
+        try:
+            for player in self.players:
+                async with connecting:
+                    await player.connect(http, self.options.url)
+        except Exception as e:
+            self.stats.connect_failures += 1
+            self.stats.tables_failed += 1
+            logger.warning(f"Table {self.index}: could not connect: {e}")
+            await self._disconnect()
+            return
+        self.human_ids = {p.player_id for p in self.players}
+
+        try:
+            for _ in range(self.options.games):
+                await asyncio.wait_for(self._play_game(), self.options.game_timeout)
+        except Exception as e:
+            self.stats.tables_failed += 1
+            logger.warning(f"Table {self.index}: {type(e).__name__}: {e}")
+        finally:
+            await self._disconnect()
+
+    async def _disconnect(self):
+        for player in self.players:
+            with contextlib.suppress(Exception):
+                await player.disconnect()
+
+    async def _retrying(self, player: SimPlayer, event: str, data: dict, done: str) -> dict:
+        """Emit until `done` arrives, waiting out busy and rate-limit replies."""
+        for _ in range(self.options.join_attempts):
+            reply = player.wait_for(done, "error")
+            await player.emit(event, data)
+            name, payload = await reply
+            if name == done:
+                return payload
+            if "retry_after" not in payload:
+                raise RuntimeError(f"{event} failed: {payload.get('message')}")
+            await asyncio.sleep(payload["retry_after"])
+        raise RuntimeError(f"{event} still refused after {self.options.join_attempts} attempts")
+
+    async def _play_game(self):
+        host, guests = self.players[0], self.players[1:]
+        config = {
+            "turn_timer_seconds": 120,
+            "max_players": self.options.humans + self.options.bots,
+            "max_hand_size": self.options.max_hand_size,
+        }
+        created = await self._retrying(host, "create_game", {"config": config}, "game_created")
+        room_code = created["room_code"]
+        for guest in guests:
+            await self._retrying(guest, "join_game", {"room_code": room_code}, "game_state")
+        for _ in range(self.options.bots):
+            await self._retrying(host, "add_bot", {}, "game_state")
+
+        over = host.wait_for("game_over")
+        self.stats.games_started += 1
+        self.acting()
+        await host.emit("start_game")
+        await over
+        self.stats.games_completed += 1
+        self._acted_at = None
+        for guest in guests:
+            await guest.emit("leave_game")
+        await host.emit("leave_game")
+
+
+async def run_load(options: LoadTestOptions, sampler=None) -> tuple[Stats, float]:
+    """Start the tables over the ramp-up period and wait for all of them to finish."""
+    stats = Stats()
+    connecting = asyncio.Semaphore(options.connect_concurrency)
+    limits = httpx.Limits(max_connections=options.connect_concurrency)
+    async with httpx.AsyncClient(base_url=options.url, limits=limits, timeout=30) as http:
+        if sampler is not None:
+            sampler.start(http)
+        started = time.monotonic()
+        tasks = []
+        for i in range(options.tables):
+            if i and options.ramp > 0:
+                await asyncio.sleep(options.ramp / (options.tables - 1))
+            table = Table(i, options, stats)
+            tasks.append(asyncio.create_task(table.run(http, connecting)))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+        if sampler is not None:
+            await sampler.stop(http)
+    return stats, elapsed
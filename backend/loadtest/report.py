@@ -0,0 +1,159 @@
+"""Latency percentiles, server resource sampling and the SLO verdict."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import math
+import time
+
+import httpx
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list; 0.0 when it is empty."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyRecorder:
+    """Time from a simulated player's action to the next `your_turn` at its table.
+
+    Transitions that include a bot's think time or the server's pause after a trick
+    are recorded as `paced` and reported apart, since they measure deliberate delays
+    rather than how fast the server turns a move around.
+    """
+
+    def __init__(self):
+        self.direct: list[float] = []
+        self.paced: list[float] = []
+
+    def record(self, seconds: float, paced: bool = False):
+        (self.paced if paced else self.direct).append(seconds)
+
+    @staticmethod
+    def _summary(values: list[float]) -> dict:
+        ordered = sorted(values)
+        summary = {"count": len(ordered)}
+        for q in PERCENTILES:
+            summary[f"p{q}"] = round(percentile(ordered, q) * 1000, 2)
+        summary["max"] = round(ordered[-1] * 1000, 2) if ordered else 0.0
+        return summary
+
+    def summary(self) -> dict:
+        """Percentiles in milliseconds."""
+        return {"direct": self._summary(self.direct), "paced": self._summary(self.paced)}
+
+
+def parse_metrics(text: str) -> dict[str, float]:
+    """Sample values from Prometheus text, summed across label sets."""
+    values: dict[str, float] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        series, _, value = line.rpartition(" ")
+        name = series.split("{", 1)[0]
+        try:
+            values[name] = values.get(name, 0.0) + float(value)
+        except ValueError:
+            continue
+    return values
+
+
+class ServerSampler:
+    """Scrapes the server's /metrics for CPU, memory and emitted messages.
+
+    With several worker processes behind one port each scrape reaches one of them,
+    so point it at a single worker for per-process numbers.
+    """
+
+    def __init__(self, url: str, interval: float = 1.0):
+        self.url = url.rstrip("/") + "/metrics"
+        self.interval = interval
+        self.first: tuple[float, dict[str, float]] | None = None
+        self.last: tuple[float, dict[str, float]] | None = None
+        self.peak_rss = 0.0
+        self.failures = 0
+        self._task: asyncio.Task | None = None
+
+    async def sample(self, http: httpx.AsyncClient):
+        try:
+            response = await http.get(self.url)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            self.failures += 1
+            return
+        sample = (time.monotonic(), parse_metrics(response.text))
+        if self.first is None:
+            self.first = sample
+        self.last = sample
+        self.peak_rss = max(self.peak_rss, sample[1].get("process_resident_memory_bytes", 0.0))
+
+    def start(self, http: httpx.AsyncClient):
+        async def run():
+            while True:
+                await self.sample(http)
+                await asyncio.sleep(self.interval)
+
+        self._task = asyncio.get_running_loop().create_task(run())
+
+    async def stop(self, http: httpx.AsyncClient):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.sample(http)
+
+    def summary(self) -> dict:
+        if self.first is None or self.last is None or self.last[0] <= self.first[0]:
+            return {"available": False, "scrape_failures": self.failures}
+        elapsed = self.last[0] - self.first[0]
+        before, after = self.first[1], self.last[1]
+
+        def rate(name: str) -> float:
+            return (after.get(name, 0.0) - before.get(name, 0.0)) / elapsed
+
+        return {
+            "available": True,
+            "cpu_percent": round(rate("process_cpu_seconds_total") * 100, 1),
+            "rss_mb": round(after.get("process_resident_memory_bytes", 0.0) / 2**20, 1),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+            "emitted_per_second": round(rate("socketio_emitted_messages_total"), 1),
+            "loop_lag_smoothed_ms": round(
+                after.get("event_loop_lag_smoothed_seconds", 0.0) * 1000, 2,
+            ),
+            "scrape_failures": self.failures,
+        }
+
+
+# SLO key → (path into the report, whether the SLO is a maximum)
+SLO_CHECKS = {
+    "max_turn_latency_p50_ms": (("turn_latency_ms", "direct", "p50"), True),
+    "max_turn_latency_p95_ms": (("turn_latency_ms", "direct", "p95"), True),
+    "max_turn_latency_p99_ms": (("turn_latency_ms", "direct", "p99"), True),
+    "max_error_rate": (("clients", "error_rate"), True),
+    "min_completed_games_ratio": (("games", "completed_ratio"), False),
+    "min_messages_per_second": (("clients", "received_per_second"), False),
+    "max_server_cpu_percent": (("server", "cpu_percent"), True),
+    "max_server_peak_rss_mb": (("server", "peak_rss_mb"), True),
+}
+
+
+def check_slo(report: dict, slo: dict) -> list[dict]:
+    """One result per SLO entry; a value the report doesn't have counts as a failure."""
+    unknown = set(slo) - set(SLO_CHECKS)
+    if unknown:
+        raise ValueError(f"Unknown SLO keys: {', '.join(sorted(unknown))}")
+    results = []
+    for key, limit in slo.items():
+        path, is_max = SLO_CHECKS[key]
+        actual = report
+        for part in path:
+            actual = actual.get(part) if isinstance(actual, dict) else None
+        passed = actual is not None and (actual <= limit if is_max else actual >= limit)
+        results.append({"slo": key, "limit": limit, "actual": actual, "passed": passed})
+    return results
@@ -0,0 +1,79 @@
+import random
+
+from app.bot.intermediate import IntermediateBot
+from app.bot.selfplay import play_to_completion
+from app.bot.transposition import TranspositionTable, position_key
+from app.game.engine import GameEngine
+from app.game.types import Card, GamePhase, Rank, Suit
+
+
+def started_engine(seed=5) -> GameEngine:
+    engine = GameEngine(room_code="TT01")
+    engine._rng = random.Random(seed)
+    for i in range(3):
+        engine.add_player(f"b{i}", f"B{i}", is_bot=True)
+    engine.start_game("b0")
+    return engine
+
+
+class TestPositionKey:
+    def test_hand_order_does_not_matter(self):
+        engine = started_engine()
+        hand = [Card(Suit.HEARTS, Rank.ACE), Card(Suit.CLUBS, Rank.TWO)]
+        assert position_key(engine.state, hand, 1) == position_key(
+            engine.state, list(reversed(hand)), 1,
+        )
+
+    def test_features_change_key(self):
+        engine = started_engine()
+        hand = [Card(Suit.HEARTS, Rank.ACE)]
+        base = position_key(engine.state, hand, 1)
+        assert position_key(engine.state, hand, 0) != base
+        assert position_key(engine.state, hand, 1, salt=7) != base
+        assert position_key(engine.state, [Card(Suit.HEARTS, Rank.KING)], 1) != base
+
+
+class TestTranspositionTable:
+    def test_store_and_probe(self):
+        table = TranspositionTable(size_log2=4)
+        table.store(12345, 7, depth=3)
+        assert table.probe(12345) == 7
+        assert table.probe(12345, min_depth=4) is None
+        assert table.probe(54321) is None
+        assert table.stats.probes == 3
+        assert table.stats.hits == 1
+
+    def test_memory_is_fixed(self):
+        table = TranspositionTable(size_log2=4, ways=2)
+        size = table.nbytes
+        for key in range(1, 10_000):
+            table.store(key * 2654435761, key, depth=key % 5)
+        assert table.nbytes == size
+        assert table.stats.overwrites > 0
+
+    def test_replacement_prefers_shallow(self):
+        table = TranspositionTable(size_log2=0, ways=2)  # a single bucket
+        table.store(1, 100, depth=9)
+        table.store(2, 200, depth=1)
+        table.store(3, 300, depth=5)
+        assert table.probe(1) == 100
+        assert table.probe(2) is None
+        assert table.probe(3) == 300
+
+    def test_shallower_result_does_not_replace_deeper(self):
+        table = TranspositionTable(size_log2=2)
+        table.store(42, 1, depth=6)
+        table.store(42, 2, depth=2)
+        assert table.probe(42) == 1
+
+    def test_cached_bot_plays_identically(self):
+        def play(table):
+            engine = started_engine(seed=9)
+            bots = {p.player_id: IntermediateBot(table=table) for p in engine.players}
+            play_to_completion(engine, bots)
+            assert engine.phase == GamePhase.GAME_OVER
+            return [p.score for p in engine.players]
+
+        table = TranspositionTable(size_log2=10)
+        assert play(None) == play(table) == play(table)
+        assert table.stats.hits > 0
@@ -0,0 +1,68 @@
+import json
+
+from app.bot.basic import BasicBot
+from app.bot.params import BotParams, load_params, save_params
+from app.bot.selfplay import play_to_completion
+from app.bot.tuner import evaluate
+from app.config import settings
+from app.game.engine import GameEngine
+from app.game.types import GamePhase
+
+
+class TestBotParams:
+    def test_vector_round_trip(self):
+        params = BotParams()
+        assert BotParams.from_vector(params.to_vector()) == params
+
+    def test_from_vector_clamps_and_rounds_ranks(self):
+        vector = BotParams().to_vector()
+        vector[1] = 20.4  # basic_trump_high_rank
+        vector[2] = -3.0  # basic_trump_high_weight
+        params = BotParams.from_vector(vector)
+        assert params.basic_trump_high_rank == 12
+        assert isinstance(params.basic_trump_high_rank, int)
+        assert params.basic_trump_high_weight == 0.0
+
+    def test_missing_file_gives_defaults(self, tmp_path):
+        assert load_params(tmp_path / "nope.json") == BotParams()
+
+    def test_save_bumps_version(self, tmp_path):
+        path = tmp_path / "params.json"
+        tuned = BotParams(basic_ace_weight=0.9)
+        assert save_params(BotParams(), path) == 1
+        assert save_params(tuned, path, bot="basic") == 2
+        data = json.loads(path.read_text())
+        assert data["version"] == 2
+        assert data["bot"] == "basic"
+        assert load_params(path) == tuned
+
+    def test_default_path_comes_from_settings(self, tmp_path, monkeypatch):
+        path = tmp_path / "data" / "bot-params.json"
+        monkeypatch.setattr(settings, "bot_params_path", str(path))
+        tuned = BotParams(basic_ace_weight=0.2)
+        assert save_params(tuned) == 1
+        assert path.exists()
+        assert load_params() == tuned
+
+    def test_load_ignores_unknown_keys(self, tmp_path):
+        path = tmp_path / "params.json"
+        path.write_text(json.dumps({"version": 3, "params": {"basic_ace_weight": 0.1, "x": 1}}))
+        assert load_params(path).basic_ace_weight == 0.1
+
+
+class TestSelfPlay:
+    def test_play_to_completion(self):
+        engine = GameEngine(room_code="SELF01")
+        bots = {}
+        for i in range(4):
+            engine.add_player(f"b{i}", f"B{i}", is_bot=True)
+            bots[f"b{i}"] = BasicBot()
+        engine.start_game("b0")
+        play_to_completion(engine, bots)
+        assert engine.phase == GamePhase.GAME_OVER
+
+    def test_evaluate_uses_common_random_numbers(self):
+        vector = BotParams().to_vector()
+        seeds = [11, 12, 13]
+        first = evaluate("basic", vector, vector, seeds, 4, 3)
+        assert evaluate("basic", vector, vector, seeds, 4, 3) == first
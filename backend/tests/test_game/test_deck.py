@@ -1,6 +1,6 @@
 import random
 
-from app.game.deck import create_deck, deal, shuffle_deck
+from app.game.deck import card_index, create_deck, deal, shuffle_deck
 from app.game.types import Suit
 
 
@@ -70,3 +70,8 @@ def test_deal_no_duplicate_cards():
     if trump:
         all_cards.append(trump)
     assert len(all_cards) == len(set(all_cards))
+
+
+def test_card_index_matches_deck_order():
+    deck = create_deck()
+    assert [card_index(c) for c in deck] == list(range(52))
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from app.bot.basic import BasicBot
+from app.game.engine import GameEngine
+from app.game.estimator import WinEstimator, forget_room, snapshot_from_state, update_room
+from app.game.types import GameConfig, GamePhase
+
+
+def engine_in_play(num_players=4, seed=7, rounds_to_skip=3) -> GameEngine:
+    """Return an engine in the playing phase of a multi-card round."""
+    engine = GameEngine(room_code="EST01", config=GameConfig(hook_rule=False))
+    engine._rng = random.Random(seed)
+    for i in range(num_players):
+        engine.add_player(f"p{i}", f"P{i}", is_bot=True)
+    engine.start_game("p0")
+    bot = BasicBot()
+
+    while engine.state.round_number < rounds_to_skip or engine.phase != GamePhase.PLAYING:
+        step(engine, bot)
+    return engine
+
+
+def step(engine: GameEngine, bot: BasicBot):
+    if engine.phase == GamePhase.SCORING:
+        engine.advance_to_next_round()
+        return
+    pid = engine.get_current_player_id()
+    player = engine.state.get_player(pid)
+    if engine.phase == GamePhase.BIDDING:
+        bids = engine.get_valid_bids_for_player(pid)
+        engine.place_bid(pid, bot.choose_bid(player, engine.state, bids))
+    else:
+        cards = engine.get_valid_cards_for_player(pid)
+        engine.play_card(pid, bot.choose_card(player, engine.state, cards))
+
+
+class TestSnapshot:
+    def test_none_while_bidding(self):
+        engine = GameEngine(room_code="EST01")
+        for i in range(3):
+            engine.add_player(f"p{i}", f"P{i}")
+        engine.start_game("p0")
+        assert snapshot_from_state(engine.state) is None
+
+    def test_hides_hands(self):
+        engine = engine_in_play()
+        snap = snapshot_from_state(engine.state)
+        assert snap is not None
+        assert snap.hand_counts == [len(p.hand) for p in engine.players]
+        assert not hasattr(snap, "hands")
+
+
+class TestWinEstimator:
+    def test_probabilities_in_range(self):
+        engine = engine_in_play()
+        est = WinEstimator(num_samples=64, rng=random.Random(1))
+        result = est.update(snapshot_from_state(engine.state))
+        assert result.samples == 64
+        for p in engine.players:
+            assert 0.0 <= result.bid_success[p.player_id] <= 1.0
+        assert sum(result.win_probability.values()) == pytest.approx(1.0)
+
+    def test_samples_reused_after_play(self):
+        engine = engine_in_play()
+        est = WinEstimator(num_samples=64, rng=random.Random(1))
+        est.update(snapshot_from_state(engine.state))
+        step(engine, BasicBot())
+        result = est.update(snapshot_from_state(engine.state))
+        assert result.reused > 0
+
+    def test_worker_keeps_each_rooms_samples(self):
+        engine = engine_in_play()
+        update_room("EST01", snapshot_from_state(engine.state), 32)
+        step(engine, BasicBot())
+        assert update_room("EST01", snapshot_from_state(engine.state), 32).reused > 0
+        forget_room("EST01")
+        assert update_room("EST01", snapshot_from_state(engine.state), 32).reused == 0
+        forget_room("EST01")
+
+    def test_samples_consistent_with_public_play(self):
+        engine = engine_in_play(rounds_to_skip=5)
+        est = WinEstimator(num_samples=32, rng=random.Random(3))
+        bot = BasicBot()
+        round_number = engine.state.round_number
+        while engine.phase == GamePhase.PLAYING and engine.state.round_number == round_number:
+            snap = snapshot_from_state(engine.state)
+            est.update(snap)
+            played = {c for _, c, _ in snap.plays}
+            for sample in est._samples:
+                assert [len(h) for h in sample] == snap.hand_counts
+                assert not played & {c for h in sample for c in h}
+            step(engine, bot)
+
+    def test_missed_bid_is_certain(self):
+        engine = engine_in_play(rounds_to_skip=6)
+        over = engine.players[0]
+        over.tricks_won = over.bid + 1
+        est = WinEstimator(num_samples=16, rng=random.Random(2))
+        result = est.update(snapshot_from_state(engine.state))
+        assert result.bid_success[over.player_id] == 0.0
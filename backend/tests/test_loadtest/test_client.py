@@ -0,0 +1,47 @@
+import asyncio
+
+from loadtest.client import LoadTestOptions, Stats, Table
+
+
+def table():
+    t = Table(0, LoadTestOptions(humans=2, bots=1, think=(0, 0)), Stats())
+    for i, player in enumerate(t.players):
+        player.player_id = f"human-{i}"
+    t.human_ids = {p.player_id for p in t.players}
+    return t
+
+
+class TestTurnLatency:
+    async def test_human_to_human_turns_are_direct(self):
+        t = table()
+        host, guest = t.players
+        t.acting()
+        await host._on_event("card_played", {"player_id": "human-0", "card": {}})
+        await guest._on_event("your_turn", {"valid_cards": [], "time_remaining": 120})
+        assert t.stats.latency.summary()["direct"]["count"] == 1
+        assert t.stats.received == 2
+
+    async def test_bot_turns_and_trick_pauses_are_paced(self):
+        t = table()
+        host, guest = t.players
+        t.acting()
+        await host._on_event("bid_placed", {"player_id": "bot-1", "bid": 0})
+        await guest._on_event("your_turn", {"valid_bids": [0, 1], "time_remaining": 120})
+        t.acting()
+        await host._on_event("trick_won", {"winner_id": "human-0", "trick": []})
+        await guest._on_event("your_turn", {"valid_cards": [], "time_remaining": 120})
+        # Only the first your_turn after an action is timed
+        await guest._on_event("your_turn", {"valid_cards": [], "time_remaining": 120})
+        summary = t.stats.latency.summary()
+        assert summary["direct"]["count"] == 0
+        assert summary["paced"]["count"] == 2
+
+    async def test_waiters_get_the_next_matching_event(self):
+        t = table()
+        host = t.players[0]
+        reply = host.wait_for("game_created", "error")
+        await host._on_event("error", {"message": "Server is busy", "retry_after": 5.0})
+        assert await asyncio.wait_for(reply, 1) == (
+            "error", {"message": "Server is busy", "retry_after": 5.0},
+        )
+        assert t.stats.errors["Server is busy"] == 1
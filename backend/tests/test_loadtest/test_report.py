@@ -0,0 +1,67 @@
+import pytest
+
+from loadtest.report import LatencyRecorder, check_slo, parse_metrics, percentile
+
+
+class TestLatency:
+    def test_nearest_rank_percentiles(self):
+        values = [i / 1000 for i in range(1, 101)]
+        assert percentile(values, 50) == 0.05
+        assert percentile(values, 99) == 0.099
+        assert percentile(values, 100) == 0.1
+        assert percentile([], 95) == 0.0
+
+    def test_paced_transitions_are_reported_apart(self):
+        latency = LatencyRecorder()
+        for ms in (10, 20, 30):
+            latency.record(ms / 1000)
+        latency.record(1.6, paced=True)
+        summary = latency.summary()
+        assert summary["direct"]["count"] == 3
+        assert summary["direct"]["p50"] == 20.0
+        assert summary["direct"]["max"] == 30.0
+        assert summary["paced"]["p99"] == 1600.0
+
+
+class TestMetricsScrape:
+    def test_samples_are_summed_across_labels(self):
+        text = "\n".join([
+            "# TYPE socketio_emitted_messages_total counter",
+            'socketio_emitted_messages_total{event="your_turn"} 10',
+            'socketio_emitted_messages_total{event="card_played"} 32',
+            "process_resident_memory_bytes 1048576",
+        ])
+        values = parse_metrics(text)
+        assert values["socketio_emitted_messages_total"] == 42
+        assert values["process_resident_memory_bytes"] == 1048576
+
+
+class TestSlo:
+    REPORT = {
+        "turn_latency_ms": {"direct": {"p50": 12.0, "p95": 80.0, "p99": 400.0}},
+        "games": {"completed_ratio": 1.0},
+        "clients": {"error_rate": 0.02},
+        "server": {"available": False},
+    }
+
+    def test_each_limit_is_judged(self):
+        results = check_slo(self.REPORT, {
+            "max_turn_latency_p95_ms": 100,
+            "max_turn_latency_p99_ms": 250,
+            "min_completed_games_ratio": 0.99,
+            "max_error_rate": 0.01,
+            "max_server_cpu_percent": 90,
+        })
+        passed = {r["slo"]: r["passed"] for r in results}
+        assert passed == {
+            "max_turn_latency_p95_ms": True,
+            "max_turn_latency_p99_ms": False,
+            "min_completed_games_ratio": True,
+            "max_error_rate": False,
+            # No server numbers is a failure, not a pass
+            "max_server_cpu_percent": False,
+        }
+
+    def test_unknown_keys_are_rejected(self):
+        with pytest.raises(ValueError, match="max_p95"):
+            check_slo(self.REPORT, {"max_p95": 100})
@@ -0,0 +1,138 @@
+import asyncio
+import uuid
+
+from app.models.user import User
+from app.services import profiles
+from app.services.cache import MISSING, BatchLoader, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingLoader:
+    def __init__(self, delay=0.0, fail=False):
+        self.calls: list[list[str]] = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, keys):
+        self.calls.append(sorted(keys))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("db down")
+        return {k: k.upper() for k in keys if k != "missing"}
+
+
+class TestTTLCache:
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is MISSING
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+class TestBatchLoader:
+    async def test_concurrent_loads_share_one_query(self):
+        load_many = RecordingLoader()
+        loader = BatchLoader(load_many, TTLCache(maxsize=100, ttl=60), window=0.01)
+        keys = ["a", "b", "c", "a", "missing"]
+        results = await asyncio.gather(*(loader.load(k) for k in keys))
+        assert results == ["A", "B", "C", "A", None]
+        assert load_many.calls == [["a", "b", "c", "missing"]]
+
+        assert await loader.load("b") == "B"  # now cached
+        assert await loader.load("missing") is None
+        assert len(load_many.calls) == 1
+
+    async def test_max_batch_dispatches_early(self):
+        load_many = RecordingLoader()
+        loader = BatchLoader(load_many, TTLCache(maxsize=100, ttl=60), window=10, max_batch=2)
+        assert await asyncio.gather(loader.load("a"), loader.load("b")) == ["A", "B"]
+
+    async def test_errors_reach_every_waiter_and_are_not_cached(self):
+        load_many = RecordingLoader(fail=True)
+        loader = BatchLoader(load_many, TTLCache(maxsize=100, ttl=60), window=0.001)
+        results = await asyncio.gather(
+            loader.load("a"), loader.load("b"), return_exceptions=True,
+        )
+        assert all(isinstance(r, ConnectionError) for r in results)
+        load_many.fail = False
+        assert await loader.load("a") == "A"
+
+    async def test_invalidate_during_flight_skips_caching(self):
+        load_many = RecordingLoader(delay=0.02)
+        loader = BatchLoader(load_many, TTLCache(maxsize=100, ttl=60), window=0.001)
+        pending = asyncio.ensure_future(loader.load("a"))
+        await asyncio.sleep(0.01)
+        loader.cache.invalidate("a")
+        assert await pending == "A"
+        assert loader.cache.get("a") is MISSING
+
+    async def test_a_key_in_flight_is_not_loaded_twice(self):
+        load_many = RecordingLoader(delay=0.02)
+        loader = BatchLoader(load_many, TTLCache(maxsize=100, ttl=60), window=0.001)
+        first = asyncio.ensure_future(loader.load("a"))
+        await asyncio.sleep(0.01)
+        assert await asyncio.gather(first, loader.load("a")) == ["A", "A"]
+        assert load_many.calls == [["a"]]
+
+        # After an invalidation a request doesn't take the stale in-flight result
+        first = asyncio.ensure_future(loader.load("b"))
+        await asyncio.sleep(0.01)
+        loader.cache.invalidate("b")
+        await asyncio.gather(first, loader.load("b"))
+        assert load_many.calls[1:] == [["b"], ["b"]]
+
+    async def test_cancelled_batch_releases_its_waiters(self):
+        async def cancelled(keys):
+            raise asyncio.CancelledError  # e.g. a statement timeout cancelling the query
+
+        loader = BatchLoader(cancelled, TTLCache(maxsize=100, ttl=60), window=0.001)
+        results = await asyncio.wait_for(
+            asyncio.gather(loader.load("a"), return_exceptions=True), 1.0,
+        )
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert loader._inflight == {}
+
+
+class TestProfileResponses:
+    async def test_second_request_skips_the_database(self):
+        user = User(id=uuid.uuid4(), display_name="Ann", is_anonymous=False)
+
+        class OneRowSession:
+            queries = 0
+
+            async def execute(self, statement):
+                self.queries += 1
+                return self
+
+            def first(self):
+                return (user, None)
+
+        session = OneRowSession()
+        first = await profiles.get_profile_response(session, user.id)
+        assert await profiles.get_profile_response(session, user.id) is first
+        assert session.queries == 1
+
+        profiles.invalidate_users({user.id})
+        await profiles.get_profile_response(session, user.id)
+        assert session.queries == 2
@@ -0,0 +1,111 @@
+from app.bot.basic import BasicBot
+from app.bot.selfplay import play_to_completion, play_turn
+from app.game.serialization import dump_rng, dump_state
+from app.models.game import RoomCheckpoint
+from app.services import checkpoints as checkpoints_module
+from app.services.checkpoints import RoomCheckpointer
+from app.sockets.manager import GameRoomManager
+
+
+class RecordingSession:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    async def commit(self):
+        self.commits += 1
+
+
+def open_room(manager: GameRoomManager, host: str, start=True):
+    engine = manager.create_game(host, "Host")
+    for i in range(2):
+        engine.add_player(f"{host}_bot{i}", f"Bot {i}", is_bot=True)
+    if start:
+        engine.start_game(host)
+    return engine
+
+
+def setup(monkeypatch, rows=()):
+    rooms = GameRoomManager()
+    monkeypatch.setattr(checkpoints_module, "manager", rooms)
+    session = RecordingSession(rows)
+    return rooms, session, RoomCheckpointer(interval=10, batch_size=2, session_factory=session)
+
+
+class TestSweeps:
+    async def test_only_changed_live_rooms_are_written(self, monkeypatch):
+        rooms, session, checkpointer = setup(monkeypatch)
+        first = open_room(rooms, "h1")
+        open_room(rooms, "h2")
+        open_room(rooms, "h3")
+        open_room(rooms, "h4", start=False)  # lobby
+
+        assert await checkpointer.flush() == 3
+        assert len(session.statements) == 2  # batches of two
+        assert await checkpointer.flush() == 0
+
+        play_turn(first, BasicBot())
+        assert checkpointer.changed() == ([first], [])
+
+    async def test_finished_rooms_are_deleted(self, monkeypatch):
+        rooms, session, checkpointer = setup(monkeypatch)
+        engine = open_room(rooms, "h1")
+        await checkpointer.flush()
+        play_to_completion(engine, {p.player_id: BasicBot() for p in engine.players})
+        assert checkpointer.changed() == ([], [engine.room_code])
+        await checkpointer.flush()
+        assert len(checkpointer) == 0
+
+
+class TestRestore:
+    async def test_players_rejoin_restored_rooms(self, monkeypatch):
+        source = GameRoomManager()
+        engine = open_room(source, "h1")
+        play_turn(engine, BasicBot())
+        row = RoomCheckpoint(
+            room_code=engine.room_code, revision=engine.revision,
+            state=dump_state(engine), rng_state=dump_rng(engine),
+        )
+        broken = RoomCheckpoint(room_code="BROKEN", revision=1, state=b"{", rng_state=b"")
+        rooms, session, checkpointer = setup(monkeypatch, [row, broken])
+
+        restored = await checkpointer.restore()
+        assert [e.room_code for e in restored] == [engine.room_code]
+        assert session.commits == 1  # the unreadable checkpoint was dropped
+        assert checkpointer.changed() == ([], [])  # nothing new to write
+
+        again = rooms.get_engine(engine.room_code)
+        assert not again.state.get_player("h1").is_connected
+        rooms.join_game(engine.room_code, "h1", "Host")
+        assert again.state.get_player("h1").is_connected
+        assert rooms.get_player_engine("h1") == (engine.room_code, again)
+
+    async def test_rooms_saved_for_their_owner_are_left_to_it(self, monkeypatch):
+        _, session, checkpointer = setup(monkeypatch)
+        source = GameRoomManager()
+        engines = [open_room(source, f"h{i}") for i in range(3)]
+
+        await checkpointer.save(engines)
+        assert len(session.statements) == 2  # batches of two
+        assert session.commits == 1
+        assert len(checkpointer) == 0  # never deleted as one of this shard's rooms
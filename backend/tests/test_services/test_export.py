@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.admin import require_admin
+from app.config import settings
+from app.services import export
+from app.services.export import COLUMNS, encode_rows, export_query
+
+
+async def rows(n):
+    for i in range(n):
+        yield (f"g{i}", "2026-01-01T00:00:00", "ROOM", "standard", 3, None, 1, 1, None, 0,
+               i % 3, None, "Bot", True, 5, 2, 1, 0, 0, 0)
+
+
+async def collect(chunks) -> list[str]:
+    return [c async for c in chunks]
+
+
+class TestEncodeRows:
+    async def test_ndjson(self):
+        chunks = await collect(encode_rows(rows(3), "ndjson"))
+        lines = "".join(chunks).splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0])["game_id"] == "g0"
+        assert list(json.loads(lines[0])) == list(COLUMNS)
+
+    async def test_csv_has_header(self):
+        text = "".join(await collect(encode_rows(rows(2), "csv")))
+        parsed = list(csv.reader(io.StringIO(text)))
+        assert tuple(parsed[0]) == COLUMNS
+        assert len(parsed) == 3
+
+    async def test_output_is_chunked(self, monkeypatch):
+        monkeypatch.setattr(export, "CHUNK_BYTES", 1024)
+        chunks = await collect(encode_rows(rows(200), "ndjson"))
+        assert len(chunks) > 1
+        assert all(len(c) < 2048 for c in chunks)
+
+
+class TestExportQuery:
+    def test_filters_and_streams(self):
+        query = export_query(date(2026, 1, 1), date(2026, 1, 31), "standard")
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "games.created_at >=" in sql
+        assert "games.created_at <" in sql
+        assert "games.scoring_variant =" in sql
+        assert query.get_execution_options()["yield_per"] == export.FETCH_ROWS
+
+
+class TestAdminAuth:
+    async def test_disabled_without_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "")
+        with pytest.raises(HTTPException):
+            await require_admin("")
+
+    async def test_checks_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "s3cret")
+        with pytest.raises(HTTPException):
+            await require_admin("wrong")
+        await require_admin("s3cret")
+
+    async def test_non_ascii_token_is_forbidden(self, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "s3cret")
+        with pytest.raises(HTTPException) as e:
+            await require_admin("sécret")
+        assert e.value.status_code == 403
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+from app.game.serialization import dump_rng, dump_state
+from app.services import handoff as handoff_module
+from app.services.handoff import RoomHandoff, read_snapshot, write_snapshot
+from app.sockets.manager import GameRoomManager
+
+
+def open_room(manager: GameRoomManager, host: str, start=True):
+    engine = manager.create_game(host, "Host")
+    engine.add_player(f"{host}_guest", "Guest")
+    manager.player_rooms[f"{host}_guest"] = engine.room_code
+    engine.add_player(f"{host}_bot", "Bot", is_bot=True)
+    if start:
+        engine.start_game(host)
+    return engine
+
+
+async def noop(_):
+    pass
+
+
+class TestSnapshot:
+    async def test_rooms_and_timers_round_trip(self, tmp_path):
+        rooms = GameRoomManager()
+        engine = open_room(rooms, "h1")
+        rooms.start_turn_timer(engine.room_code, noop, timeout=30)
+        rooms.set_disconnected(engine, "h1_guest")
+        rooms._disconnected_at[engine.room_code, "h1_guest"] -= 4
+        rooms.enable_autopilot(engine, "h1_guest")
+        path = str(tmp_path / "handoff.bin")
+
+        assert write_snapshot(path, rooms) == 1
+        rooms.cancel_turn_timer(engine.room_code)
+        (restored, timers), = read_snapshot(path)
+
+        assert dump_state(restored) == dump_state(engine)
+        assert dump_rng(restored) == dump_rng(engine)
+        assert 29 < timers.turn_remaining <= 30
+        assert 4 <= timers.away["h1_guest"] < 5
+        assert "h1" not in timers.away
+        assert timers.autopilot == ["h1_guest"]
+
+    def test_thousands_of_rooms_in_well_under_a_second(self, tmp_path):
+        rooms = GameRoomManager()
+        for i in range(3000):
+            open_room(rooms, f"h{i}")
+        path = str(tmp_path / "handoff.bin")
+
+        started = time.perf_counter()
+        write_snapshot(path, rooms)
+        restored = read_snapshot(path)
+        assert time.perf_counter() - started < 1.0
+        assert len(restored) == 3000
+
+
+class TestHandoff:
+    def setup(self, monkeypatch, tmp_path):
+        old, new = GameRoomManager(), GameRoomManager()
+        handoff = RoomHandoff(path=str(tmp_path / "handoff.bin"), drain_timeout=1.0)
+        monkeypatch.setattr(handoff_module, "manager", old)
+        return old, new, handoff
+
+    async def test_restore_installs_rooms_once(self, monkeypatch, tmp_path):
+        old, new, handoff = self.setup(monkeypatch, tmp_path)
+        game = open_room(old, "h1")
+        lobby = open_room(old, "h2", start=False)
+        await handoff.drain_and_snapshot()
+        assert old.draining
+
+        monkeypatch.setattr(handoff_module, "manager", new)
+        engines, timers = await handoff.restore()
+        assert {e.room_code for e in engines} == {game.room_code, lobby.room_code}
+        assert set(timers) == {game.room_code, lobby.room_code}
+        assert await handoff.restore() == ([], {})
+
+        # Lobby players reclaim their seat rather than joining twice
+        rejoined = new.join_game(lobby.room_code, "h2_guest", "Guest")
+        assert len(rejoined.players) == 3
+        assert rejoined.state.get_player("h2_guest").is_connected
+        assert new.disconnected_for(lobby.room_code, "h2_guest") is None
+
+    async def test_rooms_of_other_shards_are_passed_on(self, monkeypatch, tmp_path):
+        old, new, handoff = self.setup(monkeypatch, tmp_path)
+        mine = open_room(old, "h1")
+        theirs = open_room(old, "h2")
+        await handoff.drain_and_snapshot()
+
+        saved, told = [], []
+
+        class Checkpoints:
+            async def save(self, engines):
+                saved.extend(e.room_code for e in engines)
+
+        class Shard:
+            def is_local(self, code):
+                return code == mine.room_code
+
+            async def rooms_checkpointed(self, codes):
+                told.extend(codes)
+
+        monkeypatch.setattr(handoff_module, "manager", new)
+        monkeypatch.setattr(handoff_module, "checkpoints", Checkpoints())
+        monkeypatch.setattr(handoff_module, "shard", Shard())
+        engines, _ = await handoff.restore()
+        assert [e.room_code for e in engines] == [mine.room_code]
+        assert saved == told == [theirs.room_code]
+        assert handoff.last_restore["handed_over"] == 1
+        assert theirs.room_code not in new.games
+
+    async def test_drain_waits_for_running_handlers(self, monkeypatch, tmp_path):
+        _, _, handoff = self.setup(monkeypatch, tmp_path)
+        release = asyncio.Event()
+
+        async def slow_handler(sid, data=None):
+            await release.wait()
+
+        handler = handoff._tracked(slow_handler)
+        task = asyncio.ensure_future(handler("sid1"))
+        await asyncio.sleep(0)
+        assert handoff.inflight == 1
+
+        drain = asyncio.ensure_future(handoff.drain())
+        await asyncio.sleep(0.1)
+        assert not drain.done()
+        release.set()
+        await asyncio.wait_for(drain, timeout=1.0)
+        await task
+        assert handoff.inflight == 0
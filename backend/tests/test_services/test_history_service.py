@@ -0,0 +1,87 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.game import Game, GameParticipant
+from app.services.history_service import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    get_game_detail,
+    user_games_query,
+)
+
+
+class ScriptedSession:
+    """Returns canned rows for each execute() in turn and counts the queries."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        rows = self.results.pop(0)
+        return SimpleNamespace(all=lambda: rows)
+
+
+class TestCursor:
+    def test_round_trip(self):
+        created_at, game_id = datetime(2026, 5, 1, 12, 30, 5, 123), uuid.uuid4()
+        assert decode_cursor(encode_cursor(created_at, game_id)) == (created_at, game_id)
+
+    def test_garbage_is_rejected(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+
+    def test_page_query_seeks_past_cursor(self):
+        cursor = encode_cursor(datetime(2026, 5, 1), uuid.uuid4())
+        sql = str(user_games_query(uuid.uuid4(), 20, cursor).compile(
+            dialect=postgresql.dialect(),
+        ))
+        assert "(games.created_at, games.id) <" in sql
+        assert "OFFSET" not in sql
+        assert "ORDER BY games.created_at DESC, games.id DESC" in sql
+
+
+class TestGameDetail:
+    def game(self):
+        game = Game(
+            id=uuid.uuid4(), room_code="HIST01", scoring_variant="standard",
+            round_count=1, player_count=2, winner_id=None, created_at=datetime(2026, 5, 1),
+        )
+        me = GameParticipant(
+            id=uuid.uuid4(), game_id=game.id, user_id=uuid.uuid4(), display_name="Me",
+            is_bot=False, seat_index=0, final_score=11, final_rank=1,
+        )
+        bot = GameParticipant(
+            id=uuid.uuid4(), game_id=game.id, user_id=None, display_name="Bot",
+            is_bot=True, seat_index=1, final_score=0, final_rank=2,
+        )
+        return game, me, bot
+
+    async def test_loads_rounds_in_two_queries(self):
+        game, me, bot = self.game()
+        round_row = dict(round_number=1, hand_size=1, trump_suit=None, dealer_seat=0)
+        session = ScriptedSession(
+            [(game, me), (game, bot)],
+            [
+                SimpleNamespace(**round_row, participant_id=bot.id, bid=1, tricks_won=0,
+                                round_points=0, cumulative_score=0),
+                SimpleNamespace(**round_row, participant_id=me.id, bid=1, tricks_won=1,
+                                round_points=11, cumulative_score=11),
+            ],
+        )
+        detail = await get_game_detail(session, game.id, me.user_id)
+        assert session.queries == 2
+        assert [s["seat_index"] for s in detail["rounds"][0]["scores"]] == [0, 1]
+        assert len(detail["participants"]) == 2
+
+    async def test_hidden_from_non_participants(self):
+        game, me, bot = self.game()
+        session = ScriptedSession([(game, me), (game, bot)])
+        assert await get_game_detail(session, game.id, uuid.uuid4()) is None
+        assert session.queries == 1
@@ -0,0 +1,74 @@
+import random
+import uuid
+from dataclasses import replace
+
+from app.services.leaderboard import SORT_KEYS, Leaderboard, LeaderboardEntry
+
+
+def entry(wins=0, played=10, exact=0, bids=10, best=0, name=None) -> LeaderboardEntry:
+    user_id = uuid.uuid4()
+    return LeaderboardEntry(
+        user_id=user_id, display_name=name or str(user_id)[:6], avatar_url=None,
+        games_played=played, games_won=wins, exact_bids=exact, total_bids=bids,
+        best_score=best, best_streak=0,
+    )
+
+
+def brute_rank(board: Leaderboard, user_id: uuid.UUID, key: str) -> int:
+    eligible = [e for e in board._entries.values() if board._eligible(e, key)]
+    ordered = sorted(eligible, key=lambda e: e.sort_key(key))
+    return [e.user_id for e in ordered].index(user_id) + 1
+
+
+class TestLeaderboard:
+    def test_top_is_sorted_by_key(self):
+        board = Leaderboard(min_rate_games=1)
+        a, b, c = entry(wins=5, best=10), entry(wins=9, best=3), entry(wins=1, best=50)
+        board.replace_all([a, b, c])
+        assert [r["games_won"] for r in board.top("wins", 10)] == [9, 5, 1]
+        assert [r["best_score"] for r in board.top("best_score", 2)] == [50, 10]
+        assert board.top("wins", 10)[0]["rank"] == 1
+
+    def test_rank_matches_full_sort_after_updates(self):
+        rng = random.Random(3)
+        board = Leaderboard(min_rate_games=5)
+        entries = [
+            entry(wins=rng.randrange(20), played=rng.randrange(1, 30),
+                  exact=rng.randrange(10), bids=rng.randrange(1, 40), best=rng.randrange(300))
+            for _ in range(300)
+        ]
+        board.replace_all(entries)
+        for e in rng.sample(entries, 50):
+            board.upsert(replace(e, games_won=e.games_won + 1, games_played=e.games_played + 1))
+        for e in rng.sample(entries, 40):
+            for key in SORT_KEYS:
+                if board.rank(e.user_id, key) is not None:
+                    assert board.rank(e.user_id, key) == brute_rank(board, e.user_id, key)
+
+    def test_rate_keys_need_minimum_games(self):
+        board = Leaderboard(min_rate_games=10)
+        rookie, veteran = entry(wins=1, played=1), entry(wins=5, played=10)
+        board.replace_all([rookie, veteran])
+        assert board.rank(rookie.user_id, "win_rate") is None
+        assert board.rank(rookie.user_id, "wins") == 2
+        assert board.rank(veteran.user_id, "win_rate") == 1
+
+    def test_remove(self):
+        board = Leaderboard()
+        a, b = entry(wins=3), entry(wins=2)
+        board.replace_all([a, b])
+        board.remove(a.user_id)
+        assert board.rank(a.user_id, "wins") is None
+        assert board.rank(b.user_id, "wins") == 1
+        assert len(board) == 1
+
+    def test_etag_changes_only_on_change(self):
+        board = Leaderboard()
+        a = entry(wins=3)
+        board.replace_all([a])
+        etag = board.etag("wins", 50)
+        board.upsert(a)  # unchanged
+        assert board.etag("wins", 50) == etag
+        board.upsert(replace(a, games_won=4))
+        assert board.etag("wins", 50) != etag
+        assert board.top("wins", 50)[0]["games_won"] == 4
@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+
+from app.bot.basic import BasicBot
+from app.bot.selfplay import play_to_completion
+from app.game.engine import GameEngine
+from app.services.game_service import GameRecord, build_game_record
+from app.services.persistence_queue import PersistenceQueue
+
+
+def finished_record(room_code="PQ01") -> GameRecord:
+    engine = GameEngine(room_code=room_code)
+    engine.add_player(str(uuid.uuid4()), "Human")
+    for i in range(2):
+        engine.add_player(f"bot_{i}", f"Bot {i}", is_bot=True)
+    engine.start_game(engine.players[0].player_id)
+    play_to_completion(engine, {p.player_id: BasicBot() for p in engine.players})
+    return build_game_record(engine)
+
+
+class FakeResult:
+    def scalars(self):
+        return []
+
+
+class FakeDatabase:
+    """Stands in for async_session(): records committed inserts per table."""
+
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = {}
+        self.commits = 0
+        self.down = False
+        self.game_ids: set = set()
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, database: FakeDatabase):
+        self.database = database
+        self.pending: dict[str, list[dict]] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, rows=None):
+        if rows is None:
+            return FakeResult()
+        self.pending.setdefault(statement.table.name, []).extend(rows)
+        return None
+
+    def add(self, obj):
+        pass
+
+    async def commit(self):
+        if self.database.down:
+            raise ConnectionRefusedError("database is down")
+        ids = {row["id"] for row in self.pending.get("games", [])}
+        if ids & self.database.game_ids:
+            raise IntegrityError("INSERT INTO games", {}, Exception("duplicate key"))
+        self.database.game_ids |= ids
+        for table, rows in self.pending.items():
+            self.database.tables.setdefault(table, []).extend(rows)
+        self.database.commits += 1
+
+
+def make_queue(tmp_path, database, **kwargs) -> PersistenceQueue:
+    kwargs.setdefault("max_retries", 2)
+    return PersistenceQueue(
+        journal_path=tmp_path / "journal.jsonl", base_delay=0.001,
+        session_factory=database, **kwargs,
+    )
+
+
+class TestGameRecord:
+    def test_round_trips_through_json(self):
+        record = finished_record()
+        assert GameRecord.from_dict(record.to_dict()) == record
+
+    def test_only_humans_have_user_ids(self):
+        record = finished_record()
+        humans = [p for p in record.participants if p.user_id]
+        assert len(humans) == 1
+        assert all(p.is_bot for p in record.participants if not p.user_id)
+        assert len(record.rounds) == record.round_count
+
+
+class TestPersistenceQueue:
+    async def test_batches_into_one_transaction(self, tmp_path):
+        database = FakeDatabase()
+        queue = make_queue(tmp_path, database)
+        records = [finished_record(f"PQ{i:02d}") for i in range(3)]
+        for record in records:
+            queue.enqueue(record)
+        await queue.stop()
+
+        assert database.commits == 1
+        assert len(database.tables["games"]) == 3
+        assert len(database.tables["game_participants"]) == 9
+        assert len(database.tables["game_rounds"]) == sum(len(r.rounds) for r in records)
+
+    async def test_spills_when_database_is_down_and_replays(self, tmp_path):
+        database = FakeDatabase()
+        database.down = True
+        queue = make_queue(tmp_path, database)
+        queue.enqueue(finished_record())
+        await queue.stop()
+        assert queue.stats.spilled == 1
+        assert queue.journal_path.exists()
+
+        database.down = False
+        queue.enqueue(finished_record("PQ02"))
+        await queue.stop()
+        assert len(database.tables["games"]) == 2
+        assert not queue.journal_path.exists()
+        assert not queue.replay_path.exists()
+
+    async def test_full_queue_spills_to_journal(self, tmp_path):
+        database = FakeDatabase()
+        queue = make_queue(tmp_path, database, maxsize=1)
+        queue.enqueue(finished_record("PQ01"))
+        queue.enqueue(finished_record("PQ02"))
+        assert queue.depth == 1
+        assert queue.stats.spilled == 1
+        await queue.stop()
+        assert len(database.tables["games"]) == 2
+
+    async def test_duplicate_is_isolated(self, tmp_path):
+        database = FakeDatabase()
+        queue = make_queue(tmp_path, database)
+        record = finished_record()
+        queue.enqueue(record)
+        await asyncio.sleep(0)
+        queue.enqueue(record)
+        queue.enqueue(finished_record("PQ02"))
+        await queue.stop()
+
+        assert len(database.tables["games"]) == 2
+        assert queue.stats.rejected == 1
+        assert queue.rejected_path.exists()
@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.services.purge import AnonymousUserPurger, purge_batch_statement
+
+
+class BatchSession:
+    """Deletes `batches` in turn, one per execute()."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.statements = []
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        ids = self.batches.pop(0) if self.batches else []
+        return self._Result(ids)
+
+    async def commit(self):
+        self.commits += 1
+
+    class _Result:
+        def __init__(self, ids):
+            self.ids = ids
+
+        def scalars(self):
+            return self
+
+        def all(self):
+            return self.ids
+
+
+class TestPurge:
+    def test_statement_is_bounded_and_skips_locked(self):
+        seated = {uuid.uuid4()}
+        sql = str(purge_batch_statement(datetime(2026, 1, 1), 500, seated).compile(
+            dialect=postgresql.dialect(),
+        ))
+        assert sql.startswith("DELETE FROM users WHERE users.id IN (SELECT users.id")
+        assert "LIMIT" in sql
+        assert "FOR UPDATE OF users SKIP LOCKED" in sql
+        assert "NOT IN" in sql
+        assert sql.rstrip().endswith("RETURNING users.id")
+
+    async def test_runs_batches_until_short(self):
+        session = BatchSession(
+            [uuid.uuid4() for _ in range(3)], [uuid.uuid4() for _ in range(3)], [uuid.uuid4()],
+        )
+        purger = AnonymousUserPurger(
+            retention_days=30, batch_size=3, interval=60, session_factory=session,
+        )
+        assert await purger.run_once() == 7
+        assert session.commits == 3
+        assert purger.stats.last_batches == 3
+        assert purger.stats.total_purged == 7
+
+    def test_cutoff_outlives_tokens(self, monkeypatch):
+        monkeypatch.setattr(settings, "jwt_expiration_hours", 72)
+        purger = AnonymousUserPurger(retention_days=1, batch_size=10, interval=60)
+        now = datetime(2026, 6, 1)
+        assert purger.cutoff(now) == now - timedelta(hours=72)
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import database
+from app.database import ReadRouting, ReadSession
+
+
+class FakeSession:
+    def __init__(self, name, log, fail=False):
+        self.name = name
+        self.log = log
+        self.fail = fail
+        self.closed = False
+
+    async def execute(self, statement):
+        if self.fail:
+            raise OperationalError(statement, {}, ConnectionRefusedError())
+        self.log.append((self.name, statement))
+        return self.name
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    log = []
+    state = {"replica_fails": False}
+    monkeypatch.setattr(database, "async_session", lambda: FakeSession("primary", log))
+    monkeypatch.setattr(
+        database, "replica_session",
+        lambda: FakeSession("replica", log, fail=state["replica_fails"]),
+    )
+    routing = ReadRouting(cooldown=30, write_window=5)
+    monkeypatch.setattr(database, "read_routing", routing)
+    return log, state, routing
+
+
+class TestReadRouting:
+    def test_recent_writers_read_from_the_primary(self, sessions):
+        _, _, routing = sessions
+        assert routing.use_replica("u1")
+        routing.note_write(["u1"])
+        assert not routing.use_replica("u1")
+        assert routing.use_replica("u2")
+        assert routing.use_replica()
+
+    def test_no_replica_configured_means_primary(self, sessions, monkeypatch):
+        _, _, routing = sessions
+        monkeypatch.setattr(database, "replica_session", None)
+        assert not routing.use_replica()
+
+
+class TestReadSession:
+    async def test_falls_back_and_skips_replica_during_cooldown(self, sessions):
+        log, state, routing = sessions
+        state["replica_fails"] = True
+        session = ReadSession(on_replica=True)
+        assert await session.execute("q1") == "primary"
+        assert routing.fallbacks == 1
+        assert not routing.use_replica()
+        assert log == [("primary", "q1")]
+
+    async def test_later_statement_errors_are_not_retried(self, sessions):
+        _, _, _ = sessions
+        session = ReadSession(on_replica=True)
+        assert await session.execute("q1") == "replica"
+        session._session.fail = True
+        with pytest.raises(OperationalError):
+            await session.execute("q2")
@@ -0,0 +1,74 @@
+import uuid
+from dataclasses import replace
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.game_service import GameRecord, ParticipantRecord, RoundRecord
+from app.services.rollups import backfill_chunk_statement, rollup_rows, windowed_leaderboard
+
+ALICE = str(uuid.uuid4())
+
+
+def record(finished_at: str, won: bool = True, score: int = 20) -> GameRecord:
+    return GameRecord(
+        game_id=str(uuid.uuid4()), room_code="RU01", scoring_variant="standard",
+        config_json="{}", round_count=1, player_count=2, winner_seat=0 if won else 1,
+        finished_at=finished_at,
+        participants=[
+            ParticipantRecord(ALICE, "Alice", False, 0, score, 1),
+            ParticipantRecord(None, "Bot", True, 1, 5, 2),
+        ],
+        rounds=[RoundRecord(1, 0, [(0, 1, 1, 11, 11), (1, 0, 1, 0, 0)])],
+    )
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, rows=None):
+        self.statements.append(statement)
+        return self
+
+    def all(self):
+        return []
+
+
+class TestRollupRows:
+    def test_same_day_games_fold_into_one_row(self):
+        rows = rollup_rows([
+            record("2026-03-01T10:00:00+00:00", won=True, score=20),
+            record("2026-03-01T23:59:00+00:00", won=False, score=35),
+        ])
+        assert len(rows) == 1
+        row = rows[0]
+        assert row["day"] == date(2026, 3, 1)
+        assert (row["games_played"], row["games_won"]) == (2, 1)
+        assert (row["total_rounds"], row["exact_bids"]) == (2, 2)
+        assert row["best_score"] == 35
+
+    def test_days_are_utc(self):
+        first = record("2026-03-01T23:30:00-02:00")  # already 2 March in UTC
+        rows = rollup_rows([first, replace(first, finished_at="2026-03-01T12:00:00+00:00")])
+        assert sorted(r["day"] for r in rows) == [date(2026, 3, 1), date(2026, 3, 2)]
+
+
+class TestRollupQueries:
+    async def test_window_sums_recent_buckets(self):
+        session = RecordingSession()
+        await windowed_leaderboard(session, "week", "win_rate", 20, 5, today=date(2026, 3, 10))
+        sql = compile_sql(session.statements[0])
+        assert "user_daily_stats.day >=" in sql
+        assert "GROUP BY user_daily_stats.user_id" in sql
+        assert "HAVING" in sql
+
+    def test_backfill_chunk_is_one_upsert(self):
+        sql = compile_sql(backfill_chunk_statement([uuid.uuid4()]))
+        assert sql.startswith("INSERT INTO user_daily_stats")
+        assert "GROUP BY game_participants.user_id" in sql
+        assert "ON CONFLICT (user_id, day) DO UPDATE" in sql
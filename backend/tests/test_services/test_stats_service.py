@@ -0,0 +1,79 @@
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.game_service import GameRecord, ParticipantRecord, RoundRecord
+from app.services.stats_service import (
+    apply_game_records_to_stats,
+    merge_user_stats,
+    stats_deltas,
+    stats_upsert,
+)
+
+ALICE = str(uuid.uuid4())
+BOB = str(uuid.uuid4())
+
+
+def record(winner_seat=0, humans=(ALICE, BOB)) -> GameRecord:
+    participants = [
+        ParticipantRecord(uid, f"P{seat}", False, seat, 10 * (2 - seat), seat + 1)
+        for seat, uid in enumerate(humans)
+    ]
+    participants.append(ParticipantRecord(None, "Bot", True, len(humans), -5, len(humans) + 1))
+    rounds = [
+        RoundRecord(1, 0, [(0, 1, 1, 11, 11), (1, 0, 1, 0, 0), (2, 0, 0, 10, 10)]),
+        RoundRecord(2, 1, [(0, 1, 0, 0, 11), (1, 1, 1, 11, 11), (2, 0, 0, 10, 20)]),
+    ]
+    return GameRecord(
+        game_id=str(uuid.uuid4()), room_code="ST01", scoring_variant="standard",
+        config_json="{}", round_count=2, player_count=3, winner_seat=winner_seat,
+        finished_at="2026-01-01T00:00:00+00:00", participants=participants, rounds=rounds,
+    )
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, rows=None):
+        self.statements.append(statement)
+
+
+class TestStatsDeltas:
+    def test_counts_rounds_and_exact_bids(self):
+        rows = {row["user_id"]: row for row in stats_deltas(record())}
+        alice, bob = rows[uuid.UUID(ALICE)], rows[uuid.UUID(BOB)]
+        assert (alice["total_rounds"], alice["exact_bids"]) == (2, 1)
+        assert (bob["total_rounds"], bob["exact_bids"]) == (2, 1)
+        assert alice["games_won"] == alice["current_streak"] == 1
+        assert bob["games_won"] == bob["current_streak"] == 0
+
+    def test_bots_are_skipped(self):
+        assert len(stats_deltas(record())) == 2
+
+
+class TestStatsUpsert:
+    def test_single_statement_with_sql_streaks(self):
+        sql = compile_sql(stats_upsert(stats_deltas(record())))
+        assert "ON CONFLICT (user_id) DO UPDATE" in sql
+        assert "CASE WHEN" in sql
+        assert "greatest" in sql.lower()
+
+    async def test_repeat_players_get_later_statements(self):
+        session = RecordingSession()
+        await apply_game_records_to_stats(session, [record(), record(1), record(humans=(BOB,))])
+        # Bob plays three games in the batch, so his games need three statements
+        assert len(session.statements) == 3
+
+    async def test_merge_is_one_upsert(self):
+        session = RecordingSession()
+        await merge_user_stats(session, uuid.UUID(ALICE), uuid.UUID(BOB))
+        sql = compile_sql(session.statements[0])
+        assert len(session.statements) == 1
+        assert "INSERT INTO user_stats" in sql
+        assert "SELECT" in sql
+        assert "ON CONFLICT (user_id) DO UPDATE" in sql
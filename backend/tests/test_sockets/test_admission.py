@@ -0,0 +1,118 @@
+import asyncio
+
+from app.loop_monitor import LoopMonitor
+from app.sockets.admission import AdmissionController
+
+
+def controller(monitor, inflight=lambda: 0, **kwargs):
+    options = {
+        "enter_lag": 0.1, "exit_lag": 0.03, "enter_inflight": 100, "exit_inflight": 20,
+        "min_hold": 5.0, "check_interval": 0.01, "retry_after": 3.0,
+        "bot_delay_factor": 0.5, "pacing_factor": 2.0,
+    }
+    options.update(kwargs)
+    return AdmissionController(lag=lambda: monitor.smoothed, inflight=inflight, **options)
+
+
+def inject_lag(monitor, lag, samples=30):
+    for _ in range(samples):
+        monitor.record(lag)
+
+
+class TestHysteresis:
+    def test_enters_on_lag_and_leaves_only_below_the_exit_mark_after_the_hold(self):
+        monitor = LoopMonitor(interval=0.005, threshold=1.0, smoothing=0.5)
+        admission = controller(monitor)
+        assert not admission.update(now=0)
+
+        inject_lag(monitor, 0.2)
+        assert admission.update(now=1)
+        assert admission.overloaded
+
+        # Between the marks: no flapping either way
+        inject_lag(monitor, 0.06)
+        assert not admission.update(now=10)
+        assert admission.overloaded
+
+        inject_lag(monitor, 0.0)
+        assert not admission.update(now=3)  # still inside the minimum hold
+        assert admission.update(now=6)
+        assert not admission.overloaded
+        inject_lag(monitor, 0.06)
+        assert not admission.update(now=7)
+        assert not admission.overloaded
+
+    def test_piled_up_handlers_also_count_as_overload(self):
+        running = [150]
+        admission = controller(LoopMonitor(0.005, 1.0), inflight=lambda: running[0])
+        assert admission.update(now=0)
+        running[0] = 50
+        assert not admission.update(now=10)
+        running[0] = 10
+        assert admission.update(now=11)
+
+
+class TestShedding:
+    def test_new_work_is_refused_and_pacing_stretched_while_overloaded(self):
+        monitor = LoopMonitor(interval=0.005, threshold=1.0, smoothing=1.0)
+        admission = controller(monitor)
+        assert admission.reject("create_game") is None
+        assert admission.bot_delay(1.5) == 1.5
+
+        monitor.record(0.5)
+        admission.update(now=0)
+        assert admission.reject("create_game") == 3.0
+        assert admission.bot_delay(1.5) == 0.75
+        assert admission.pacing(2) == 4.0
+
+    async def test_held_lobby_update_is_sent_on_recovery(self):
+        monitor = LoopMonitor(interval=0.005, threshold=1.0, smoothing=1.0)
+        admission = controller(monitor, min_hold=0.0)
+        sent = []
+
+        async def on_recovered():
+            sent.append(True)
+
+        monitor.record(0.5)
+        admission.start(on_recovered)
+        try:
+            await asyncio.sleep(0.03)
+            assert admission.hold_lobby_update()
+            assert admission.hold_lobby_update()
+            monitor.record(0.0)
+            await asyncio.sleep(0.05)
+        finally:
+            await admission.stop()
+        assert sent == [True]
+        assert not admission.hold_lobby_update()
+
+
+class FakeServer:
+    def __init__(self, handler):
+        self.handlers = {"/": {"play_card": handler}}
+
+
+class TestBusyHandlers:
+    async def test_handlers_sleeping_through_pacing_are_not_load(self):
+        admission = controller(LoopMonitor(0.005, 1.0), inflight=None, enter_inflight=5)
+        release = asyncio.Event()
+
+        async def play_card(sid, data=None):
+            await admission.sleep(admission.pacing(0.05))  # bot think time, trick pause
+            await release.wait()
+
+        server = FakeServer(play_card)
+        admission.attach(server)
+        tasks = [asyncio.create_task(server.handlers["/"]["play_card"](f"s{i}")) for i in range(20)]
+        await asyncio.sleep(0.01)
+        assert admission.busy == 0
+        assert not admission.update(now=0)
+
+        # Past the sleep they count as busy again
+        await asyncio.sleep(0.08)
+        assert admission.busy == 20
+        assert admission.update(now=1)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert admission.busy == 0
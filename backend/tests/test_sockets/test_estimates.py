@@ -0,0 +1,24 @@
+from app.sockets import estimates as estimates_module
+from app.sockets.estimates import EstimateService
+from app.sockets.manager import GameRoomManager
+from tests.test_game.test_estimator import engine_in_play
+
+
+async def test_estimates_are_simulated_in_a_worker_process(monkeypatch):
+    rooms = GameRoomManager()
+    engine = engine_in_play()
+    rooms.games[engine.room_code] = engine
+    monkeypatch.setattr(estimates_module, "manager", rooms)
+    pushed = []
+
+    async def emit(sio, eng, estimate):
+        pushed.append(estimate)
+
+    monkeypatch.setattr(estimates_module, "emit_win_estimates", emit)
+    service = EstimateService(samples=16, min_interval=0.0, workers=2)
+    try:
+        await service._update_room(None, engine.room_code)
+        assert len(service._pools) == 2
+    finally:
+        await service.stop()
+    assert [p["player_id"] for p in pushed[0]["players"]] == [p.player_id for p in engine.players]
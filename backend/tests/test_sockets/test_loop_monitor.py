@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import time
+
+from app.loop_monitor import LoopMonitor, describe_task
+from app.sockets.manager import manager
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+class TestLagSampling:
+    def test_smoothed_lag_follows_samples(self):
+        monitor = LoopMonitor(interval=0.005, threshold=0.1, smoothing=0.5)
+        monitor.record(0.2)
+        monitor.record(0.0)
+        assert monitor.lag == 0.0
+        assert monitor.smoothed == 0.05
+        assert monitor.max_lag == 0.2
+
+    async def test_sampler_measures_injected_lag(self):
+        monitor = LoopMonitor(interval=0.005, threshold=10)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.02)
+            block_the_loop(0.05)
+            await asyncio.sleep(0.02)
+        finally:
+            await monitor.stop()
+        assert monitor.max_lag >= 0.04
+
+
+class TestWatchdog:
+    async def test_stall_is_logged_with_room_event_and_stack(self, caplog):
+        manager.register_sid("sid-stall", "p-stall")
+        manager.player_rooms["p-stall"] = "STALL1"
+        monitor = LoopMonitor(interval=0.005, threshold=0.05)
+        monitor.start()
+
+        async def play_card():
+            block_the_loop(0.3)
+
+        try:
+            await asyncio.sleep(0.02)
+            with caplog.at_level(logging.WARNING, logger="app.loop_monitor"):
+                await asyncio.create_task(play_card(), name="sio:play_card:sid-stall")
+        finally:
+            await monitor.stop()
+            manager.unregister_sid("sid-stall")
+            manager.player_rooms.pop("p-stall", None)
+
+        assert monitor.stalls == 1
+        assert monitor.last_stall["event"] == "play_card"
+        assert monitor.last_stall["room"] == "STALL1"
+        assert "block_the_loop" in caplog.text
+        assert "event=play_card" in caplog.text
+
+    def test_timer_tasks_name_their_room(self):
+        assert describe_task("turn_timer:ABC123") == {"event": "turn_timer", "room": "ABC123"}
+        assert describe_task("Task-7") == {"task": "Task-7"}
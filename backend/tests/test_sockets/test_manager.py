@@ -0,0 +1,116 @@
+import time
+
+from app.sockets.manager import GameRoomManager
+
+
+def started_room(manager: GameRoomManager, humans=1, bots=2):
+    engine = manager.create_game("h0", "Host")
+    for i in range(1, humans):
+        manager.join_game(engine.room_code, f"h{i}", f"Human {i}")
+    for i in range(bots):
+        engine.add_player(f"bot_{i}", f"Bot {i}", is_bot=True)
+    engine.start_game("h0")
+    return engine
+
+
+class TestAbandonedDetection:
+    def test_lobby_is_never_abandoned(self):
+        manager = GameRoomManager()
+        engine = manager.create_game("h0", "Host")
+        manager.set_disconnected(engine, "h0")
+        assert not manager.is_abandoned(engine, grace=0)
+
+    def test_connected_human_keeps_game_alive(self):
+        manager = GameRoomManager()
+        engine = started_room(manager)
+        assert not manager.is_abandoned(engine, grace=0)
+
+    def test_all_disconnected_after_grace(self):
+        manager = GameRoomManager()
+        engine = started_room(manager, humans=2)
+        manager.set_disconnected(engine, "h0")
+        manager.set_disconnected(engine, "h1")
+        assert not manager.is_abandoned(engine, grace=60)
+        assert manager.is_abandoned(engine, grace=0)
+
+    def test_grace_counts_from_first_disconnect(self):
+        manager = GameRoomManager()
+        engine = started_room(manager)
+        manager.set_disconnected(engine, "h0")
+        manager._disconnected_at[engine.room_code, "h0"] -= 30
+        manager.set_disconnected(engine, "h0")
+        assert manager.is_abandoned(engine, grace=29)
+        assert time.monotonic() - manager._disconnected_at[engine.room_code, "h0"] >= 30
+
+    def test_reconnect_clears_disconnect(self):
+        manager = GameRoomManager()
+        engine = started_room(manager)
+        manager.set_disconnected(engine, "h0")
+        manager.join_game(engine.room_code, "h0", "Host")
+        assert not manager.is_abandoned(engine, grace=0)
+
+    def test_leaving_mid_game_doesnt_age_the_next_disconnect(self):
+        manager = GameRoomManager()
+        old = started_room(manager)
+        manager.leave_game("h0")
+        manager._disconnected_at[old.room_code, "h0"] -= 10_000
+        new = started_room(manager)
+        manager.set_disconnected(new, "h0")
+        assert manager.disconnected_for(new.room_code, "h0") < 1
+        assert not manager.is_abandoned(new, grace=60)
+        manager.cleanup_game(old.room_code)
+        assert (old.room_code, "h0") not in manager._disconnected_at
+
+    def test_bot_only_table_is_abandoned(self):
+        manager = GameRoomManager()
+        engine = started_room(manager)
+        engine.players[0].is_bot = True
+        assert manager.is_abandoned(engine, grace=60)
+
+
+class TestCleanup:
+    def test_cleanup_keeps_mapping_for_player_in_new_room(self):
+        manager = GameRoomManager()
+        old = started_room(manager)
+        manager.leave_game("h0")
+        new = manager.create_game("h0", "Host")
+        manager.cleanup_game(old.room_code)
+        assert old.room_code not in manager.games
+        assert manager.player_rooms["h0"] == new.room_code
+
+
+class TestAutopilot:
+    def test_engages_only_while_disconnected(self):
+        manager = GameRoomManager()
+        engine = started_room(manager)
+        host = engine.state.get_player("h0")
+        assert not manager.enable_autopilot(engine, "h0")
+        manager.set_disconnected(engine, "h0")
+        assert manager.enable_autopilot(engine, "h0")
+        assert manager.is_bot_controlled(engine, host)
+
+    def test_reconnect_hands_seat_back(self):
+        manager = GameRoomManager()
+        engine = started_room(manager)
+        manager.set_disconnected(engine, "h0")
+        manager.enable_autopilot(engine, "h0")
+        manager.join_game(engine.room_code, "h0", "Host")
+        assert not manager.is_bot_controlled(engine, engine.state.get_player("h0"))
+
+    def test_autopilot_stays_with_the_room_it_was_engaged_in(self):
+        manager = GameRoomManager()
+        old = started_room(manager)
+        manager.set_disconnected(old, "h0")
+        manager.enable_autopilot(old, "h0")
+        manager.leave_game("h0")
+        new = started_room(manager)
+        assert not manager.is_bot_controlled(new, new.state.get_player("h0"))
+        assert manager.is_bot_controlled(old, old.state.get_player("h0"))
+        manager.cleanup_game(old.room_code)
+        assert not manager.autopilot
+
+    def test_bots_are_bot_controlled(self):
+        manager = GameRoomManager()
+        engine = started_room(manager)
+        assert manager.is_bot_controlled(engine, engine.state.get_player("bot_0"))
+        assert not manager.enable_autopilot(engine, "bot_0")
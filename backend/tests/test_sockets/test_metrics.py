@@ -0,0 +1,99 @@
+import time
+
+from engineio import packet as eio_packet
+
+from app.metrics import (
+    Registry,
+    registry,
+    socket_emitted_bytes,
+    socket_emitted_messages,
+    socket_handler_seconds,
+)
+from app.sockets.metrics import _event_name, attach
+
+
+class FakeServer:
+    def __init__(self):
+        self.sent = []
+
+        async def play_card(sid, data):
+            return "played"
+
+        async def disconnect(sid):
+            return "gone"
+
+        self.handlers = {"/": {"play_card": play_card, "disconnect": disconnect}}
+
+    async def _send_eio_packet(self, eio_sid, pkt):
+        self.sent.append((eio_sid, pkt))
+
+
+class TestRegistry:
+    def test_renders_prometheus_text(self):
+        registry = Registry()
+        errors = registry.counter("errors_total", "Errors", labels=("kind",))
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        registry.gauge("rooms", "Rooms", lambda: {("lobby",): 2}, labels=("phase",))
+        errors.labels('say "hi"').inc(3)
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        text = registry.render()
+        assert '# TYPE errors_total counter\nerrors_total{kind="say \\"hi\\""} 3' in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_sum 5.55" in text
+        assert "latency_seconds_count 3" in text
+        assert 'rooms{phase="lobby"} 2' in text
+
+    def test_observations_cost_well_under_a_microsecond(self):
+        child = Registry().histogram("h", "h", labels=("event",)).labels("play_card")
+        n = 100_000
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(n):
+                child.observe(0.003)
+            best = min(best, (time.perf_counter() - started) / n)
+        assert best < 1e-6
+
+
+class TestSocketInstrumentation:
+    def test_event_names_come_from_encoded_packets(self):
+        assert _event_name('2["your_turn",{"time_remaining":30}]') == "your_turn"
+        assert _event_name('2/lobby,["rooms_updated",{"rooms":[]}]') == "rooms_updated"
+        assert _event_name('0{"sid":"abc"}') is None
+
+    async def test_handlers_are_timed_and_emits_counted(self):
+        server = FakeServer()
+        attach(server)
+        before = sum(socket_handler_seconds.labels("play_card").counts)
+        assert await server.handlers["/"]["play_card"]("sid1", {}) == "played"
+        assert sum(socket_handler_seconds.labels("play_card").counts) == before + 1
+
+        sent = socket_emitted_messages.labels("card_played").value
+        size = socket_emitted_bytes.labels("card_played").value
+        encoded = '2["card_played",{"player_id":"p1"}]'
+        await server._send_eio_packet("eio1", eio_packet.Packet(eio_packet.MESSAGE, encoded))
+        assert len(server.sent) == 1
+        assert socket_emitted_messages.labels("card_played").value == sent + 1
+        assert socket_emitted_bytes.labels("card_played").value == size + len(encoded)
+
+    def test_process_cpu_and_memory_are_exported(self):
+        text = registry.render()
+        rss = next(line for line in text.splitlines()
+                   if line.startswith("process_resident_memory_bytes "))
+        assert int(rss.split()[1]) > 1_000_000
+        assert "# TYPE process_cpu_seconds_total counter\nprocess_cpu_seconds_total " in text
+
+    async def test_legacy_disconnect_keeps_its_signature(self):
+        server = FakeServer()
+        disconnect = server.handlers["/"]["disconnect"]
+        before = sum(socket_handler_seconds.labels("disconnect").counts)
+        attach(server)
+        # python-socketio calls (sid, reason) first and retries (sid) on TypeError
+        assert server.handlers["/"]["disconnect"] is disconnect
+        assert await server.handlers["/"]["disconnect"]("sid1") == "gone"
+        assert sum(socket_handler_seconds.labels("disconnect").counts) == before
@@ -0,0 +1,100 @@
+from app.sockets.manager import manager
+from app.sockets.ratelimit import Budget, RateLimiter, TokenBucket, rate_limited
+
+
+class FakeServer:
+    def __init__(self):
+        self.calls = []
+        self.emitted = []
+
+        async def create_game(sid, data=None):
+            self.calls.append(("create_game", sid))
+
+        async def disconnect(sid):
+            self.calls.append(("disconnect", sid))
+            manager.unregister_sid(sid)
+
+        async def start_game(sid, data=None):
+            self.calls.append(("start_game", sid))
+
+        self.handlers = {"/": {
+            "create_game": create_game, "disconnect": disconnect, "start_game": start_game,
+        }}
+
+    async def emit(self, event, data, to=None):
+        self.emitted.append((event, data, to))
+
+
+def limiter(**budgets):
+    return RateLimiter(budgets or {"create_game": Budget(rate=1.0, burst=2)}, player_factor=1.5)
+
+
+class TestTokenBucket:
+    def test_burst_then_refill_at_rate(self):
+        bucket = TokenBucket(Budget(rate=2.0, burst=3), now=0)
+        assert [bucket.take(0) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.take(0) == 0.5
+        assert bucket.take(0.5) == 0.0
+        assert bucket.take(100) == 0.0
+        assert bucket.tokens == 2.0  # capped at the burst
+
+
+class TestRateLimiter:
+    def test_connection_budget_comes_before_the_players(self):
+        limits = limiter()
+        assert limits.check("s1", "p1", "create_game", now=0) == (0.0, "")
+        assert limits.check("s1", "p1", "create_game", now=0) == (0.0, "")
+        assert limits.check("s1", "p1", "create_game", now=0) == (1.0, "sid")
+
+    def test_player_budget_is_shared_across_connections(self):
+        limits = limiter()  # player burst is 3
+        assert limits.check("s1", "p1", "create_game", now=0)[0] == 0.0
+        assert limits.check("s1", "p1", "create_game", now=0)[0] == 0.0
+        assert limits.check("s2", "p1", "create_game", now=0)[0] == 0.0
+        wait, scope = limits.check("s2", "p1", "create_game", now=0)
+        assert scope == "player" and wait > 0
+        # The refused event didn't cost the second connection a token
+        assert limits._sids["s2"]["create_game"].tokens == 1.0
+
+    def test_disconnect_frees_buckets_but_parks_a_depleted_player(self):
+        limits = limiter()
+        for _ in range(2):
+            limits.check("s1", "p1", "create_game", now=0)
+        limits.check("s2", "p2", "create_game", now=0)
+
+        limits.forget("s1", "p1", now=0)
+        assert "s1" not in limits._sids
+        assert "p1" in limits._parked
+        # Reconnecting doesn't get a fresh budget
+        limits.check("s3", "p1", "create_game", now=0)
+        assert limits.check("s3", "p1", "create_game", now=0)[1] == "player"
+
+        limits.forget("s3", "p1", now=0)
+        limits.forget("s2", "p2", now=10)
+        assert limits.stats() == {"dropped": 0, "connections": 0, "players": 0, "parked": 0}
+
+
+class TestAttach:
+    async def test_limited_events_get_an_error_and_are_not_handled(self):
+        server = FakeServer()
+        limits = limiter()
+        limits.attach(server)
+        manager.register_sid("rl-sid", "rl-player")
+        dropped = rate_limited.labels("create_game", "sid").value
+
+        create_game = server.handlers["/"]["create_game"]
+        for _ in range(3):
+            await create_game("rl-sid", {})
+        for _ in range(5):
+            await server.handlers["/"]["start_game"]("rl-sid")  # not limited
+
+        assert server.calls.count(("create_game", "rl-sid")) == 2
+        assert server.calls.count(("start_game", "rl-sid")) == 5
+        event, payload, to = server.emitted[0]
+        assert (event, to) == ("error", "rl-sid")
+        assert payload["retry_after"] > 0
+        assert rate_limited.labels("create_game", "sid").value == dropped + 1
+
+        await server.handlers["/"]["disconnect"]("rl-sid")
+        assert limits.stats()["connections"] == 0
+        assert "rl-player" in limits._parked
@@ -0,0 +1,120 @@
+import gc
+import tracemalloc
+
+from app.bot.basic import BasicBot
+from app.bot.selfplay import play_to_completion, play_turn
+from app.game.types import GamePhase
+from app.metrics import registry
+from app.sockets import reaper as reaper_module
+from app.sockets.manager import GameRoomManager
+from app.sockets.reaper import RoomReaper, estimate_room_bytes, rooms_evicted
+
+
+def open_room(rooms: GameRoomManager, host: str, start=True):
+    engine = rooms.create_game(host, "Host")
+    for i in range(3):
+        engine.add_player(f"{host}_bot{i}", f"Bot {i}", is_bot=True)
+    if start:
+        engine.start_game(host)
+    return engine
+
+
+def finish(engine):
+    play_to_completion(engine, {p.player_id: BasicBot() for p in engine.players})
+
+
+def setup(monkeypatch):
+    rooms = GameRoomManager()
+    monkeypatch.setattr(reaper_module, "manager", rooms)
+    return rooms, RoomReaper(interval=30, finished_grace=60, lobby_ttl=600)
+
+
+class TestEviction:
+    async def test_finished_rooms_go_after_the_grace_period(self, monkeypatch):
+        rooms, reaper = setup(monkeypatch)
+        engine = open_room(rooms, "h1")
+        finish(engine)
+        rooms.start_turn_timer(engine.room_code, lambda _: None, timeout=30)
+
+        assert reaper.sweep(now=0) == []
+        assert reaper.sweep(now=59) == []
+        assert reaper.sweep(now=60) == [engine]
+        assert rooms.games == {}
+        assert rooms.player_rooms == {}
+        assert rooms._turn_timers == {}
+        assert reaper.stats.evicted_finished == 1
+
+    def test_idle_lobbies_go_after_the_ttl_and_activity_resets_it(self, monkeypatch):
+        rooms, reaper = setup(monkeypatch)
+        lobby = open_room(rooms, "h1", start=False)
+        game = open_room(rooms, "h2")
+
+        reaper.sweep(now=0)
+        lobby.add_player("late", "Late")
+        reaper.sweep(now=500)
+        assert reaper.sweep(now=1000) == []
+        assert reaper.sweep(now=1100) == [lobby]
+        assert reaper.stats.evicted_idle == 1
+
+        # Games in progress are never reaped, however long a turn takes
+        assert reaper.sweep(now=100_000) == []
+        assert list(rooms.games.values()) == [game]
+
+    def test_memory_stays_flat_over_many_games(self, monkeypatch):
+        rooms, reaper = setup(monkeypatch)
+        now = 0.0
+        for batch in range(10):
+            for i in range(20):
+                finish(open_room(rooms, f"b{batch}h{i}"))
+            now += 30
+            reaper.sweep(now=now)
+        now += 60
+        reaper.sweep(now=now)
+        assert len(rooms.games) <= 40
+        reaper.sweep(now=now + 60)
+        assert rooms.games == {}
+        assert rooms.player_rooms == {}
+        assert reaper._seen == {} and reaper._bytes == {}
+
+
+class TestMemoryEstimate:
+    def test_estimate_is_close_to_measured_memory(self):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            engine = open_room(GameRoomManager(), "host")
+            for _ in range(25):
+                if engine.phase == GamePhase.SCORING:
+                    engine.advance_to_next_round()
+                play_turn(engine, BasicBot())
+            gc.collect()
+            mid_game = estimate_room_bytes(engine)
+            finish(engine)
+            gc.collect()
+            finished = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+        assert finished / 1.5 < estimate_room_bytes(engine) < finished * 1.5
+        assert mid_game < estimate_room_bytes(engine)
+    def test_totals_are_reported(self, monkeypatch):
+        rooms, reaper = setup(monkeypatch)
+        for i in range(3):
+            open_room(rooms, f"h{i}")
+        reaper.sweep(now=0)
+        assert reaper.stats.live_rooms == 3
+        assert reaper.stats.estimated_bytes == sum(
+            estimate_room_bytes(e) for e in rooms.games.values()
+        )
+
+    def test_evictions_and_size_are_exported(self, monkeypatch):
+        rooms, reaper = setup(monkeypatch)
+        monkeypatch.setattr(reaper_module, "reaper", reaper)
+        finished = rooms_evicted.labels("finished").value
+        engine = open_room(rooms, "h1")
+        open_room(rooms, "h2")
+        finish(engine)
+        reaper.sweep(now=0)
+        reaper.sweep(now=60)
+        assert rooms_evicted.labels("finished").value == finished + 1
+        assert f"rooms_estimated_bytes {reaper.stats.estimated_bytes}" in registry.render()
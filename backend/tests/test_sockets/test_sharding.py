@@ -0,0 +1,401 @@
+import asyncio
+import contextlib
+import json
+import random
+import string
+
+import pytest
+import socketio
+
+from app.game.types import GamePhase
+from app.sockets import handlers
+from app.sockets.handlers import register_handlers
+from app.sockets.manager import GameRoomManager, manager
+from app.sockets.sharding import (
+    FORWARD,
+    LOBBY,
+    ROUTE,
+    ROUTED_EVENTS,
+    Broker,
+    HashRing,
+    ShardRouter,
+    UnixSocketManager,
+)
+
+
+def room_codes(n, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choices(string.ascii_uppercase, k=6)) for _ in range(n)]
+
+
+class TestHashRing:
+    def test_rooms_spread_over_every_shard(self):
+        ring = HashRing(4)
+        counts = [0] * 4
+        for code in room_codes(4000):
+            counts[ring.owner(code)] += 1
+        assert min(counts) > 600
+
+    def test_adding_a_shard_moves_few_rooms(self):
+        codes = room_codes(4000)
+        before, after = HashRing(4), HashRing(5)
+        moved = sum(before.owner(c) != after.owner(c) for c in codes)
+        assert moved < len(codes) * 0.3
+
+    def test_created_rooms_are_owned_locally(self):
+        ring = HashRing(3)
+        rooms = GameRoomManager()
+        for i in range(20):
+            engine = rooms.create_game(f"h{i}", "Host", owned=lambda code: ring.owner(code) == 2)
+            assert ring.owner(engine.room_code) == 2
+
+
+class FakeServer:
+    """Just enough of socketio.AsyncServer for a ShardRouter."""
+
+    def __init__(self):
+        self.calls = []
+        self.sessions = {}
+        self.handlers = {
+            "/": {event: self._recorder(event) for event in (*ROUTED_EVENTS, "create_game")},
+        }
+
+    def _recorder(self, event):
+        async def handler(sid, data=None):
+            self.calls.append((event, sid, data))
+        return handler
+
+    async def get_session(self, sid):
+        return self.sessions[sid]
+
+
+def fake_server(router):
+    server = FakeServer()
+    server.manager = router.client_manager()
+    return server
+
+
+def real_server(router):
+    """An AsyncServer running the real event handlers."""
+    sio = socketio.AsyncServer(client_manager=router.client_manager())
+    register_handlers(sio)
+    return sio
+
+
+async def connected(tmp_path, layout, server=fake_server):
+    """Routers for `layout` ((shard_id, shard_count, gateway), ...) on one broker."""
+    path = str(tmp_path / "bus.sock")
+    broker = Broker(path)
+    await broker.start()
+    routers, listeners = [], []
+    for shard_id, shard_count, gateway in layout:
+        router = ShardRouter(
+            shard_id=shard_id, shard_count=shard_count, bus_path=path, gateway=gateway,
+        )
+        router.attach(server(router))
+        routers.append(router)
+        listeners.append(asyncio.ensure_future(_drain(router.bus)))
+    await asyncio.sleep(0.05)
+    return broker, routers, listeners
+
+
+async def disconnect(broker, listeners):
+    for task in listeners:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    await broker.stop()
+
+
+@pytest.fixture
+async def shards(tmp_path):
+    """Two shards connected through a broker, with their bus listeners running."""
+    broker, routers, listeners = await connected(tmp_path, [(0, 2, False), (1, 2, False)])
+    yield routers
+    await disconnect(broker, listeners)
+
+
+@pytest.fixture
+async def gateway(tmp_path):
+    """Two engine shards and a gateway."""
+    broker, routers, listeners = await connected(
+        tmp_path, [(0, 2, False), (1, 2, False), (2, 2, True)],
+    )
+    yield routers
+    await disconnect(broker, listeners)
+
+
+@pytest.fixture
+async def real_shards(tmp_path):
+    broker, routers, listeners = await connected(
+        tmp_path, [(0, 2, False), (1, 2, False)], server=real_server,
+    )
+    yield routers
+    await disconnect(broker, listeners)
+
+
+@pytest.fixture
+async def real_gateway(tmp_path):
+    broker, routers, listeners = await connected(
+        tmp_path, [(0, 2, False), (1, 2, False), (2, 2, True)], server=real_server,
+    )
+    yield routers
+    await disconnect(broker, listeners)
+
+
+async def connect_client(router, session):
+    """Connect a client to `router`'s worker; returns its sid and the events it receives."""
+    sid = await router.sio.manager.connect(f"eio-{session['player_id']}", "/")
+    received = []
+
+    async def send_eio_packet(eio_sid, pkt):
+        received.append(json.loads(pkt.data[1:]))
+
+    async def get_session(s):
+        return session
+
+    router.sio._send_eio_packet = send_eio_packet
+    router.sio.get_session = get_session
+    return sid, received
+
+
+def sent(received, event):
+    return [data for name, data in received if name == event]
+
+
+async def _drain(bus):
+    async for _ in bus._listen():
+        pass
+
+
+async def eventually(check, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not check():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+class TestForwarding:
+    async def test_events_for_a_remote_room_run_on_its_owner(self, shards):
+        local, remote = shards
+        code = manager.create_game("p1", "Ann", owned=remote.is_local).room_code
+        local.sio.sessions["sid1"] = {"player_id": "p1", "display_name": "Ann"}
+
+        await local.sio.handlers["/"]["join_game"]("sid1", {"room_code": code})
+        await eventually(lambda: remote.sio.calls)
+        assert remote.sio.calls == [("join_game", "sid1", {"room_code": code})]
+        assert local.sio.calls == []
+        assert await remote.session("sid1") == {"player_id": "p1", "display_name": "Ann"}
+        assert manager.get_player_id("sid1") == "p1"
+
+        # Once joined, the sender's other events follow the room
+        local.routes["sid1"] = code
+        await local.sio.handlers["/"]["disconnect"]("sid1")
+        await eventually(lambda: len(remote.sio.calls) == 2)
+        assert remote.sio.calls[-1] == ("disconnect", "sid1", None)
+        assert "sid1" not in remote.remote_sessions
+        assert "sid1" not in local.routes
+        manager.unregister_sid("sid1")
+        manager.cleanup_game(code)
+
+    async def test_owner_forgets_a_sid_that_leaves_or_moves_on(self, shards):
+        local, remote = shards
+        code = manager.create_game("p5", "Eve", owned=remote.is_local).room_code
+        manager.join_game(code, "p6", "Fay")  # keeps the lobby open when Eve leaves
+        local.sio.sessions["sid5"] = {"player_id": "p5", "display_name": "Eve"}
+        await local.sio.handlers["/"]["join_game"]("sid5", {"room_code": code})
+        await eventually(lambda: "sid5" in remote.remote_sessions)
+        local.routes["sid5"] = code
+
+        # Leaving: the owner drops the sid once the player has no room there
+        manager.leave_game("p5")
+        await local.sio.handlers["/"]["leave_game"]("sid5", None)
+        assert "sid5" not in local.routes
+        await eventually(lambda: "sid5" not in remote.remote_sessions)
+        assert manager.get_player_id("sid5") is None
+
+        # Moving on to a room elsewhere without leaving: the route change tells the owner
+        manager.join_game(code, "p5", "Eve")
+        await local.sio.handlers["/"]["join_game"]("sid5", {"room_code": code})
+        await eventually(lambda: "sid5" in remote.remote_sessions)
+        local.routes["sid5"] = code
+        other = next(c for c in room_codes(100) if local.is_local(c))
+        await local.joined("sid5", other)
+        await eventually(lambda: "sid5" not in remote.remote_sessions)
+        assert local.routes["sid5"] == other
+        manager.cleanup_game(code)
+
+    async def test_owner_runs_forwarded_joins_for_sids_it_has_no_connection_for(
+        self, monkeypatch,
+    ):
+        router = ShardRouter(shard_id=1, shard_count=2, bus_path="unused")
+        router.client_manager()
+        published = []
+
+        async def send(message):
+            published.append(message)
+
+        monkeypatch.setattr(router.bus, "send", send)
+        sio = socketio.AsyncServer()
+        register_handlers(sio)
+        router.attach(sio)
+        monkeypatch.setattr(handlers, "shard", router)
+        code = manager.create_game("p3", "Cy", owned=router.is_local).room_code
+
+        await router._handle_forwarded({
+            "method": FORWARD, "shard": 1, "event": "join_game", "sid": "sid3",
+            "session": {"player_id": "p4", "display_name": "Dot"}, "data": {"room_code": code},
+        })
+        assert {"method": ROUTE, "sid": "sid3", "room_code": code} in published
+        await router._handle_forwarded({
+            "method": FORWARD, "shard": 1, "event": "leave_game", "sid": "sid3",
+            "session": {"player_id": "p4", "display_name": "Dot"}, "data": None,
+        })
+        assert manager.get_engine(code).state.get_player("p4") is None
+        assert "sid3" not in router.remote_sessions
+        manager.cleanup_game(code)
+
+    async def test_real_handlers_serve_a_sid_connected_elsewhere(self, real_shards, monkeypatch):
+        local, remote = real_shards
+        monkeypatch.setattr(handlers, "shard", remote)
+        code = manager.create_game("p1", "Ann", owned=remote.is_local).room_code
+        sid, received = await connect_client(local, {"player_id": "p2", "display_name": "Bo"})
+
+        await local.sio.handlers["/"]["join_game"](sid, {"room_code": code})
+        await eventually(lambda: sent(received, "game_state"))
+        assert local.routes[sid] == code
+        assert manager.get_engine(code).state.get_player("p2") is not None
+
+        # Later events follow the route to the owner
+        await local.sio.handlers["/"]["leave_game"](sid, None)
+        await eventually(lambda: sid not in remote.remote_sessions)
+        assert manager.get_engine(code).state.get_player("p2") is None
+        assert sid not in local.routes
+        manager.unregister_sid(sid)
+        manager.cleanup_game(code)
+
+    async def test_events_without_a_remote_room_stay_local(self, shards):
+        local, remote = shards
+        await local.sio.handlers["/"]["start_game"]("sid2", None)
+        assert local.sio.calls == [("start_game", "sid2", None)]
+        assert local.forwarded == 0
+
+
+class TestLobbyAggregation:
+    async def test_lobby_lists_rooms_from_every_shard(self, shards):
+        local, remote = shards
+        room = {"room_code": "REMOTE", "player_count": 1}
+        await remote.bus.send({"method": LOBBY, "shard": 1, "rooms": [room]})
+        await eventually(lambda: 1 in local.remote_rooms)
+        assert room in local.lobby_rooms()
+
+    def test_quiet_shards_expire(self):
+        router = ShardRouter(shard_id=0, shard_count=2, bus_path="unused", lobby_interval=1.0)
+        router.receive({"method": LOBBY, "shard": 1, "rooms": [{"room_code": "OLD"}]})
+        at, rooms = router.remote_rooms[1]
+        router.remote_rooms[1] = (at - 10, rooms)
+        assert {"room_code": "OLD"} not in router.lobby_rooms()
+        assert 1 not in router.remote_rooms
+
+
+class TestCheckpointHandover:
+    async def test_only_the_owner_restores_rooms_checkpointed_for_it(self, shards):
+        local, remote = shards
+        restored = []
+
+        async def restore(router):
+            restored.append(router)
+
+        local._on_checkpointed = lambda: restore(local)
+        remote._on_checkpointed = lambda: restore(remote)
+        code = next(c for c in room_codes(100) if remote.is_local(c))
+
+        await local.rooms_checkpointed([code])
+        await remote.rooms_checkpointed([code])
+        await eventually(lambda: restored)
+        await asyncio.sleep(0.05)
+        assert restored == [remote]
+
+
+class TestGateway:
+    async def test_gateways_own_no_rooms_and_forward_room_creation(self, gateway):
+        *engines, gw = gateway
+        assert not any(gw.is_local(code) for code in room_codes(200))
+
+        gw.sio.sessions["sid3"] = {"player_id": "p3", "display_name": "Cy"}
+        await gw.sio.handlers["/"]["create_game"]("sid3", {"config": {}})
+        owner = engines[gw.ring.owner("player:p3")]
+        await eventually(lambda: owner.sio.calls)
+        assert owner.sio.calls == [("create_game", "sid3", {"config": {}})]
+        assert gw.sio.calls == []
+        manager.unregister_sid("sid3")
+
+    def test_a_single_engine_shard_joins_the_bus_for_its_gateways(self):
+        assert not ShardRouter(0, 1, "unused").enabled
+        assert ShardRouter(0, 1, "unused", gateways=1).enabled
+
+    async def test_engine_shards_keep_creating_rooms_locally(self, gateway):
+        engine = gateway[0]
+        await engine.sio.handlers["/"]["create_game"]("sid4", None)
+        assert engine.sio.calls == [("create_game", "sid4", None)]
+        assert engine.forwarded == 0
+
+
+    async def test_games_are_created_and_played_through_a_gateway(
+        self, real_gateway, monkeypatch,
+    ):
+        *engines, gw = real_gateway
+        owner = engines[gw.ring.owner("player:p7")]
+        monkeypatch.setattr(handlers, "shard", owner)
+        sid, received = await connect_client(gw, {"player_id": "p7", "display_name": "Di"})
+
+        config = {"max_players": 3, "turn_timer_seconds": 30}
+        await gw.sio.handlers["/"]["create_game"](sid, {"config": config})
+        await eventually(lambda: sent(received, "game_created"))
+        code = sent(received, "game_created")[0]["room_code"]
+        assert owner.is_local(code)
+        assert gw.routes[sid] == code
+
+        manager.join_game(code, "p8", "Ed")
+        manager.join_game(code, "p9", "Flo")
+        await gw.sio.handlers["/"]["start_game"](sid, None)
+        engine = manager.get_engine(code)
+        await eventually(lambda: engine.phase == GamePhase.BIDDING)
+        while engine.get_current_player_id() != "p7":
+            current = engine.get_current_player_id()
+            engine.place_bid(current, engine.get_valid_bids_for_player(current)[0])
+
+        bid = engine.get_valid_bids_for_player("p7")[0]
+        await gw.sio.handlers["/"]["place_bid"](sid, {"bid": bid})
+        await eventually(lambda: sent(received, "bid_placed"))
+        assert sent(received, "bid_placed")[0]["player_id"] == "p7"
+        assert sent(received, "error") == []
+        assert gw.forwarded == 3
+        manager.unregister_sid(sid)
+        manager.cleanup_game(code)
+
+
+class TestEncodedEmits:
+    async def test_emits_reach_other_workers_as_encoded_packets(self, tmp_path):
+        path = str(tmp_path / "bus.sock")
+        broker = Broker(path)
+        await broker.start()
+        gw_bus = UnixSocketManager(path, ShardRouter(1, 1, path, gateway=True))
+        engine_bus = UnixSocketManager(path, ShardRouter(0, 1, path))
+        socketio.AsyncServer(client_manager=gw_bus)
+        engine_server = socketio.AsyncServer(client_manager=engine_bus)
+        listeners = [asyncio.ensure_future(_drain(gw_bus))]
+
+        sid = await gw_bus.connect("eio1", "/")
+        written = []
+
+        async def send_eio_packet(eio_sid, pkt):
+            written.append((eio_sid, pkt.data))
+
+        gw_bus.server._send_eio_packet = send_eio_packet
+        await asyncio.sleep(0.05)
+
+        await engine_server.emit("your_turn", {"time_remaining": 30}, to=sid)
+        await eventually(lambda: written)
+        assert written == [("eio1", '2["your_turn",{"time_remaining":30}]')]
+        await disconnect(broker, listeners)